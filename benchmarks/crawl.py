@@ -0,0 +1,278 @@
+"""Benchmark full crawls of a synthetic target through several harnesses.
+
+Run from the repository root with, e.g.:
+
+    python benchmarks/crawl.py --modules 8 --classes-per-module 8
+
+A target of the specified shape is generated by ``synthetic_target.py`` and
+crawled through the in-process, subprocess, and HTTP harnesses. Each crawl
+runs in a fresh interpreter, so that its peak RSS is its own, and reports one
+JSON object per line on stdout with the target's shape and:
+
+* ``requests``: the round trips made to the target
+* ``recovered_objects``: the modules, classes, and functions walked
+* ``requests_per_object``: the ratio of the above
+* ``wall_time``: the seconds taken by the crawl
+* ``decompile_time``: the seconds spent decompiling, summed across workers
+* ``peak_rss_kb``: the peak resident set size of the crawling process
+
+"""
+
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from argparse import (
+    SUPPRESS,
+    ArgumentParser,
+    Namespace)
+from threading import (
+    Lock)
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    Optional)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from formatic.defaults import (  # noqa: E402
+    DEFAULT_TRAVERSAL,
+    TRAVERSALS)
+from formatic.harnesses import (  # noqa: E402
+    AbstractInjectionHarness,
+    HttpInjectionHarness,
+    InProcessInjectionHarness,
+    SubprocessInjectionHarness)
+from formatic.injection_engine import (  # noqa: E402
+    InjectionEngine)
+from formatic.version import (  # noqa: E402
+    __version__)
+from formatic.walkers import (  # noqa: E402
+    ClassInjectionWalker,
+    FunctionInjectionWalker,
+    ModuleInjectionWalker)
+from synthetic_target import (  # noqa: E402
+    ENTRY_MODULE_NAME,
+    add_shape_args,
+    generate_target,
+    get_shape)
+
+HARNESS_NAMES = ['in-process', 'subprocess', 'http']
+
+
+def get_parsed_args(
+) -> Namespace:
+    """Get the parsed command-line arguments."""
+    parser = ArgumentParser(
+        description='benchmark crawls of a synthetic target')
+    add_shape_args(parser)
+
+    parser.add_argument(
+        '--harness',
+        action='append',
+        choices=HARNESS_NAMES,
+        help='a harness to benchmark; may be repeated; defaults to all')
+
+    parser.add_argument(
+        '-j', '--jobs',
+        action='store',
+        type=int,
+        default=1,
+        help='the number of walks to run concurrently')
+
+    parser.add_argument(
+        '--decompile-workers',
+        action='store',
+        type=int,
+        default=0,
+        help='the number of processes decompiling code objects')
+
+    parser.add_argument(
+        '--traversal',
+        action='store',
+        choices=TRAVERSALS,
+        default=DEFAULT_TRAVERSAL,
+        help='how the engine drives walks')
+
+    parser.add_argument(
+        '-p', '--port',
+        action='store',
+        type=int,
+        default=8890,
+        help='the local port to run the HTTP target on')
+
+    parser.add_argument(
+        '--target-dir',
+        action='store',
+        required=False,
+        help='crawl the target already generated in this directory, '
+             'instead of generating a new one')
+
+    # used by run_all for crawling through one harness in a fresh process
+    parser.add_argument(
+        '--run-one',
+        action='store',
+        choices=HARNESS_NAMES,
+        help=SUPPRESS)
+
+    return parser.parse_args()
+
+
+def wait_for_port(
+    port: int,
+    timeout: float = 10.0
+) -> None:
+    """Block until something is listening on a local port."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection(('localhost', port), timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def count_requests(
+    harness: AbstractInjectionHarness
+) -> Dict[str, int]:
+    """Count the round trips a harness makes, returning the live counter.
+
+    All of the benchmarked harnesses deliver every injection through
+    :func:`send_raw_injection`, so wrapping it counts each round trip once.
+
+    """
+    counter = {'requests': 0}
+    lock = Lock()
+    send_raw_injection = harness.send_raw_injection
+
+    def counting_send_raw_injection(
+        injection: str
+    ) -> Optional[str]:
+        with lock:
+            counter['requests'] += 1
+        return send_raw_injection(injection)
+
+    harness.send_raw_injection = counting_send_raw_injection  # type: ignore
+    return counter
+
+
+def crawl(
+    harness: AbstractInjectionHarness,
+    opts: Namespace
+) -> Dict[str, Any]:
+    """Crawl a target through a harness, returning the crawl's metrics."""
+    counter = count_requests(harness)
+    engine = InjectionEngine(
+        harness,
+        jobs=opts.jobs,
+        decompile_workers=opts.decompile_workers,
+        traversal=opts.traversal)
+
+    num_recovered = 0
+    start = time.perf_counter()
+    for walker in engine.run(0, '3.7'):
+        if isinstance(walker, (
+                ClassInjectionWalker,
+                FunctionInjectionWalker,
+                ModuleInjectionWalker)):
+            num_recovered += 1
+    wall_time = time.perf_counter() - start
+    harness.close()
+
+    return {
+        'requests': counter['requests'],
+        'recovered_objects': num_recovered,
+        'requests_per_object': counter['requests'] / max(num_recovered, 1),
+        'wall_time': wall_time,
+        'decompile_time': engine.decompiler.decompile_time,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_one(
+    harness_name: str,
+    entry_path: str,
+    opts: Namespace
+) -> Dict[str, Any]:
+    """Crawl the target through the named harness in this process."""
+    if harness_name == 'in-process':
+        sys.path.insert(0, os.path.dirname(entry_path))
+        entry_module = __import__(ENTRY_MODULE_NAME)
+        return crawl(InProcessInjectionHarness(entry_module.Root()), opts)
+    elif harness_name == 'subprocess':
+        return crawl(SubprocessInjectionHarness(
+            [sys.executable, entry_path, '--inject', '@@']), opts)
+
+    server = subprocess.Popen(
+        [sys.executable, entry_path, '--http', str(opts.port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(opts.port)
+        return crawl(HttpInjectionHarness(
+            f'http://localhost:{opts.port}/@@',
+            pool_size=max(opts.jobs, 1)), opts)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_all(
+    entry_path: str,
+    opts: Namespace
+) -> Iterator[Dict[str, Any]]:
+    """Crawl the target through each harness, each in a fresh interpreter."""
+    for harness_name in opts.harness or HARNESS_NAMES:
+        args = [
+            sys.executable, __file__, *sys.argv[1:],
+            '--target-dir', os.path.dirname(entry_path),
+            '--run-one', harness_name]
+        proc = subprocess.run(args, stdout=subprocess.PIPE, check=True)
+
+        # the decompiler may print diagnostics before the result
+        yield json.loads(proc.stdout.decode('utf-8').splitlines()[-1])
+
+
+def main(
+) -> int:
+    opts = get_parsed_args()
+    shape = get_shape(opts)
+
+    if opts.run_one is not None:
+        entry_path = os.path.join(
+            opts.target_dir, f'{ENTRY_MODULE_NAME}.py')
+        result = {
+            'formatic_version': __version__,
+            'harness': opts.run_one,
+            'jobs': opts.jobs,
+            'decompile_workers': opts.decompile_workers,
+            'traversal': opts.traversal,
+            **shape._asdict(),
+            **run_one(opts.run_one, entry_path, opts),
+        }
+        print(json.dumps(result))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if opts.target_dir is None:
+            entry_path = generate_target(tmp_dir, shape)
+        else:
+            entry_path = os.path.join(
+                opts.target_dir, f'{ENTRY_MODULE_NAME}.py')
+
+        for result in run_all(entry_path, opts):
+            print(json.dumps(result), flush=True)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Compare HttpInjectionHarness against curl via SubprocessInjectionHarness.
+
+Run from the repository root with:
+
+    python benchmarks/http_harness.py
+
+This starts ``demo/vulnerable_web_app.py`` (which requires Flask) on a local
+port and reports the injections per second achieved by each harness.
+
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from argparse import (
+    ArgumentParser,
+    Namespace)
+from concurrent.futures import (
+    ThreadPoolExecutor)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from formatic.harnesses import (  # noqa: E402
+    AbstractInjectionHarness,
+    HttpInjectionHarness,
+    SubprocessInjectionHarness)
+
+PAYLOAD = '0.__class__.__name__!r'
+EXPECTED_RESPONSE = "'Flask'"
+
+
+def get_parsed_args(
+) -> Namespace:
+    """Get the parsed command-line arguments."""
+    parser = ArgumentParser(
+        description='benchmark the HTTP harness against curl')
+
+    parser.add_argument(
+        '-p', '--port',
+        action='store',
+        type=int,
+        default=8888,
+        help='the local port to run the vulnerable web app on')
+
+    parser.add_argument(
+        '-n', '--num-injections',
+        action='store',
+        type=int,
+        default=500,
+        help='the number of injections to send through each harness')
+
+    parser.add_argument(
+        '-j', '--jobs',
+        action='store',
+        type=int,
+        default=1,
+        help='the number of threads sending injections concurrently')
+
+    return parser.parse_args()
+
+
+def wait_for_port(
+    port: int,
+    timeout: float = 10.0
+) -> None:
+    """Block until something is listening on a local port."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with socket.create_connection(('localhost', port), timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def bench(
+    harness: AbstractInjectionHarness,
+    num_injections: int,
+    jobs: int
+) -> float:
+    """Send injections through a harness, returning injections per second."""
+    def send(
+        _: int
+    ) -> None:
+        response = harness.send_injection(PAYLOAD)
+        if response != EXPECTED_RESPONSE:
+            raise RuntimeError(f'Unexpected injection response {response}')
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(send, range(num_injections)))
+    return num_injections / (time.perf_counter() - start)
+
+
+def main(
+) -> int:
+    opts = get_parsed_args()
+    url = f'http://localhost:{opts.port}/inject/@@'
+
+    app_path = os.path.join(
+        os.path.dirname(__file__), '..', 'demo', 'vulnerable_web_app.py')
+    server = subprocess.Popen(
+        [sys.executable, app_path, str(opts.port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL)
+    try:
+        wait_for_port(opts.port)
+
+        harnesses = [
+            ('curl via SubprocessInjectionHarness',
+             SubprocessInjectionHarness(['curl', '-s', '-g', url])),
+            ('HttpInjectionHarness',
+             HttpInjectionHarness(url, pool_size=opts.jobs)),
+        ]
+        for name, harness in harnesses:
+            rate = bench(harness, opts.num_injections, opts.jobs)
+            print(f'{name:<40}{rate:>10.1f} injections/sec')
+    finally:
+        server.terminate()
+        server.wait()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
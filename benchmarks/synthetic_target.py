@@ -0,0 +1,276 @@
+"""Generate a synthetic application vulnerable to format() injection.
+
+Run from the repository root with, e.g.:
+
+    python benchmarks/synthetic_target.py /tmp/target --modules 4
+
+The generated directory holds ``synth_mod_<i>.py`` modules of classes and an
+entry script, ``synth_target.py``, whose ``Root`` object reaches all of them
+through its module's globals. The entry script formats injections against a
+``Root`` instance passed with ``--inject INJECTION``, or read line by line
+with ``--stdin``, or from the paths of HTTP requests to ``--http PORT``.
+
+"""
+
+import os
+import sys
+
+from argparse import (
+    ArgumentParser,
+    Namespace)
+from typing import (
+    List,
+    NamedTuple)
+
+ENTRY_MODULE_NAME = 'synth_target'
+
+ENTRY_TEMPLATE = '''\
+"""Synthetic entry point vulnerable to format() injection."""
+
+import sys
+
+{imports}
+
+
+class Root:
+    """The object that injections are formatted against."""
+
+    def __init__(self):
+        self.modules = ({module_names})
+
+
+def serve_http(port):
+    # imported here, so that only the generated modules are module globals
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import unquote
+
+    class InjectionHandler(BaseHTTPRequestHandler):
+
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            injection = unquote(self.path.lstrip('/'))
+            try:
+                body = injection.format(Root()).encode('utf-8')
+            except Exception as e:
+                body = str(e).encode('utf-8')
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+
+        daemon_threads = True
+
+    ThreadingHTTPServer(('localhost', port), InjectionHandler).serve_forever()
+
+
+def main():
+    if sys.argv[1] == '--inject':
+        print(sys.argv[2].format(Root()))
+    elif sys.argv[1] == '--stdin':
+        for line in sys.stdin:
+            try:
+                print(line.rstrip('\\n').format(Root()), flush=True)
+            except Exception as e:
+                print(e, flush=True)
+    elif sys.argv[1] == '--http':
+        serve_http(int(sys.argv[2]))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+'''
+
+
+class TargetShape(NamedTuple):
+    """The dimensions of a generated target."""
+
+    modules: int
+    classes_per_module: int
+    inheritance_depth: int
+    functions_per_class: int
+    constants_per_function: int
+    closures: bool
+
+
+def get_parsed_args(
+) -> Namespace:
+    """Get the parsed command-line arguments."""
+    parser = ArgumentParser(
+        description='generate a synthetic target vulnerable to format() '
+                    'injection')
+    add_shape_args(parser)
+
+    parser.add_argument(
+        'out_dir',
+        action='store',
+        help='the directory to write the target into')
+
+    return parser.parse_args()
+
+
+def add_shape_args(
+    parser: ArgumentParser
+) -> None:
+    """Add the options describing a :class:`TargetShape` to a parser."""
+    parser.add_argument(
+        '--modules',
+        action='store',
+        type=int,
+        default=2,
+        help='the number of generated modules')
+
+    parser.add_argument(
+        '--classes-per-module',
+        action='store',
+        type=int,
+        default=4,
+        help='the number of classes in each module')
+
+    parser.add_argument(
+        '--inheritance-depth',
+        action='store',
+        type=int,
+        default=2,
+        help='the length of the chains of classes inheriting from one another')
+
+    parser.add_argument(
+        '--functions-per-class',
+        action='store',
+        type=int,
+        default=3,
+        help='the number of methods in each class')
+
+    parser.add_argument(
+        '--constants-per-function',
+        action='store',
+        type=int,
+        default=4,
+        help='the number of constants in each method')
+
+    parser.add_argument(
+        '--no-closures',
+        action='store_true',
+        default=False,
+        help='do not nest a closure and a lambda in each method')
+
+
+def get_shape(
+    opts: Namespace
+) -> TargetShape:
+    """Get the :class:`TargetShape` from options added by add_shape_args."""
+    return TargetShape(
+        modules=opts.modules,
+        classes_per_module=opts.classes_per_module,
+        inheritance_depth=opts.inheritance_depth,
+        functions_per_class=opts.functions_per_class,
+        constants_per_function=opts.constants_per_function,
+        closures=not opts.no_closures)
+
+
+def gen_function_src(
+    name: str,
+    num_constants: int,
+    closures: bool
+) -> List[str]:
+    """Generate the lines of a method, with its constants and closures."""
+    lines = [f'    def {name}(self, x):']
+    const_names = []
+    for i in range(num_constants):
+        const_name = f'c_{i}'
+        const_value = repr(f'{name}_{i}') if i % 2 else repr(i * 7)
+        lines.append(f'        {const_name} = {const_value}')
+        const_names.append(const_name)
+
+    if closures:
+        lines.extend([
+            '',
+            '        def closure(y):',
+            '            return (x, y)',
+            '',
+            '        adder = lambda y: y + 1  # noqa: E731',
+        ])
+        const_names.extend(['closure(x)', 'adder(x)'])
+
+    lines.append(f'        return ({", ".join(const_names + ["x"])})')
+    return lines
+
+
+def gen_module_src(
+    module_index: int,
+    shape: TargetShape
+) -> str:
+    """Generate the source of one of the target's modules."""
+    lines = [
+        f'"""Synthetic module {module_index}."""',
+        '',
+        f'MODULE_CONSTANT = {module_index}',
+    ]
+
+    for class_index in range(shape.classes_per_module):
+        class_name = f'Class{module_index}_{class_index}'
+        if class_index % max(shape.inheritance_depth, 1):
+            base_name = f'Class{module_index}_{class_index - 1}'
+        else:
+            base_name = 'object'
+
+        lines.extend([
+            '',
+            '',
+            f'class {class_name}({base_name}):',
+            f'    """Synthetic class {module_index}.{class_index}."""',
+        ])
+        for function_index in range(shape.functions_per_class):
+            lines.append('')
+            lines.extend(gen_function_src(
+                f'method_{class_index}_{function_index}',
+                shape.constants_per_function,
+                shape.closures))
+
+    return '\n'.join(lines) + '\n'
+
+
+def generate_target(
+    out_dir: str,
+    shape: TargetShape
+) -> str:
+    """Write a synthetic target into a directory.
+
+    Returns:
+        The path of the target's entry script.
+
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    module_names = [f'synth_mod_{i}' for i in range(shape.modules)]
+    for i, module_name in enumerate(module_names):
+        with open(os.path.join(out_dir, f'{module_name}.py'), 'w') as f:
+            f.write(gen_module_src(i, shape))
+
+    entry_path = os.path.join(out_dir, f'{ENTRY_MODULE_NAME}.py')
+    with open(entry_path, 'w') as f:
+        f.write(ENTRY_TEMPLATE.format(
+            imports='\n'.join(f'import {name}' for name in module_names),
+            module_names=''.join(f'{name}, ' for name in module_names)))
+
+    return entry_path
+
+
+def main(
+) -> int:
+    opts = get_parsed_args()
+    entry_path = generate_target(opts.out_dir, get_shape(opts))
+    print(entry_path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,24 @@
+"""A REPL-style application vulnerable to format() injection.
+
+Each line read from stdin is formatted with an object from the command-line
+application and printed, until stdin is closed.
+
+"""
+
+import sys
+
+from vulnerable_cli_app import (
+    Dummy)
+
+
+def main():
+    dummy = Dummy()
+    for line in sys.stdin:
+        try:
+            print(line.rstrip('\n').format(dummy))
+        except Exception as e:
+            print(f'error: {e}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""A line-based TCP service vulnerable to format() injection."""
+
+import sys
+
+from socketserver import (
+    StreamRequestHandler,
+    ThreadingTCPServer)
+
+from vulnerable_cli_app import (
+    Dummy)
+
+
+class InjectionHandler(StreamRequestHandler):
+
+    def handle(self):
+        dummy = Dummy()
+        self.wfile.write(b'Welcome! Send lines to format.\n')
+        for line in self.rfile:
+            try:
+                response = line.decode('utf-8').rstrip('\n').format(dummy)
+            except Exception as e:
+                response = f'error: {e}'
+            self.wfile.write(f'{response}\n'.encode('utf-8'))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print('Expected one argument: the port number')
+
+    port = int(sys.argv[1])
+    ThreadingTCPServer.allow_reuse_address = True
+    with ThreadingTCPServer(('localhost', port), InjectionHandler) as server:
+        server.serve_forever()
@@ -1,9 +1,25 @@
 from .harnesses import (  # noqa
     AbstractInjectionHarness,
+    AdaptiveInjectionHarness,
+    AsyncAbstractInjectionHarness,
+    AsyncSubprocessInjectionHarness,
+    CachingInjectionHarness,
+    DelegatingInjectionHarness,
+    ForkServerInjectionHarness,
+    HttpInjectionHarness,
+    InProcessInjectionHarness,
+    RecordingInjectionHarness,
+    ReplayInjectionHarness,
+    RetryingInjectionHarness,
+    SingleFlightInjectionHarness,
+    SocketInjectionHarness,
+    SpeculativeInjectionHarness,
+    StdinInjectionHarness,
     SubprocessInjectionHarness)
 from .walkers import (  # noqa
     AbstractInjectionWalker,
     AttributeInjectionWalker,
+    ChildWalk,
     ClassInjectionWalker,
     CodeObjectInjectionWalker,
     CodeObjectFieldInjectionWalker,
@@ -1,6 +1,8 @@
 """Command-line interface for formatic."""
 
+import cProfile
 import sys
+import time
 
 from argparse import (
     ArgumentParser,
@@ -25,12 +27,36 @@ from xdis.magics import (
     python_versions as supported_bytecode_versions)
 
 from .defaults import (
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_DECOMPILE_WORKERS,
+    DEFAULT_INJECTION_BATCH_SIZE,
     DEFAULT_INJECTION_MARKER,
-    DEFAULT_INJECTION_RESPONSE_MARKER_LEN)
+    DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+    DEFAULT_PROBE_TIMEOUT,
+    DEFAULT_RETRY_MAX_ATTEMPTS,
+    DEFAULT_SPECULATIVE_WORKERS,
+    DEFAULT_TRAVERSAL,
+    TRAVERSALS)
 from .harnesses import (
+    AbstractInjectionHarness,
+    AdaptiveInjectionHarness,
+    CachingInjectionHarness,
+    ForkServerInjectionHarness,
+    HttpInjectionHarness,
+    RecordingInjectionHarness,
+    ReplayInjectionHarness,
+    RetryingInjectionHarness,
+    SingleFlightInjectionHarness,
+    SocketInjectionHarness,
+    SpeculativeInjectionHarness,
+    StdinInjectionHarness,
     SubprocessInjectionHarness)
 from .injection_engine import (
     InjectionEngine)
+from .profiling import (
+    profiler)
+from .tracing import (
+    tracer)
 from .version import (
     __version__)
 from .walkers import (
@@ -49,7 +75,10 @@ def print_py_src(
     code: str
 ) -> None:
     """Print highlighted Python 3 source code to the terminal."""
-    print(highlight(code, Python3Lexer(), TerminalFormatter()))
+    with profiler.phase('render'):
+        highlighted_code = highlight(
+            code, Python3Lexer(), TerminalFormatter())
+    print(highlighted_code)
 
 
 class CustomArgumentParser(ArgumentParser):
@@ -68,7 +97,7 @@ def get_parsed_args(
     """Get the parsed command-line arguments."""
     parser = CustomArgumentParser(
         prog='formatic',
-        usage='formatic [OPTIONS] COMMAND',
+        usage='formatic [OPTIONS] (COMMAND | --url URL)',
         description=(r"""
             ___                                     _    _
           .' ..]                                   / |_ (_)
@@ -126,6 +155,127 @@ def get_parsed_args(
         help='the length of the randomly-generated alphanumeric string that\n'
              'will be used to extract results from injected payload responses')
 
+    parser.add_argument(
+        '-n', '--batch-size',
+        action='store',
+        type=int,
+        default=DEFAULT_INJECTION_BATCH_SIZE,
+        help='the maximum number of format fields to pack into a single\n'
+             'injection; specify 1 to send every field in its own request;\n'
+             f'defaults to {DEFAULT_INJECTION_BATCH_SIZE}')
+
+    parser.add_argument(
+        '-t', '--timeout',
+        action='store',
+        type=float,
+        default=DEFAULT_PROBE_TIMEOUT,
+        help='the seconds to wait for the response to each injection;\n'
+             f'defaults to {DEFAULT_PROBE_TIMEOUT:g}')
+
+    parser.add_argument(
+        '--cache-file',
+        action='store',
+        required=False,
+        help='a database file in which to persist injection responses\n'
+             'between runs against the same target; payloads found in it\n'
+             'are never re-sent')
+
+    parser.add_argument(
+        '--cache-size',
+        action='store',
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help='the number of injection responses to cache in memory;\n'
+             f'defaults to {DEFAULT_CACHE_SIZE}')
+
+    parser.add_argument(
+        '--speculate',
+        action='store_true',
+        default=False,
+        help='send the injections that walkers are known to send next in\n'
+             'the background, as soon as the objects they walk are found')
+
+    parser.add_argument(
+        '--speculative-workers',
+        action='store',
+        type=int,
+        default=DEFAULT_SPECULATIVE_WORKERS,
+        help='the number of requests that --speculate may have in flight\n'
+             f'at once; defaults to {DEFAULT_SPECULATIVE_WORKERS}')
+
+    parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        default=False,
+        help='adjust the number of requests in flight to how the target\n'
+             'copes with them, and pause when the target looks down')
+
+    parser.add_argument(
+        '--max-rps',
+        action='store',
+        type=float,
+        default=None,
+        help='the most requests to send to the target per second; implies\n'
+             '--adaptive')
+
+    parser.add_argument(
+        '--max-attempts',
+        action='store',
+        type=int,
+        default=DEFAULT_RETRY_MAX_ATTEMPTS,
+        help='the most times to send a request that was lost to a\n'
+             'connection error, waiting longer before each retry;\n'
+             f'defaults to {DEFAULT_RETRY_MAX_ATTEMPTS}')
+
+    parser.add_argument(
+        '--retry-failures',
+        action='store_true',
+        default=False,
+        help='also retry injections that got no response at all (e.g.,\n'
+             'that timed out), up to --max-attempts times; payloads that\n'
+             'the target rejected are not retried')
+
+    parser.add_argument(
+        '--hedge',
+        action='store_true',
+        default=False,
+        help='send a request a second time if it is slower than 95%% of\n'
+             'recent requests with as many payloads, and use whichever\n'
+             'response arrives first')
+
+    parser.add_argument(
+        '-j', '--jobs',
+        action='store',
+        type=int,
+        default=1,
+        help='the number of walks to run concurrently; results are still\n'
+             'reported in the same order as a sequential run')
+
+    parser.add_argument(
+        '--decompile-workers',
+        action='store',
+        type=int,
+        default=DEFAULT_DECOMPILE_WORKERS,
+        help='the number of processes decompiling recovered code objects\n'
+             'while the crawl continues; specify 0 to decompile inline;\n'
+             'defaults to the number of CPUs')
+
+    parser.add_argument(
+        '--traversal',
+        action='store',
+        choices=TRAVERSALS,
+        default=DEFAULT_TRAVERSAL,
+        help='how walks are driven; the stack traversal yields results\n'
+             'at the same cost at any depth and cannot exceed the\n'
+             'recursion limit; both report results in the same order')
+
+    parser.add_argument(
+        '--decompile-cache',
+        action='store',
+        required=False,
+        help='a database file in which to persist decompiled source code\n'
+             'between runs; identical code objects are only decompiled once')
+
     parser.add_argument(
         '-b', '--bytecode-version',
         action='store',
@@ -133,9 +283,135 @@ def get_parsed_args(
         choices=sorted(supported_bytecode_versions),
         help='the Python bytecode version to use for function decompilation')
 
+    parser.add_argument(
+        '--fork-server',
+        action='store_true',
+        default=False,
+        help='start COMMAND, which must be a Python interpreter followed by\n'
+             'a script or -m and a module, only once and fork it for each\n'
+             'injection; only available on POSIX systems')
+
+    parser.add_argument(
+        '--stdin',
+        action='store_true',
+        default=False,
+        help='start COMMAND only once per job and write each injection to\n'
+             'its stdin as a line, for targets that format() lines in a loop')
+
+    parser.add_argument(
+        '--stdin-line',
+        action='store',
+        required=False,
+        metavar='TEMPLATE',
+        help='the line to write with --stdin, containing the injection\n'
+             'marker; defaults to the bare injection')
+
+    parser.add_argument(
+        '--stats',
+        action='store_true',
+        default=False,
+        help='print a summary of the requests made by each walker type,\n'
+             'the bytes transferred, and request latencies when done')
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        default=False,
+        help='print the time spent sending injections (network), parsing\n'
+             'responses (parse), decompiling, and highlighting source code\n'
+             '(render) when done; times are summed across jobs and\n'
+             'decompilation workers')
+
+    parser.add_argument(
+        '--profile-output',
+        action='store',
+        required=False,
+        metavar='PATH',
+        help='write cProfile statistics of the main thread to this file')
+
+    parser.add_argument(
+        '--trace',
+        action='store',
+        required=False,
+        metavar='PATH',
+        help='write a timeline of every walk and injection sent to this\n'
+             'file, in the trace-event format of chrome://tracing and\n'
+             'Perfetto')
+
+    parser.add_argument(
+        '--record',
+        action='store',
+        required=False,
+        metavar='PATH',
+        help='record the response to every payload sent to the target in\n'
+             'this file, for use with --replay')
+
+    parser.add_argument(
+        '--replay',
+        action='store',
+        required=False,
+        metavar='PATH',
+        help='answer payloads from a file written by --record instead of\n'
+             'contacting a target')
+
+    parser.add_argument(
+        '--replay-latency',
+        action='store',
+        type=float,
+        default=0.0,
+        metavar='SECONDS',
+        help='the time that each request answered by --replay takes;\n'
+             'defaults to 0')
+
+    parser.add_argument(
+        '-u', '--url',
+        action='store',
+        required=False,
+        help='inject into an HTTP service at this URL instead of running\n'
+             'COMMAND; the injection marker may be placed in the URL, the\n'
+             'request body, or a header value')
+
+    parser.add_argument(
+        '-X', '--method',
+        action='store',
+        required=False,
+        help='the HTTP method to use with --url; defaults to GET, or POST\n'
+             'when --data is specified')
+
+    parser.add_argument(
+        '-D', '--data',
+        action='store',
+        required=False,
+        help='the HTTP request body to send with --url')
+
+    parser.add_argument(
+        '-H', '--header',
+        action='append',
+        default=[],
+        metavar='NAME:VALUE',
+        help='an HTTP header to send with --url; may be repeated')
+
+    parser.add_argument(
+        '--tcp',
+        action='store',
+        required=False,
+        metavar='HOST:PORT',
+        help='inject into a TCP service at this address instead of running\n'
+             'COMMAND, sending one injection per line over persistent\n'
+             'connections')
+
+    parser.add_argument(
+        '--tcp-request',
+        action='store',
+        required=False,
+        metavar='TEMPLATE',
+        help='the request to send with --tcp, containing the injection\n'
+             'marker; backslash escapes such as \\n are interpreted;\n'
+             'defaults to the injection followed by a newline')
+
     parser.add_argument(
         'command',
-        nargs='+',
+        nargs='*',
         metavar='COMMAND',
         help='the arguments of the command to run for injecting format\n'
              'strings into the vulnerable program; this will be run many\n'
@@ -144,38 +420,237 @@ def get_parsed_args(
     return parser.parse_args()
 
 
+def get_harness(
+    opts: Namespace
+) -> AbstractInjectionHarness:
+    """Build the injection harness described by the parsed arguments.
+
+    Raises:
+        ValueError: If the arguments do not describe exactly one harness.
+
+    """
+    marker_kwargs = dict(
+        injection_marker=opts.injection_marker,
+        response_marker=opts.response_marker,
+        rand_response_marker_len=opts.random_response_marker_length,
+        batch_size=opts.batch_size)
+
+    if opts.replay is not None:
+        if opts.command or opts.url is not None or opts.tcp is not None:
+            raise ValueError(
+                'COMMAND, --url, and --tcp cannot be used with --replay')
+        elif opts.record is not None:
+            raise ValueError('--record cannot be used with --replay')
+
+        return ReplayInjectionHarness(
+            opts.replay,
+            latency=opts.replay_latency,
+            batch_size=opts.batch_size)
+
+    if opts.url is not None:
+        if opts.tcp is not None:
+            raise ValueError('--url cannot be used with --tcp')
+        elif opts.command:
+            raise ValueError('COMMAND cannot be specified along with --url')
+        elif opts.fork_server:
+            raise ValueError('--fork-server cannot be used with --url')
+        elif opts.stdin:
+            raise ValueError('--stdin cannot be used with --url')
+
+        headers = {}
+        for header in opts.header:
+            name, sep, value = header.partition(':')
+            if not sep:
+                raise ValueError(
+                    f'Expected header in NAME:VALUE format but got {header}')
+            headers[name.strip()] = value.strip()
+
+        return HttpInjectionHarness(
+            opts.url,
+            method=opts.method,
+            body=opts.data,
+            headers=headers,
+            timeout=opts.timeout,
+            **marker_kwargs)
+
+    if opts.tcp_request is not None and opts.tcp is None:
+        raise ValueError('--tcp-request can only be used with --tcp')
+
+    if opts.tcp is not None:
+        if opts.command:
+            raise ValueError('COMMAND cannot be specified along with --tcp')
+        elif opts.fork_server or opts.stdin:
+            raise ValueError(
+                '--fork-server and --stdin cannot be used with --tcp')
+
+        host, sep, port = opts.tcp.rpartition(':')
+        if not sep or not port.isdigit():
+            raise ValueError(
+                f'Expected address in HOST:PORT format but got {opts.tcp}')
+
+        request_template = opts.tcp_request
+        if request_template is not None:
+            request_template = request_template.encode(
+                'latin-1', 'backslashreplace').decode('unicode_escape')
+
+        return SocketInjectionHarness(
+            host.strip('[]'),
+            int(port),
+            request_template=request_template,
+            pool_size=max(opts.jobs, 1),
+            timeout=opts.timeout,
+            **marker_kwargs)
+
+    if not opts.command:
+        raise ValueError('Either COMMAND, --url, or --tcp must be specified')
+
+    if opts.stdin_line is not None and not opts.stdin:
+        raise ValueError('--stdin-line can only be used with --stdin')
+
+    if opts.fork_server:
+        if opts.stdin:
+            raise ValueError('--fork-server cannot be used with --stdin')
+        return ForkServerInjectionHarness(
+            opts.command, timeout=opts.timeout, **marker_kwargs)
+    elif opts.stdin:
+        return StdinInjectionHarness(
+            opts.command,
+            line_template=opts.stdin_line,
+            pool_size=max(opts.jobs, 1),
+            timeout=opts.timeout,
+            **marker_kwargs)
+
+    return SubprocessInjectionHarness(
+        opts.command, timeout=opts.timeout, **marker_kwargs)
+
+
 def main(
 ) -> int:
     try:
         colorama_init()
         opts = get_parsed_args()
 
-        harness = SubprocessInjectionHarness(
-            opts.command,
-            injection_marker=opts.injection_marker,
-            response_marker=opts.response_marker,
-            rand_response_marker_len=opts.random_response_marker_length)
-        injection_engine = InjectionEngine(harness)
-
-        print_info('Beginning enumeration of remote service...')
-
-        walker_iter = injection_engine.run(
-            opts.injection_index, opts.bytecode_version)
-        for walker in walker_iter:
-            if opts.verbosity >= 1:
-                if isinstance(walker, FailedInjectionWalker):
-                    print_warn(walker)
-                else:
-                    print_info(walker)
-
-            if (isinstance(walker, ClassInjectionWalker) and
-                    walker.src_code is not None):
-                print_info('Recovered class source code:')
-                print_py_src(walker.src_code)
-            elif (isinstance(walker, FunctionInjectionWalker) and
-                    walker.src_code is not None):
-                print_info('Recovered function source code:')
-                print_py_src(walker.src_code)
+        target_harness = get_harness(opts)
+        sending_harness: AbstractInjectionHarness = target_harness
+        adaptive_harness = None
+        if opts.adaptive or opts.max_rps is not None:
+            max_concurrency = opts.jobs
+            if opts.speculate:
+                max_concurrency += opts.speculative_workers
+            adaptive_harness = AdaptiveInjectionHarness(
+                target_harness,
+                max_concurrency=max_concurrency,
+                max_rps=opts.max_rps)
+            sending_harness = adaptive_harness
+        retrying_harness = RetryingInjectionHarness(
+            sending_harness,
+            max_attempts=opts.max_attempts,
+            retry_failures=opts.retry_failures,
+            hedge=opts.hedge)
+        sending_harness = retrying_harness
+        if opts.record is not None:
+            sending_harness = RecordingInjectionHarness(
+                sending_harness, opts.record)
+
+        harness = CachingInjectionHarness(
+            sending_harness,
+            max_size=opts.cache_size,
+            cache_path=opts.cache_file)
+        single_flight_harness = SingleFlightInjectionHarness(harness)
+        engine_harness: AbstractInjectionHarness = single_flight_harness
+        if opts.speculate:
+            engine_harness = SpeculativeInjectionHarness(
+                single_flight_harness, workers=opts.speculative_workers)
+
+        try:
+            injection_engine = InjectionEngine(
+                engine_harness,
+                jobs=opts.jobs,
+                decompile_workers=opts.decompile_workers,
+                decompile_cache_path=opts.decompile_cache,
+                traversal=opts.traversal)
+
+            if opts.profile:
+                profiler.enable()
+            if opts.trace is not None:
+                tracer.enable()
+            c_profiler = None
+            if opts.profile_output is not None:
+                c_profiler = cProfile.Profile()
+                c_profiler.enable()
+
+            print_info('Beginning enumeration of remote service...')
+
+            start = time.perf_counter()
+            walker_iter = injection_engine.run(
+                opts.injection_index, opts.bytecode_version)
+            for walker in walker_iter:
+                if opts.verbosity >= 1:
+                    if isinstance(walker, FailedInjectionWalker):
+                        print_warn(walker)
+                    else:
+                        print_info(walker)
+
+                if (isinstance(walker, ClassInjectionWalker) and
+                        walker.src_code is not None):
+                    print_info('Recovered class source code:')
+                    print_py_src(walker.src_code)
+                elif (isinstance(walker, FunctionInjectionWalker) and
+                        walker.src_code is not None):
+                    print_info('Recovered function source code:')
+                    print_py_src(walker.src_code)
+
+            wall_time = time.perf_counter() - start
+            if c_profiler is not None:
+                c_profiler.disable()
+                c_profiler.dump_stats(opts.profile_output)
+            if opts.trace is not None:
+                tracer.write(opts.trace)
+        finally:
+            engine_harness.close()
+
+        if opts.verbosity >= 1:
+            print_info(
+                f'Response cache saved {harness.hits} injections '
+                f'({harness.misses} were sent to the target)')
+            print_info(
+                f'Coalesced {single_flight_harness.coalesced} injections '
+                'with identical ones in flight')
+            print_info(
+                'Decompilation cache saved '
+                f'{injection_engine.decompiler.hits} decompilations')
+            if isinstance(engine_harness, SpeculativeInjectionHarness):
+                print_info(
+                    f'Speculatively sent {engine_harness.num_speculated} '
+                    f'injections ({engine_harness.num_used} were used)')
+            print_info(
+                f'Retried {retrying_harness.num_retries} requests; hedged '
+                f'{retrying_harness.num_hedged} slow requests '
+                f'({retrying_harness.num_hedges_won} hedges answered first)')
+            if adaptive_harness is not None:
+                print_info(
+                    'Adaptive concurrency limit ended at '
+                    f'{adaptive_harness.limit} after '
+                    f'{adaptive_harness.num_decreases} decreases; target was '
+                    f'down {adaptive_harness.num_outages} times and '
+                    f'{adaptive_harness.num_retries} requests were retried')
+            if isinstance(target_harness, ReplayInjectionHarness):
+                print_info(
+                    f'Replayed {target_harness.num_requests} requests '
+                    f'({target_harness.num_unrecorded} payloads were not '
+                    'recorded)')
+
+        if opts.stats:
+            print_info('Injection statistics:')
+            for line in injection_engine.stats.summary():
+                print_info(line)
+
+        if opts.profile:
+            profiler.add(
+                'decompile', injection_engine.decompiler.decompile_time)
+            print_info('Time spent per phase:')
+            for line in profiler.summary(wall_time):
+                print_info(line)
 
         print_info('Completed execution!')
     except ValueError as e:
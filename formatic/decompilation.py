@@ -0,0 +1,272 @@
+"""Decompilation of recovered code objects, optionally in worker processes."""
+
+import dbm
+import hashlib
+import marshal
+import time
+
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor)
+from io import (
+    StringIO)
+from threading import (
+    Lock)
+from types import (
+    CodeType)
+from typing import (
+    Any,
+    Dict,
+    Optional,
+    Tuple)
+from uncompyle6.main import (
+    decompile)
+from xdis.magics import (
+    py_str2float)
+
+from .defaults import (
+    DEFAULT_DECOMPILE_WORKERS)
+
+
+class DecompilationError(Exception):
+    """Raised when a code object could not be decompiled."""
+
+
+def describe_decompilation_error(
+    e: Exception
+) -> str:
+    """Summarize an error raised while decompiling in one line.
+
+    Errors like uncompyle6's ``ParserError`` span many lines of disassembly,
+    and hold references to modules that keep them from being pickled back
+    from a worker process.
+
+    """
+    lines = [line.strip() for line in str(e).splitlines() if line.strip()]
+    summary = e.__class__.__qualname__
+    if lines:
+        summary += f': {lines[0]}'
+    return summary
+
+
+def decompile_code_obj(
+    code_obj: CodeType,
+    bytecode_version: str
+) -> str:
+    """Decompile a code object into the source code of its body."""
+    bytecode_version_float = py_str2float(bytecode_version)
+    with StringIO() as f:
+        decompile(bytecode_version_float, code_obj, out=f)
+        raw_decompiled_src_body = f.getvalue()
+
+    decompiled_src_body = raw_decompiled_src_body.replace('\n\n\n', '\n\n')
+    lines = [
+        line for line in decompiled_src_body.splitlines()
+        if not line.lstrip().startswith('# ')]
+    return '\n'.join(lines)
+
+
+def _timed_decompile_marshalled_code_obj(
+    marshalled_code_obj: bytes,
+    bytecode_version: str
+) -> Tuple[Optional[str], Optional[str], float]:
+    """Decompile a marshalled code object in a worker process.
+
+    Returns:
+        The decompiled source code, or None along with a description of the
+        error if decompilation failed, and the seconds spent decompiling.
+
+    """
+    start = time.perf_counter()
+    try:
+        code_obj = marshal.loads(marshalled_code_obj)
+        src_code = decompile_code_obj(code_obj, bytecode_version)
+    except Exception as e:
+        return None, describe_decompilation_error(e), 0.0
+
+    return src_code, None, time.perf_counter() - start
+
+
+class Decompiler:
+    """Decompiles code objects, in parallel with the rest of a crawl.
+
+    With ``workers`` greater than zero, code objects are marshalled to a pool
+    of that many worker processes, so that CPU-bound decompilation proceeds
+    while walkers continue to send injections. With zero workers, code
+    objects are decompiled in the calling thread.
+
+    Results are cached by a digest of the marshalled code object and its
+    bytecode version, so identical code objects are only decompiled once.
+    With a ``cache_path``, the cache is persisted in a ``dbm`` database, and
+    rescanning an already-decompiled target costs no decompilation at all.
+
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_DECOMPILE_WORKERS,
+        cache_path: Optional[str] = None
+    ) -> None:
+        if workers < 0:
+            raise ValueError(
+                'workers must be a non-negative integer; '
+                f'{workers} is not acceptable')
+        self._workers = workers
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = Lock()
+        self._decompile_time = 0.0
+
+        self._cache_path = cache_path
+        self._disk_cache: Optional[Any] = None
+        self._src_futures: Dict[bytes, 'Future[str]'] = {}
+        self._hits = 0
+
+    def start(
+        self
+    ) -> None:
+        """Start the worker processes, if any.
+
+        Workers are forked up front, before the crawl spawns any threads of
+        its own. The on-disk cache, if any, is opened here as well.
+
+        """
+        with self._lock:
+            if self._cache_path is not None and self._disk_cache is None:
+                self._disk_cache = dbm.open(self._cache_path, 'c')
+
+        if self._workers == 0 or self._executor is not None:
+            return
+
+        self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        self._executor.submit(int).result()
+
+    def shutdown(
+        self
+    ) -> None:
+        """Stop the worker processes, once they finish any pending work.
+
+        The on-disk cache, if any, is closed once all results are stored.
+
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        with self._lock:
+            if self._disk_cache is not None:
+                self._disk_cache.close()
+                self._disk_cache = None
+
+    def submit(
+        self,
+        code_obj: CodeType,
+        bytecode_version: str
+    ) -> 'Future[str]':
+        """Schedule a code object for decompilation.
+
+        Returns:
+            A future resolving to the decompiled source code of the code
+            object's body; identical code objects share the same future. If
+            the code object cannot be decompiled, the future raises a
+            :class:`DecompilationError`.
+
+        """
+        # marshal format 2 is hashed, as the back-references of later formats
+        # depend on object reference counts and are not reproducible
+        digest = hashlib.sha256(
+            bytecode_version.encode('utf-8') + b'\0' +
+            marshal.dumps(code_obj, 2)).digest()
+
+        with self._lock:
+            cached_src_future = self._src_futures.get(digest)
+            if cached_src_future is not None:
+                self._hits += 1
+                return cached_src_future
+
+            src_future: 'Future[str]' = Future()
+            self._src_futures[digest] = src_future
+
+            raw_src_code = None
+            if self._disk_cache is not None:
+                raw_src_code = self._disk_cache.get(digest)
+            if raw_src_code is not None:
+                self._hits += 1
+                src_future.set_result(raw_src_code.decode('utf-8'))
+                return src_future
+
+        if self._executor is None:
+            start = time.perf_counter()
+            try:
+                src_code = decompile_code_obj(code_obj, bytecode_version)
+            except Exception as e:
+                src_future.set_exception(
+                    DecompilationError(describe_decompilation_error(e)))
+            else:
+                self._store(digest, src_code, time.perf_counter() - start)
+                src_future.set_result(src_code)
+            return src_future
+
+        def on_done(
+            timed_future: 'Future[Tuple[Optional[str], Optional[str], float]]'
+        ) -> None:
+            try:
+                src_code, error, elapsed = timed_future.result()
+            except Exception as e:
+                # e.g., the worker process died
+                error = describe_decompilation_error(e)
+                src_code = None
+
+            if src_code is None:
+                src_future.set_exception(DecompilationError(error))
+                return
+
+            self._store(digest, src_code, elapsed)
+            src_future.set_result(src_code)
+
+        timed_future = self._executor.submit(
+            _timed_decompile_marshalled_code_obj,
+            marshal.dumps(code_obj),
+            bytecode_version)
+        timed_future.add_done_callback(on_done)
+        return src_future
+
+    def _store(
+        self,
+        digest: bytes,
+        src_code: str,
+        elapsed: float
+    ) -> None:
+        """Record a decompilation's result and the time it took."""
+        with self._lock:
+            self._decompile_time += elapsed
+            if self._disk_cache is not None:
+                self._disk_cache[digest] = src_code.encode('utf-8')
+
+    @property
+    def workers(
+        self
+    ) -> int:
+        """The number of worker processes; zero decompiles inline."""
+        return self._workers
+
+    @property
+    def cache_path(
+        self
+    ) -> Optional[str]:
+        """The path of the on-disk decompilation cache, if one is in use."""
+        return self._cache_path
+
+    @property
+    def hits(
+        self
+    ) -> int:
+        """The number of code objects whose source came from the cache."""
+        return self._hits
+
+    @property
+    def decompile_time(
+        self
+    ) -> float:
+        """The total seconds spent decompiling, summed across all workers."""
+        return self._decompile_time
@@ -1,10 +1,46 @@
 """Default values for use in the CLI and library."""
 
+import os
+
 from typing import (
     Set)
 
 DEFAULT_INJECTION_MARKER = '@@'
 DEFAULT_INJECTION_RESPONSE_MARKER_LEN = 16
+DEFAULT_INJECTION_BATCH_SIZE = 32
+DEFAULT_MAX_SUBPROCESSES = 16
+DEFAULT_PROBE_TIMEOUT = 10.0
+DEFAULT_STDIN_POOL_SIZE = 4
+
+DEFAULT_HTTP_POOL_SIZE = 8
+DEFAULT_HTTP_TIMEOUT = 10.0
+
+DEFAULT_SOCKET_POOL_SIZE = 8
+
+DEFAULT_ADAPTIVE_MAX_CONCURRENCY = 16
+DEFAULT_ADAPTIVE_LATENCY_FACTOR = 4.0
+DEFAULT_ADAPTIVE_RECOVERY_TIMEOUT = 60.0
+DEFAULT_ADAPTIVE_PROBE_INTERVAL = 0.5
+DEFAULT_ADAPTIVE_MAX_PROBE_INTERVAL = 8.0
+DEFAULT_ADAPTIVE_RETRIES = 3
+
+DEFAULT_RETRY_MAX_ATTEMPTS = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+DEFAULT_RETRY_MAX_BACKOFF = 8.0
+DEFAULT_HEDGE_PERCENTILE = 0.95
+DEFAULT_HEDGE_WINDOW = 100
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_WORKERS = 16
+
+DEFAULT_CACHE_SIZE = 4096
+
+DEFAULT_SPECULATIVE_WORKERS = 4
+
+DEFAULT_DECOMPILE_WORKERS = os.cpu_count() or 1
+DEFAULT_PENDING_WALKER_WINDOW = 64
+
+DEFAULT_TRAVERSAL = 'stack'
+TRAVERSALS = ('recursive', 'stack')
 
 DEFAULT_UNKNOWN_CLASS_NAME: str = '<UNKNOWN CLASS NAME>'
 DEFAULT_UNKNOWN_DOC_STRING: str = '<UNKNOWN DOCSTRING>'
@@ -1,4 +1,34 @@
 from .abstract_injection_harness import (  # noqa
     AbstractInjectionHarness)
+from .adaptive_injection_harness import (  # noqa
+    AdaptiveInjectionHarness)
+from .async_abstract_injection_harness import (  # noqa
+    AsyncAbstractInjectionHarness)
+from .async_subprocess_injection_harness import (  # noqa
+    AsyncSubprocessInjectionHarness)
+from .caching_injection_harness import (  # noqa
+    CachingInjectionHarness)
+from .delegating_injection_harness import (  # noqa
+    DelegatingInjectionHarness)
+from .fork_server_injection_harness import (  # noqa
+    ForkServerInjectionHarness)
+from .http_injection_harness import (  # noqa
+    HttpInjectionHarness)
+from .in_process_injection_harness import (  # noqa
+    InProcessInjectionHarness)
+from .recording_injection_harness import (  # noqa
+    RecordingInjectionHarness)
+from .replay_injection_harness import (  # noqa
+    ReplayInjectionHarness)
+from .retrying_injection_harness import (  # noqa
+    RetryingInjectionHarness)
+from .single_flight_injection_harness import (  # noqa
+    SingleFlightInjectionHarness)
+from .socket_injection_harness import (  # noqa
+    SocketInjectionHarness)
+from .speculative_injection_harness import (  # noqa
+    SpeculativeInjectionHarness)
+from .stdin_injection_harness import (  # noqa
+    StdinInjectionHarness)
 from .subprocess_injection_harness import (  # noqa
     SubprocessInjectionHarness)
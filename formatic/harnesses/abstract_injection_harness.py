@@ -1,28 +1,38 @@
 """Implementation of the AbstractInjectionHarness class."""
 
+import codecs
 import re
+import time
 
 from abc import (
     ABC,
     abstractmethod)
+from queue import (
+    Empty,
+    Queue)
 from typing import (
-    Optional)
+    List,
+    Match,
+    Optional,
+    Sequence)
 
 from ..defaults import (
+    DEFAULT_INJECTION_BATCH_SIZE,
     DEFAULT_INJECTION_MARKER,
     DEFAULT_INJECTION_RESPONSE_MARKER_LEN)
 from ..utils import (
     get_random_alnum)
 
 
-class AbstractInjectionHarness(ABC):
-    """Abstract harness for configuring injection-delivery methods."""
+class BaseInjectionHarness(ABC):
+    """Marker and response-parsing logic shared by all injection harnesses."""
 
     def __init__(
         self,
         injection_marker: Optional[str] = None,
         response_marker: Optional[str] = None,
-        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN
+        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+        batch_size: int = DEFAULT_INJECTION_BATCH_SIZE
     ) -> None:
         super().__init__()
 
@@ -40,32 +50,20 @@ class AbstractInjectionHarness(ABC):
         else:
             self._response_marker = get_random_alnum(rand_response_marker_len)
 
+        if batch_size < 1:
+            raise ValueError(
+                'batch_size must be a positive integer; '
+                f'{batch_size} is not acceptable')
+        self._batch_size = batch_size
+
         self._response_re = re.compile(
             f'{self._response_marker}'
             '(?P<injection_response>.*)'
             f'{self._response_marker}', re.DOTALL)
-
-    @abstractmethod
-    def send_injection(
-        self,
-        payload: str
-    ) -> Optional[str]:
-        """The method used to send injections to a vulnerable service.
-
-        Implementations of this method are encourage to wrap the specified
-        payload in a random marker that makes it easier to extract the raw
-        result from the text.
-
-        As an example, see :class:`SubprocessInjectionHarness`.
-
-        Args:
-            payload: The format string body (without curly braces) to be sent
-                to the vulnerable service.
-
-        Returns:
-            The extracted format string response, if present. Otherwise, None.
-
-        """
+        self._batch_delimiter_re = re.compile(
+            f'{self._response_marker}'
+            r'(?P<index>\d+)'
+            f'{self._response_marker}')
 
     @property
     def injection_marker(
@@ -81,6 +79,29 @@ class AbstractInjectionHarness(ABC):
         """The marker of where to subsitute the generated format() payloads."""
         return self._response_marker
 
+    @property
+    def batch_size(
+        self
+    ) -> int:
+        """The maximum number of payloads packed into one injection."""
+        return self._batch_size
+
+    @property
+    def stable_addresses(
+        self
+    ) -> bool:
+        """Whether objects keep their addresses from one injection to the next.
+
+        This is the case when all injections are formatted by one process, or
+        by processes forked from one, so that the address in a repr like
+        ``<function f at 0x7f...>`` identifies the same object in every
+        response. Harnesses that may start a new process for an injection
+        (e.g., :class:`SubprocessInjectionHarness`) do not have stable
+        addresses; by default, they are assumed not to be.
+
+        """
+        return False
+
     def _mark_payload(
         self,
         payload: str
@@ -88,6 +109,36 @@ class AbstractInjectionHarness(ABC):
         """Surround a payload with :data:`response_markers`s."""
         return f'{self._response_marker}{{{payload}}}{self._response_marker}'
 
+    def _mark_payloads(
+        self,
+        payloads: Sequence[str]
+    ) -> str:
+        """Join payloads into one format string, delimited by indexed markers.
+
+        The i-th payload is preceded by the delimiter ``<marker>i<marker>`` and
+        the whole injection is terminated by ``<marker>n<marker>``, where n is
+        the number of payloads.
+
+        """
+        marker = self._response_marker
+        fields = ''.join(
+            f'{marker}{i}{marker}{{{payload}}}' for
+            i, payload in enumerate(payloads))
+        return f'{fields}{marker}{len(payloads)}{marker}'
+
+    def _count_payloads(
+        self,
+        injection: str
+    ) -> int:
+        """Get the number of payloads packed into an injection.
+
+        This is the number of fields of an injection from
+        :func:`_mark_payloads`, or 1 for any other injection.
+
+        """
+        num_delimiters = len(self._batch_delimiter_re.findall(injection))
+        return max(num_delimiters - 1, 1)
+
     def _parse_response(
         self,
         raw_app_response: str
@@ -108,3 +159,280 @@ class AbstractInjectionHarness(ABC):
             return None
 
         return injection_response
+
+    def _parse_responses(
+        self,
+        raw_app_response: str,
+        num_payloads: int
+    ) -> Optional[List[Optional[str]]]:
+        """Split a raw response to an injection from :func:`_mark_payloads`.
+
+        Args:
+            raw_app_response: The raw textual response returned by the
+                vulnerable application
+            num_payloads: The number of payloads packed into the injection.
+
+        Returns:
+            The per-payload responses, or None if the delimiters of all fields
+            could not be found in the raw response, in order, starting from
+            the first delimiter of the first field. A field whose result holds
+            text looking like a delimiter (e.g., the injection itself echoed
+            back from the target's ``sys.argv``) makes the response ambiguous,
+            so that None is returned for it too.
+
+        """
+        delimiters: List[Match[str]] = list(
+            self._batch_delimiter_re.finditer(raw_app_response))
+        indexes = [int(match.group('index')) for match in delimiters]
+        if 0 not in indexes:
+            return None
+
+        first = indexes.index(0)
+        delimiters = delimiters[first:first + num_payloads + 1]
+        if indexes[first:first + num_payloads + 1] != \
+                list(range(num_payloads + 1)):
+            return None
+
+        return [
+            raw_app_response[start.end():end.start()] or None for
+            start, end in zip(delimiters, delimiters[1:])]
+
+    def _response_complete(
+        self,
+        injection: str,
+        raw_app_response: str
+    ) -> bool:
+        """Whether a partially-read raw response holds an injection's result.
+
+        Injections from :func:`_mark_payload` and :func:`_mark_payloads` end
+        with a response marker after their last replacement field, so their
+        response is complete once that terminator has been read after the
+        text preceding the first replacement field. Injections without any
+        replacement fields are complete at the end of the first line.
+
+        """
+        first_field_start = injection.find('{')
+        last_field_end = injection.rfind('}')
+        if first_field_start == -1 or last_field_end == -1:
+            return '\n' in raw_app_response
+
+        opening = injection[:first_field_start]
+        terminator = injection[last_field_end + 1:]
+        opening_start = raw_app_response.find(opening)
+        if opening_start == -1:
+            return False
+
+        return raw_app_response.find(
+            terminator, opening_start + len(opening)) != -1
+
+    def _response_rejected(
+        self,
+        injection: str,
+        raw_app_response: str
+    ) -> bool:
+        """Whether a raw response ended a line before an injection's result.
+
+        Line-oriented applications answer an injection they fail to format
+        with a line of their own (e.g., ``error: ...``), which never contains
+        the text preceding the injection's first replacement field. Such a
+        response is finished even though it does not hold a result. Blank
+        lines (e.g., the rest of the line holding an earlier result) are
+        ignored.
+
+        """
+        first_field_start = injection.find('{')
+        if first_field_start == -1 or \
+                injection[:first_field_start] in raw_app_response:
+            return False
+
+        lines = raw_app_response.split('\n')[:-1]
+        return any(line.strip() for line in lines)
+
+    def _read_response(
+        self,
+        chunks: 'Queue[Optional[bytes]]',
+        injection: str,
+        timeout: float,
+        line_based: bool = False,
+        stop_at_rejection: bool = False
+    ) -> Optional[str]:
+        """Read a streamed raw response until an injection's result is in it.
+
+        Args:
+            chunks: The chunks of the vulnerable application's output, as put
+                by :func:`~formatic.utils.read_chunks`.
+            injection: The injection whose response is being read.
+            timeout: The seconds to wait for the response to be complete.
+            line_based: Whether the application answers every injection with
+                whole lines, so that the line holding the result is read to
+                its end.
+            stop_at_rejection: Whether to also stop reading once
+                :func:`_response_rejected` holds.
+
+        Returns:
+            The output read up to the point where :func:`_response_complete`
+            (or :func:`_response_rejected`) holds, or all of the output if the
+            stream ended first. None is returned if the timeout expired first.
+
+        """
+        deadline = time.monotonic() + timeout
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        raw_app_response = ''
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            try:
+                chunk = chunks.get(timeout=remaining)
+            except Empty:
+                return None
+            if chunk is None:
+                return raw_app_response + decoder.decode(b'', final=True)
+
+            raw_app_response += decoder.decode(chunk)
+            if self._response_complete(injection, raw_app_response):
+                if not line_based or raw_app_response.endswith('\n'):
+                    return raw_app_response
+            elif stop_at_rejection and \
+                    self._response_rejected(injection, raw_app_response):
+                return raw_app_response
+
+
+class AbstractInjectionHarness(BaseInjectionHarness):
+    """Abstract harness for configuring injection-delivery methods."""
+
+    @abstractmethod
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        """The method used to send injections to a vulnerable service.
+
+        Implementations of this method are encourage to wrap the specified
+        payload in a random marker that makes it easier to extract the raw
+        result from the text.
+
+        As an example, see :class:`SubprocessInjectionHarness`.
+
+        Args:
+            payload: The format string body (without curly braces) to be sent
+                to the vulnerable service.
+
+        Returns:
+            The extracted format string response, if present. Otherwise, None.
+
+        """
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        """Deliver a complete, already-marked format string to the service.
+
+        Harnesses are not required to implement this method, but doing so
+        allows :func:`send_injections` to pack several payloads into a single
+        round-trip to the vulnerable service.
+
+        Args:
+            injection: The full format string to substitute into the target,
+                including curly braces and response markers.
+
+        Returns:
+            The raw textual response of the vulnerable application, or None if
+            no response could be retrieved. A response without the result of
+            the injection (e.g., an error message from the application) is
+            still returned, so that it can be told apart from a lost one.
+
+        Raises:
+            NotImplementedError: If this harness cannot deliver raw format
+                strings.
+
+        """
+        raise NotImplementedError(
+            f'{self.__class__.__qualname__} does not support raw injections')
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        """Send multiple injections, batching them where possible.
+
+        Up to :data:`batch_size` payloads are packed into one format string,
+        with each field surrounded by its own indexed response marker. If one
+        of the fields causes the whole format to fail, the batch is bisected
+        until the failing payloads are isolated, so that the results of the
+        well-behaved payloads are still recovered.
+
+        Harnesses that do not implement :func:`send_raw_injection` fall back
+        to sending each payload with :func:`send_injection`.
+
+        Args:
+            payloads: The format string bodies (without curly braces) to be
+                sent to the vulnerable service.
+
+        Returns:
+            A list of extracted format string responses, in the same order as
+            the specified payloads; each is None if it could not be recovered.
+
+        """
+        results: List[Optional[str]] = []
+        for i in range(0, len(payloads), self._batch_size):
+            results.extend(
+                self._send_batch(payloads[i:i + self._batch_size]))
+
+        return results
+
+    def prefetch(
+        self,
+        payloads: Sequence[str]
+    ) -> None:
+        """Hint that payloads are likely to be sent soon.
+
+        Harnesses may start sending the payloads in the background, so that
+        their responses are ready when they are requested; by default, this
+        does nothing.
+
+        """
+
+    def close(
+        self
+    ) -> None:
+        """Release any resources (e.g., connections) held by this harness."""
+
+    @property
+    def supports_raw_injections(
+        self
+    ) -> bool:
+        """Whether :func:`send_injections` can pack payloads into one request.
+
+        This is the case if the harness implements :func:`send_raw_injection`.
+
+        """
+        return (type(self).send_raw_injection is not
+                AbstractInjectionHarness.send_raw_injection)
+
+    def _send_batch(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        """Send payloads in a single format string, bisecting on error."""
+        if not payloads:
+            return []
+        elif len(payloads) == 1:
+            return [self.send_injection(payloads[0])]
+
+        try:
+            raw_response = self.send_raw_injection(
+                self._mark_payloads(payloads))
+        except NotImplementedError:
+            return [self.send_injection(payload) for payload in payloads]
+
+        if raw_response is not None:
+            results = self._parse_responses(raw_response, len(payloads))
+            if results is not None:
+                return results
+
+        mid = len(payloads) // 2
+        return (self._send_batch(payloads[:mid]) +
+                self._send_batch(payloads[mid:]))
@@ -0,0 +1,360 @@
+"""Implementation of the AdaptiveInjectionHarness class."""
+
+import time
+
+from concurrent.futures import (
+    Future)
+from threading import (
+    Condition,
+    Lock)
+from typing import (
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Tuple)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from .delegating_injection_harness import (
+    DelegatingInjectionHarness)
+from ..defaults import (
+    DEFAULT_ADAPTIVE_LATENCY_FACTOR,
+    DEFAULT_ADAPTIVE_MAX_CONCURRENCY,
+    DEFAULT_ADAPTIVE_MAX_PROBE_INTERVAL,
+    DEFAULT_ADAPTIVE_PROBE_INTERVAL,
+    DEFAULT_ADAPTIVE_RECOVERY_TIMEOUT,
+    DEFAULT_ADAPTIVE_RETRIES)
+
+
+class AdaptiveInjectionHarness(DelegatingInjectionHarness):
+    """A harness that keeps a fragile target from being overwhelmed.
+
+    The number of requests in flight is limited, and the limit is adjusted
+    by additive-increase/multiplicative-decrease (AIMD): each successful
+    request raises it by about one per round of requests, up to
+    ``max_concurrency``, while a request that fails or takes more than
+    ``latency_factor`` times the fastest latency seen so far halves it, at
+    most once per round. Requests may further be capped to ``max_rps`` per
+    second by a token bucket.
+
+    When a request fails, a payload (or raw injection) that previously
+    succeeded is sent again to check whether the target is down. If it is,
+    the circuit is opened: new requests are held back while it is re-sent
+    with increasing pauses, and once the target responds again, the requests
+    that failed while it was down are retried. If the target is still down
+    after ``recovery_timeout`` seconds, its failures are reported as usual.
+
+    """
+
+    def __init__(
+        self,
+        harness: AbstractInjectionHarness,
+        max_concurrency: int = DEFAULT_ADAPTIVE_MAX_CONCURRENCY,
+        max_rps: Optional[float] = None,
+        latency_factor: float = DEFAULT_ADAPTIVE_LATENCY_FACTOR,
+        recovery_timeout: float = DEFAULT_ADAPTIVE_RECOVERY_TIMEOUT
+    ) -> None:
+        super().__init__(harness)
+
+        if max_concurrency < 1:
+            raise ValueError(
+                'max_concurrency must be a positive integer; '
+                f'{max_concurrency} is not acceptable')
+        elif max_rps is not None and max_rps <= 0:
+            raise ValueError(
+                f'max_rps must be positive; {max_rps} is not acceptable')
+        elif latency_factor <= 1:
+            raise ValueError(
+                'latency_factor must be greater than 1; '
+                f'{latency_factor} is not acceptable')
+        elif recovery_timeout < 0:
+            raise ValueError(
+                'recovery_timeout must not be negative; '
+                f'{recovery_timeout} is not acceptable')
+
+        self._max_concurrency = max_concurrency
+        self._max_rps = max_rps
+        self._latency_factor = latency_factor
+        self._recovery_timeout = recovery_timeout
+
+        # the concurrency limit and the circuit are guarded by this condition
+        self._cond = Condition()
+        self._limit = 1.0
+        self._in_flight = 0
+        self._min_latency: Optional[float] = None
+        self._last_decrease = float('-inf')
+        self._num_decreases = 0
+        self._circuit_open = False
+        self._health_check: Optional['Future[bool]'] = None
+        self._known_good: Optional[
+            Tuple[Callable[[str], Optional[str]], str]] = None
+        self._num_outages = 0
+        self._num_retries = 0
+
+        self._bucket_lock = Lock()
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        return self._request(
+            lambda: [self._harness.send_injection(payload)],
+            [payload],
+            self._harness.send_injection)[0]
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        if not self._harness.supports_raw_injections:
+            raise NotImplementedError(
+                f'{self._harness.__class__.__qualname__} does not support raw '
+                'injections')
+
+        return self._request(
+            lambda: [self._harness.send_raw_injection(injection)],
+            [injection],
+            self._harness.send_raw_injection)[0]
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        return self._request(
+            lambda: self._harness.send_injections(payloads),
+            payloads,
+            self._harness.send_injection)
+
+    def _request(
+        self,
+        send: Callable[[], List[Optional[str]]],
+        requests: Sequence[str],
+        send_one: Callable[[str], Optional[str]]
+    ) -> List[Optional[str]]:
+        """Make a request, retrying it if it failed while the target was down.
+
+        A request fails if it raises or gets no response to any payload (or
+        raw injection) in ``requests``, each of which can be sent on its own
+        with ``send_one``.
+
+        """
+        num_attempts = 0
+        while True:
+            num_attempts += 1
+            self._acquire()
+            start = time.monotonic()
+            error: Optional[Exception] = None
+            results: List[Optional[str]] = []
+            try:
+                results = send()
+            except Exception as e:
+                error = e
+            failed = error is not None or all(
+                result is None for result in results)
+            self._release(start, time.monotonic() - start, failed)
+
+            if not failed:
+                self._remember_known_good(requests, results, send_one)
+                return results
+            elif (num_attempts > DEFAULT_ADAPTIVE_RETRIES or
+                    not self._target_was_down()):
+                if error is not None:
+                    raise error
+                return results
+
+            with self._cond:
+                self._num_retries += 1
+
+    def _acquire(
+        self
+    ) -> None:
+        """Wait for the circuit to close and for room under the limits."""
+        with self._cond:
+            while (self._circuit_open or
+                    self._in_flight >= int(self._limit)):
+                self._cond.wait()
+            self._in_flight += 1
+
+        if self._max_rps is not None:
+            self._take_token(self._max_rps)
+
+    def _take_token(
+        self,
+        max_rps: float
+    ) -> None:
+        """Wait for a token from the bucket capping the request rate."""
+        while True:
+            with self._bucket_lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    1.0, self._tokens + (now - self._last_refill) * max_rps)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / max_rps
+
+            time.sleep(wait_time)
+
+    def _release(
+        self,
+        start: float,
+        latency: float,
+        failed: bool
+    ) -> None:
+        """Finish a request, adjusting the concurrency limit by its outcome."""
+        with self._cond:
+            self._in_flight -= 1
+
+            congested = failed
+            if not failed:
+                if self._min_latency is None or latency < self._min_latency:
+                    self._min_latency = latency
+                congested = latency > self._min_latency * self._latency_factor
+
+            if not congested:
+                self._limit = min(
+                    float(self._max_concurrency),
+                    self._limit + 1 / self._limit)
+            elif start > self._last_decrease:
+                # requests sent before the last decrease do not count again
+                self._limit = max(1.0, self._limit / 2)
+                self._last_decrease = time.monotonic()
+                self._num_decreases += 1
+
+            self._cond.notify_all()
+
+    def _remember_known_good(
+        self,
+        requests: Sequence[str],
+        results: Sequence[Optional[str]],
+        send_one: Callable[[str], Optional[str]]
+    ) -> None:
+        """Remember a request that succeeded, for checking target health."""
+        if self._known_good is not None:
+            return
+
+        for request, result in zip(requests, results):
+            if result is not None:
+                with self._cond:
+                    self._known_good = send_one, request
+                return
+
+    def _target_was_down(
+        self
+    ) -> bool:
+        """Check whether the target is down, waiting for it to recover.
+
+        Only one check runs at a time; requests failing during a check share
+        its outcome.
+
+        Returns:
+            Whether the target was down and has since recovered, in which
+            case failed requests should be retried.
+
+        """
+        with self._cond:
+            if self._known_good is None:
+                return False
+
+            health_check = self._health_check
+            if health_check is not None:
+                is_checking = False
+            else:
+                is_checking = True
+                health_check = self._health_check = Future()
+
+        if not is_checking:
+            return health_check.result()
+
+        was_down = False
+        try:
+            was_down = self._probe(*self._known_good)
+        finally:
+            health_check.set_result(was_down)
+            with self._cond:
+                self._health_check = None
+                self._circuit_open = False
+                self._cond.notify_all()
+
+        return was_down
+
+    def _probe(
+        self,
+        send_one: Callable[[str], Optional[str]],
+        request: str
+    ) -> bool:
+        """Re-send a known-good request until the target responds to it.
+
+        Returns:
+            Whether the target did not respond at first but recovered within
+            the recovery timeout.
+
+        """
+        deadline = time.monotonic() + self._recovery_timeout
+        interval = DEFAULT_ADAPTIVE_PROBE_INTERVAL
+        is_down = False
+        while True:
+            try:
+                result = send_one(request)
+            except Exception:
+                result = None
+
+            if result is not None:
+                return is_down
+            elif not is_down:
+                is_down = True
+                with self._cond:
+                    self._circuit_open = True
+                    self._num_outages += 1
+
+            if time.monotonic() + interval > deadline:
+                return False
+
+            time.sleep(interval)
+            interval = min(interval * 2, DEFAULT_ADAPTIVE_MAX_PROBE_INTERVAL)
+
+    @property
+    def max_concurrency(
+        self
+    ) -> int:
+        """The most requests that may be in flight at once."""
+        return self._max_concurrency
+
+    @property
+    def max_rps(
+        self
+    ) -> Optional[float]:
+        """The most requests that may be sent per second, if capped."""
+        return self._max_rps
+
+    @property
+    def limit(
+        self
+    ) -> int:
+        """The current limit of requests in flight."""
+        return int(self._limit)
+
+    @property
+    def num_decreases(
+        self
+    ) -> int:
+        """The number of times the concurrency limit was decreased."""
+        return self._num_decreases
+
+    @property
+    def num_outages(
+        self
+    ) -> int:
+        """The number of times the target was found to be down."""
+        return self._num_outages
+
+    @property
+    def num_retries(
+        self
+    ) -> int:
+        """The number of requests retried after the target recovered."""
+        return self._num_retries
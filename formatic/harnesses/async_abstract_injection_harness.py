@@ -0,0 +1,199 @@
+"""Implementation of the AsyncAbstractInjectionHarness class."""
+
+import asyncio
+
+from abc import (
+    abstractmethod)
+from concurrent.futures import (
+    CancelledError,
+    Future)
+from threading import (
+    Lock)
+from typing import (
+    Any,
+    Coroutine,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TypeVar)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness,
+    BaseInjectionHarness)
+
+T = TypeVar('T')
+
+
+class AsyncAbstractInjectionHarness(BaseInjectionHarness):
+    """Abstract harness for delivering injections from an asyncio event loop.
+
+    This is the asynchronous counterpart of :class:`AbstractInjectionHarness`;
+    it is driven by :func:`InjectionEngine.arun`.
+
+    """
+
+    @abstractmethod
+    async def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        """The coroutine used to send injections to a vulnerable service.
+
+        Args:
+            payload: The format string body (without curly braces) to be sent
+                to the vulnerable service.
+
+        Returns:
+            The extracted format string response, if present. Otherwise, None.
+
+        """
+
+    async def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        """Deliver a complete, already-marked format string to the service.
+
+        See :func:`AbstractInjectionHarness.send_raw_injection`.
+
+        Raises:
+            NotImplementedError: If this harness cannot deliver raw format
+                strings.
+
+        """
+        raise NotImplementedError(
+            f'{self.__class__.__qualname__} does not support raw injections')
+
+    async def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        """Send multiple injections concurrently, batching them where possible.
+
+        Payloads are grouped into batches of :data:`batch_size` as described
+        in :func:`AbstractInjectionHarness.send_injections`, but all batches
+        are in flight at the same time.
+
+        """
+        batches = await asyncio.gather(*(
+            self._send_batch(payloads[i:i + self._batch_size]) for
+            i in range(0, len(payloads), self._batch_size)))
+        return [result for batch in batches for result in batch]
+
+    async def _send_batch(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        """Send payloads in a single format string, bisecting on error."""
+        if not payloads:
+            return []
+        elif len(payloads) == 1:
+            return [await self.send_injection(payloads[0])]
+
+        try:
+            raw_response = await self.send_raw_injection(
+                self._mark_payloads(payloads))
+        except NotImplementedError:
+            return list(await asyncio.gather(
+                *(self.send_injection(payload) for payload in payloads)))
+
+        if raw_response is not None:
+            results = self._parse_responses(raw_response, len(payloads))
+            if results is not None:
+                return results
+
+        mid = len(payloads) // 2
+        first_half, second_half = await asyncio.gather(
+            self._send_batch(payloads[:mid]),
+            self._send_batch(payloads[mid:]))
+        return first_half + second_half
+
+    def blocking(
+        self,
+        loop: asyncio.AbstractEventLoop
+    ) -> AbstractInjectionHarness:
+        """Get a synchronous view of this harness for use from other threads.
+
+        Every call on the returned harness is scheduled onto the specified
+        event loop and blocks the calling thread until it completes, so it
+        must never be used from the thread running that loop. Closing the
+        returned harness cancels the calls still in flight, which then raise
+        :class:`concurrent.futures.CancelledError`, as do any later calls.
+
+        """
+        return _BlockingInjectionHarness(self, loop)
+
+
+class _BlockingInjectionHarness(AbstractInjectionHarness):
+    """Synchronous adapter for an :class:`AsyncAbstractInjectionHarness`."""
+
+    def __init__(
+        self,
+        harness: AsyncAbstractInjectionHarness,
+        loop: asyncio.AbstractEventLoop
+    ) -> None:
+        super().__init__(
+            harness.injection_marker,
+            harness.response_marker,
+            batch_size=harness.batch_size)
+        self._harness = harness
+        self._loop = loop
+
+        self._lock = Lock()
+        self._closed = False
+        self._futures: Set[Future] = set()
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        return self._call(self._harness.send_injection(payload))
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        return self._call(self._harness.send_raw_injection(injection))
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        return self._call(self._harness.send_injections(payloads))
+
+    def close(
+        self
+    ) -> None:
+        """Cancel the calls in flight, and refuse any further calls."""
+        with self._lock:
+            self._closed = True
+            futures = list(self._futures)
+
+        for future in futures:
+            future.cancel()
+
+    def _call(
+        self,
+        coro: Coroutine[Any, Any, T]
+    ) -> T:
+        """Run a coroutine on the event loop, waiting for its result."""
+        with self._lock:
+            if self._closed:
+                coro.close()
+                raise CancelledError()
+
+            future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+            self._futures.add(future)
+
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                self._futures.discard(future)
+
+    @property
+    def stable_addresses(
+        self
+    ) -> bool:
+        return self._harness.stable_addresses
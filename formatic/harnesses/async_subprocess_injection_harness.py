@@ -0,0 +1,109 @@
+"""Implementation of the AsyncSubprocessInjectionHarness class."""
+
+import asyncio
+
+from asyncio.subprocess import (
+    DEVNULL,
+    PIPE)
+from typing import (
+    List,
+    Optional)
+
+from .async_abstract_injection_harness import (
+    AsyncAbstractInjectionHarness)
+from ..defaults import (
+    DEFAULT_INJECTION_BATCH_SIZE,
+    DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+    DEFAULT_MAX_SUBPROCESSES)
+from ..utils import (
+    build_injection_args)
+
+
+class AsyncSubprocessInjectionHarness(AsyncAbstractInjectionHarness):
+    """Asynchronous harness for injecting into a local subprocess.
+
+    This is the asyncio counterpart of :class:`SubprocessInjectionHarness`.
+    At most ``max_subprocesses`` target processes run at the same time;
+    further injections wait on the event loop for a free slot.
+
+    """
+
+    def __init__(
+        self,
+        args: List[str],
+        injection_marker: Optional[str] = None,
+        response_marker: Optional[str] = None,
+        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+        batch_size: int = DEFAULT_INJECTION_BATCH_SIZE,
+        max_subprocesses: int = DEFAULT_MAX_SUBPROCESSES
+    ) -> None:
+        super().__init__(
+            injection_marker,
+            response_marker,
+            rand_response_marker_len,
+            batch_size)
+        self._args = args
+
+        if max_subprocesses < 1:
+            raise ValueError(
+                'max_subprocesses must be a positive integer; '
+                f'{max_subprocesses} is not acceptable')
+        self._max_subprocesses = max_subprocesses
+
+        # created lazily, as it must be bound to the running event loop
+        self._subprocess_slots: Optional[asyncio.Semaphore] = None
+
+    def build_args(
+        self,
+        payload: str
+    ) -> List[str]:
+        """Build subproc args, with the :data:`injection_marker` populated.
+
+        Raises:
+            ValueError: If the number of occurences of the injection marker in
+                :data:`args` is not exactly one.
+
+        """
+        return build_injection_args(
+            self._args, self._injection_marker, payload)
+
+    async def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        raw_response = await self.send_raw_injection(
+            self._mark_payload(payload))
+        if raw_response is None:
+            return None
+
+        return self._parse_response(raw_response)
+
+    async def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        args = self.build_args(injection)
+
+        if self._subprocess_slots is None:
+            self._subprocess_slots = asyncio.Semaphore(self._max_subprocesses)
+
+        async with self._subprocess_slots:
+            proc = await asyncio.create_subprocess_exec(
+                *args, stdout=PIPE, stderr=DEVNULL)
+            stdout, _ = await proc.communicate()
+
+        return stdout.decode('utf-8')
+
+    @property
+    def args(
+        self
+    ) -> List[str]:
+        """The arguments used for generating the vulnerable subprocess."""
+        return self._args
+
+    @property
+    def max_subprocesses(
+        self
+    ) -> int:
+        """The maximum number of target processes to run at once."""
+        return self._max_subprocesses
@@ -0,0 +1,183 @@
+"""Implementation of the CachingInjectionHarness class."""
+
+import dbm
+
+from collections import (
+    OrderedDict)
+from threading import (
+    Lock)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from .delegating_injection_harness import (
+    DelegatingInjectionHarness)
+from ..defaults import (
+    DEFAULT_CACHE_SIZE)
+
+
+class CachingInjectionHarness(DelegatingInjectionHarness):
+    """A harness that remembers the response to every payload it has sent.
+
+    Responses are kept in an in-memory LRU cache of up to ``max_size``
+    entries, backed by an optional on-disk ``dbm`` database at ``cache_path``
+    that persists between runs. Failed injections (i.e., None responses) are
+    only cached in memory, so probes that are known to fail are not re-sent
+    during a run; as a failure may also be caused by a timeout or a dropped
+    connection, they are sent again by later runs.
+
+    Note that an on-disk cache is only valid for the service it was populated
+    from, so a different ``cache_path`` should be used for each target.
+
+    """
+
+    def __init__(
+        self,
+        harness: AbstractInjectionHarness,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        cache_path: Optional[str] = None
+    ) -> None:
+        super().__init__(harness)
+
+        if max_size < 1:
+            raise ValueError(
+                'max_size must be a positive integer; '
+                f'{max_size} is not acceptable')
+        self._max_size = max_size
+
+        self._memory_cache: 'OrderedDict[str, Optional[str]]' = OrderedDict()
+        self._disk_cache: Optional[Any] = None
+        if cache_path is not None:
+            self._disk_cache = dbm.open(cache_path, 'c')
+        self._cache_path = cache_path
+
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        is_cached, result = self._lookup(payload)
+        if is_cached:
+            return result
+
+        result = self._harness.send_injection(payload)
+        self._store(payload, result)
+        return result
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        results: Dict[str, Optional[str]] = {}
+        missed_payloads: List[str] = []
+        for payload in dict.fromkeys(payloads):
+            is_cached, result = self._lookup(payload)
+            if is_cached:
+                results[payload] = result
+            else:
+                missed_payloads.append(payload)
+
+        if missed_payloads:
+            missed_results = self._harness.send_injections(missed_payloads)
+            for payload, result in zip(missed_payloads, missed_results):
+                self._store(payload, result)
+                results[payload] = result
+
+        return [results[payload] for payload in payloads]
+
+    def close(
+        self
+    ) -> None:
+        """Flush and close the on-disk cache, then the wrapped harness."""
+        with self._lock:
+            if self._disk_cache is not None:
+                self._disk_cache.close()
+                self._disk_cache = None
+
+        super().close()
+
+    def _lookup(
+        self,
+        payload: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Get whether a payload's result is cached, along with the result."""
+        with self._lock:
+            if payload in self._memory_cache:
+                self._hits += 1
+                self._memory_cache.move_to_end(payload)
+                return True, self._memory_cache[payload]
+
+            if self._disk_cache is not None:
+                raw_value = self._disk_cache.get(payload.encode('utf-8'))
+                if raw_value is not None:
+                    self._hits += 1
+                    result = raw_value.decode('utf-8')
+                    self._remember(payload, result)
+                    return True, result
+
+            self._misses += 1
+            return False, None
+
+    def _store(
+        self,
+        payload: str,
+        result: Optional[str]
+    ) -> None:
+        """Store the result of a payload in all cache tiers.
+
+        None results are only stored in memory.
+
+        """
+        with self._lock:
+            self._remember(payload, result)
+            if self._disk_cache is not None and result is not None:
+                self._disk_cache[payload.encode('utf-8')] = \
+                    result.encode('utf-8')
+
+    def _remember(
+        self,
+        payload: str,
+        result: Optional[str]
+    ) -> None:
+        """Store a result in the memory cache, evicting the oldest entries."""
+        self._memory_cache[payload] = result
+        self._memory_cache.move_to_end(payload)
+        while len(self._memory_cache) > self._max_size:
+            self._memory_cache.popitem(last=False)
+
+    @property
+    def hits(
+        self
+    ) -> int:
+        """The number of injections answered from the cache."""
+        return self._hits
+
+    @property
+    def misses(
+        self
+    ) -> int:
+        """The number of injections that had to be sent to the service."""
+        return self._misses
+
+    @property
+    def max_size(
+        self
+    ) -> int:
+        """The maximum number of entries kept in the in-memory cache."""
+        return self._max_size
+
+    @property
+    def cache_path(
+        self
+    ) -> Optional[str]:
+        """The path of the on-disk cache, if one is in use."""
+        return self._cache_path
@@ -0,0 +1,77 @@
+"""Implementation of the DelegatingInjectionHarness class."""
+
+from typing import (
+    List,
+    Optional,
+    Sequence)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+
+
+class DelegatingInjectionHarness(AbstractInjectionHarness):
+    """A harness that forwards all injections to another harness.
+
+    This is the base class for harnesses that add behavior (e.g., caching) on
+    top of the harness that actually delivers injections to the service. The
+    wrapped harness's markers and batch size are shared by the wrapper.
+
+    """
+
+    def __init__(
+        self,
+        harness: AbstractInjectionHarness
+    ) -> None:
+        super().__init__(
+            harness.injection_marker,
+            harness.response_marker,
+            batch_size=harness.batch_size)
+        self._harness = harness
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        return self._harness.send_injection(payload)
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        return self._harness.send_raw_injection(injection)
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        return self._harness.send_injections(payloads)
+
+    def prefetch(
+        self,
+        payloads: Sequence[str]
+    ) -> None:
+        self._harness.prefetch(payloads)
+
+    def close(
+        self
+    ) -> None:
+        self._harness.close()
+
+    @property
+    def supports_raw_injections(
+        self
+    ) -> bool:
+        return self._harness.supports_raw_injections
+
+    @property
+    def stable_addresses(
+        self
+    ) -> bool:
+        return self._harness.stable_addresses
+
+    @property
+    def harness(
+        self
+    ) -> AbstractInjectionHarness:
+        """The wrapped harness that injections are forwarded to."""
+        return self._harness
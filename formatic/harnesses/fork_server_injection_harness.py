@@ -0,0 +1,493 @@
+"""Implementation of the ForkServerInjectionHarness class."""
+
+import json
+import os
+import struct
+import time
+
+from queue import (
+    Empty,
+    Queue)
+from subprocess import (
+    DEVNULL,
+    PIPE,
+    Popen)
+from threading import (
+    Lock,
+    Thread)
+from typing import (
+    IO,
+    List,
+    Optional,
+    cast)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from ..defaults import (
+    DEFAULT_INJECTION_BATCH_SIZE,
+    DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+    DEFAULT_PROBE_TIMEOUT)
+from ..utils import (
+    build_injection_args)
+
+# run by the target's interpreter; kept compatible with old Python 3 versions
+#
+# The server runs the target's module-level code once, except for its
+# ``if __name__ == '__main__':`` blocks, and then reads requests from stdin:
+# ``R`` followed by a length-prefixed JSON list of arguments runs the target's
+# __main__ blocks in a forked child with those arguments in sys.argv, and ``K``
+# kills the running child. The child's output is written to stdout as
+# length-prefixed frames, followed by an empty frame once the child is done.
+_FORK_SERVER_SRC = r'''
+import ast
+import builtins
+import importlib.machinery
+import importlib.util
+import json
+import os
+import runpy
+import select
+import signal
+import struct
+import sys
+import types
+
+
+def read_exact(fd, n):
+    buf = b''
+    while len(buf) < n:
+        chunk = os.read(fd, n - len(buf))
+        if not chunk:
+            raise EOFError
+        buf += chunk
+    return buf
+
+
+def write_all(fd, data):
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def is_main_guard(node):
+    if not isinstance(node, ast.If) or \
+            not isinstance(node.test, ast.Compare) or \
+            len(node.test.ops) != 1 or \
+            not isinstance(node.test.ops[0], ast.Eq):
+        return False
+
+    operands = [node.test.left] + node.test.comparators
+    return any(
+        isinstance(operand, ast.Name) and operand.id == '__name__'
+        for operand in operands) and any(
+        getattr(operand, 'value', getattr(operand, 's', None)) == '__main__'
+        for operand in operands)
+
+
+def load_target(target_argv):
+    # returns the code of the target's __main__ blocks and the globals to
+    # run it in, or None if children have to run the whole target
+    spec = None
+    if target_argv[0] == '-m':
+        sys.path.insert(0, os.getcwd())
+        spec = importlib.util.find_spec(target_argv[1])
+        if spec.submodule_search_locations is not None:
+            spec = importlib.util.find_spec(target_argv[1] + '.__main__')
+        path = spec.origin
+    else:
+        path = target_argv[0]
+        sys.path[0] = os.path.dirname(os.path.abspath(path))
+
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), path)
+    body = [node for node in tree.body if not is_main_guard(node)]
+    main_blocks = [node for node in tree.body if is_main_guard(node)]
+    if not main_blocks:
+        # only import what the target imports, as its unguarded code must
+        # not be run before the injection is in sys.argv
+        tree.body = [
+            node for node in body if
+            isinstance(node, (ast.Import, ast.ImportFrom))]
+        exec(compile(tree, path, 'exec'), {'__name__': '__formatic__'})
+        return None
+
+    # the same globals as set by the interpreter for its __main__ module
+    module = types.ModuleType('__main__')
+    module.__annotations__ = {}
+    module.__builtins__ = builtins
+    module.__file__ = path
+    module.__spec__ = spec
+    if spec is not None:
+        module.__cached__ = spec.cached
+        module.__loader__ = spec.loader
+        module.__package__ = spec.parent
+    else:
+        module.__cached__ = None
+        module.__loader__ = importlib.machinery.SourceFileLoader(
+            '__main__', path)
+        module.__package__ = None
+    sys.modules['__main__'] = module
+    sys.argv = [path] + target_argv[2:] if spec is not None else target_argv
+
+    tree.body = body
+    exec(compile(tree, path, 'exec'), module.__dict__)
+    tree.body = main_blocks
+    return compile(tree, path, 'exec'), module.__dict__
+
+
+def run_target(argv, loaded):
+    if loaded is not None:
+        main_code, main_globals = loaded
+        if argv[0] == '-m':
+            sys.argv = [main_globals['__file__']] + argv[2:]
+        else:
+            sys.argv = argv
+        exec(main_code, main_globals)
+    elif argv[0] == '-m':
+        sys.argv = argv[1:]
+        runpy.run_module(argv[1], run_name='__main__', alter_sys=True)
+    else:
+        sys.argv = argv
+        runpy.run_path(argv[0], run_name='__main__')
+
+
+def run_child(argv, loaded):
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        os.close(ctl_in)
+        os.close(ctl_out)
+        os.dup2(w, 1)
+        os.dup2(devnull, 2)
+        os.close(w)
+        try:
+            run_target(argv, loaded)
+        except BaseException:
+            pass
+        finally:
+            try:
+                sys.stdout.flush()
+            finally:
+                os._exit(0)
+
+    os.close(w)
+    while True:
+        readable = select.select([r, ctl_in], [], [])[0]
+        if ctl_in in readable:
+            # the harness read enough of the output, or gave up waiting
+            os.read(ctl_in, 1)
+            break
+
+        chunk = os.read(r, 65536)
+        if not chunk:
+            break
+        write_all(ctl_out, struct.pack('>I', len(chunk)) + chunk)
+
+    try:
+        os.kill(pid, signal.SIGKILL)
+    except OSError:
+        pass
+    os.close(r)
+    os.waitpid(pid, 0)
+    write_all(ctl_out, struct.pack('>I', 0))
+
+
+ctl_in = os.dup(0)
+ctl_out = os.dup(1)
+devnull = os.open(os.devnull, os.O_RDWR)
+os.dup2(devnull, 0)
+os.dup2(devnull, 1)
+
+try:
+    loaded = load_target(sys.argv[1:])
+except BaseException:
+    loaded = None
+sys.stdout.flush()
+sys.stderr.flush()
+write_all(ctl_out, b'1' if loaded is not None else b'0')
+
+while True:
+    try:
+        command = read_exact(ctl_in, 1)
+    except EOFError:
+        break
+
+    # a K read here was sent for a child that had already exited
+    if command == b'R':
+        size, = struct.unpack('>I', read_exact(ctl_in, 4))
+        run_child(json.loads(read_exact(ctl_in, size).decode('utf-8')), loaded)
+'''
+
+
+class ForkServerInjectionHarness(AbstractInjectionHarness):
+    """A harness for injecting into a local Python script via a fork server.
+
+    The ``args`` are those of :class:`SubprocessInjectionHarness`, but must
+    start with a Python interpreter followed by either a script path or
+    ``-m`` and a module name. That interpreter is started once and runs the
+    target's module-level code, except for its ``if __name__ == '__main__':``
+    blocks; it then forks a child per injection that runs only those blocks,
+    with the injection substituted into ``sys.argv``. Each injection
+    therefore costs about one fork, rather than an interpreter startup plus
+    the target's imports, and the classes and functions defined by the target
+    are shared by all children.
+
+    Targets must guard their entry point with such a block, as any other
+    module-level code is run before the injection is known. For a target
+    without one, the server only runs its imports, and each child runs the
+    whole target; objects defined by the target are then re-created by each
+    child, so :data:`stable_addresses` is False.
+
+    The output of each child is streamed back and read until the injection's
+    closing response marker appears, after which the child is killed. A
+    child that does not print it within ``timeout`` seconds is killed, and
+    the injection gets no response. Injections are sent to the server one at
+    a time. The server is restarted if it exits unexpectedly. This harness
+    requires ``os.fork()``, and is thus only available on POSIX systems.
+
+    """
+
+    def __init__(
+        self,
+        args: List[str],
+        injection_marker: Optional[str] = None,
+        response_marker: Optional[str] = None,
+        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+        batch_size: int = DEFAULT_INJECTION_BATCH_SIZE,
+        timeout: float = DEFAULT_PROBE_TIMEOUT
+    ) -> None:
+        super().__init__(
+            injection_marker,
+            response_marker,
+            rand_response_marker_len,
+            batch_size)
+
+        if not hasattr(os, 'fork'):
+            raise ValueError(
+                f'{self.__class__.__qualname__} requires os.fork(), which is '
+                'not available on this platform')
+        elif len(args) < 2 or (args[1] == '-m' and len(args) < 3):
+            raise ValueError(
+                'Expected a Python interpreter followed by a script or -m and '
+                f'a module name, but got arguments {args}')
+        self._args = args
+        self._timeout = timeout
+
+        self._lock = Lock()
+        self._server: Optional[_ForkServer] = None
+        self._shared: Optional[bool] = None
+
+    def build_args(
+        self,
+        payload: str
+    ) -> List[str]:
+        """Build subproc args, with the :data:`injection_marker` populated.
+
+        Raises:
+            ValueError: If the number of occurences of the injection marker in
+                :data:`args` is not exactly one.
+
+        """
+        return build_injection_args(
+            self._args, self._injection_marker, payload)
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        raw_response = self.send_raw_injection(self._mark_payload(payload))
+        if raw_response is None:
+            return None
+
+        return self._parse_response(raw_response)
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        """Run the target in a freshly-forked child, returning its stdout.
+
+        Returns:
+            The child's output up to the injection's closing response marker,
+            or all of its output if it exited first. None is returned if the
+            child timed out.
+
+        Raises:
+            ConnectionError: If the fork server exits while handling the
+                injection, even after being restarted.
+
+        """
+        request = json.dumps(self.build_args(injection)[1:]).encode('utf-8')
+
+        with self._lock:
+            for _ in range(2):
+                server = self._get_server()
+                try:
+                    server.run(request)
+                except OSError:
+                    self._stop_server()
+                    continue
+
+                raw_response = self._read_response(
+                    server.chunks, injection, self._timeout)
+                if server.exited:
+                    self._stop_server()
+                    continue
+
+                # the child may still be running after printing the response
+                if raw_response is None or \
+                        self._response_complete(injection, raw_response):
+                    if not server.stop_child(self._timeout):
+                        self._stop_server()
+
+                return raw_response
+
+        raise ConnectionError(
+            f'Fork server for {self._args} exited unexpectedly')
+
+    def close(
+        self
+    ) -> None:
+        """Stop the fork server, if it is running."""
+        with self._lock:
+            self._stop_server()
+
+    def _get_server(
+        self
+    ) -> '_ForkServer':
+        """Get the fork server, starting it if needed."""
+        if self._server is None:
+            self._server = _ForkServer(self._args)
+            self._shared = self._server.shared
+
+        return self._server
+
+    def _stop_server(
+        self
+    ) -> None:
+        """Stop the fork server, if it is running."""
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+
+    @property
+    def stable_addresses(
+        self
+    ) -> bool:
+        # children only share the target's objects if the server defined them
+        if self._shared is None:
+            with self._lock:
+                self._get_server()
+
+        return bool(self._shared)
+
+    @property
+    def args(
+        self
+    ) -> List[str]:
+        """The arguments used for starting the fork server."""
+        return self._args
+
+    @property
+    def timeout(
+        self
+    ) -> float:
+        """The seconds to wait for the response to each injection."""
+        return self._timeout
+
+
+class _ForkServer:
+    """A fork server process, with its output read on a background thread."""
+
+    def __init__(
+        self,
+        args: List[str]
+    ) -> None:
+        self._proc = Popen(
+            [args[0], '-c', _FORK_SERVER_SRC, *args[1:]],
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=DEVNULL)
+        self._stdin = cast(IO[bytes], self._proc.stdin)
+        self._stdout = cast(IO[bytes], self._proc.stdout)
+
+        # whether the server ran the target's module-level code, so that its
+        # objects are shared by every child
+        self.shared = self._stdout.read(1) == b'1'
+
+        # chunks of each child's output, each terminated by None; None is
+        # also put once the server exits, after setting exited
+        self.chunks: 'Queue[Optional[bytes]]' = Queue()
+        self.exited = False
+        Thread(target=self._read_frames, daemon=True).start()
+
+    def run(
+        self,
+        request: bytes
+    ) -> None:
+        """Fork a child running the target with the requested arguments."""
+        self._stdin.write(b'R' + struct.pack('>I', len(request)) + request)
+        self._stdin.flush()
+
+    def stop_child(
+        self,
+        timeout: float
+    ) -> bool:
+        """Kill the running child, discarding the rest of its output.
+
+        Returns:
+            Whether the server is still able to run the next child.
+
+        """
+        try:
+            self._stdin.write(b'K')
+            self._stdin.flush()
+        except OSError:
+            return False
+
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+
+            try:
+                chunk = self.chunks.get(timeout=remaining)
+            except Empty:
+                return False
+            if chunk is None:
+                return not self.exited
+
+    def stop(
+        self
+    ) -> None:
+        """Stop the server by closing its end of the control channel."""
+        try:
+            self._stdin.close()
+        except OSError:
+            pass
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.wait()
+
+    def _read_frames(
+        self
+    ) -> None:
+        while True:
+            header = self._stdout.read(4)
+            if len(header) != 4:
+                break
+
+            size, = struct.unpack('>I', header)
+            if not size:
+                self.chunks.put(None)
+                continue
+
+            data = self._stdout.read(size)
+            if len(data) != size:
+                break
+            self.chunks.put(data)
+
+        self.exited = True
+        self._stdout.close()
+        self.chunks.put(None)
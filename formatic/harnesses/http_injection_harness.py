@@ -0,0 +1,261 @@
+"""Implementation of the HttpInjectionHarness class."""
+
+import json
+
+from http.client import (
+    HTTPConnection,
+    HTTPException,
+    HTTPSConnection)
+from queue import (
+    Empty,
+    LifoQueue)
+from typing import (
+    Dict,
+    Optional,
+    Tuple)
+from urllib.parse import (
+    quote,
+    quote_plus,
+    urlsplit)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from ..defaults import (
+    DEFAULT_HTTP_POOL_SIZE,
+    DEFAULT_HTTP_TIMEOUT,
+    DEFAULT_INJECTION_BATCH_SIZE,
+    DEFAULT_INJECTION_RESPONSE_MARKER_LEN)
+
+
+class HttpInjectionHarness(AbstractInjectionHarness):
+    """A harness for injecting format() strings into an HTTP service.
+
+    Exactly one of the URL, body, or header values must contain the
+    :data:`injection_marker`. Payloads are encoded for where they are placed:
+    percent-encoded in the URL, form-encoded or JSON-escaped in a body with a
+    matching ``Content-Type``, and substituted as-is everywhere else.
+
+    Up to ``pool_size`` persistent HTTP/1.1 connections are kept open and
+    reused between injections; threads sending injections beyond that limit
+    wait for a free connection. An injection whose request gets no response
+    (e.g., because the service dropped the connection) is retried once on a
+    new connection, after which it gets no response.
+
+    """
+
+    def __init__(
+        self,
+        url: str,
+        method: Optional[str] = None,
+        body: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        injection_marker: Optional[str] = None,
+        response_marker: Optional[str] = None,
+        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+        batch_size: int = DEFAULT_INJECTION_BATCH_SIZE,
+        pool_size: int = DEFAULT_HTTP_POOL_SIZE,
+        timeout: float = DEFAULT_HTTP_TIMEOUT
+    ) -> None:
+        super().__init__(
+            injection_marker,
+            response_marker,
+            rand_response_marker_len,
+            batch_size)
+
+        split_url = urlsplit(url)
+        if split_url.scheme not in ('http', 'https'):
+            raise ValueError(
+                f'Unsupported URL scheme in {url}; expected http or https')
+        elif self._injection_marker in split_url.netloc:
+            raise ValueError(
+                f'Injection marker {self._injection_marker} cannot be placed '
+                f'in the host of URL {url}')
+
+        self._url = url
+        self._method = method or ('GET' if body is None else 'POST')
+        self._body = body
+        self._headers = dict(headers or {})
+
+        self._scheme = split_url.scheme
+        self._netloc = split_url.netloc
+        self._target = split_url.path or '/'
+        if split_url.query:
+            self._target += f'?{split_url.query}'
+
+        num_markers = (
+            self._target.count(self._injection_marker) +
+            (body or '').count(self._injection_marker) +
+            sum(value.count(self._injection_marker) for
+                value in self._headers.values()))
+        if num_markers != 1:
+            raise ValueError(
+                f'Expected exactly one instance of injection marker '
+                f'{self._injection_marker} in the URL, body, and headers; '
+                f'found {num_markers}')
+
+        if pool_size < 1:
+            raise ValueError(
+                'pool_size must be a positive integer; '
+                f'{pool_size} is not acceptable')
+        self._pool_size = pool_size
+        self._timeout = timeout
+
+        # None entries are slots whose connection has not been opened yet
+        self._pool: LifoQueue = LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(None)
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        raw_response = self.send_raw_injection(self._mark_payload(payload))
+        if raw_response is None:
+            return None
+
+        return self._parse_response(raw_response)
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        """Send an HTTP request with the injection substituted into it.
+
+        Returns:
+            The body of the service's response, or None if no response could
+            be read, even after retrying on a freshly-opened connection.
+
+        Raises:
+            ConnectionError: If no connection to the service could be opened.
+
+        """
+        target, body, headers = self.build_request(injection)
+
+        conn = self._pool.get()
+        if conn is None:
+            conn = self._new_connection()
+
+        try:
+            # an idle pooled connection may have been closed by the server
+            # since it was last used, so it gets one retry on a new one
+            if conn.sock is not None:
+                try:
+                    return self._request(conn, target, body, headers)
+                except (HTTPException, OSError):
+                    conn.close()
+
+            try:
+                conn.connect()
+            except OSError as e:
+                conn.close()
+                raise ConnectionError(
+                    f'Unable to connect to {self._url}: {e}') from e
+
+            try:
+                return self._request(conn, target, body, headers)
+            except (HTTPException, OSError):
+                conn.close()
+                return None
+        finally:
+            self._pool.put(conn)
+
+    def _request(
+        self,
+        conn: HTTPConnection,
+        target: str,
+        body: Optional[str],
+        headers: Dict[str, str]
+    ) -> str:
+        """Send one request over a connection and decode its response."""
+        conn.request(
+            self._method,
+            target,
+            body=None if body is None else body.encode('utf-8'),
+            headers=headers)
+        response = conn.getresponse()
+        raw_body = response.read()
+
+        charset = response.headers.get_content_charset() or 'utf-8'
+        return raw_body.decode(charset, errors='replace')
+
+    def build_request(
+        self,
+        injection: str
+    ) -> Tuple[str, Optional[str], Dict[str, str]]:
+        """Build the request target, body, and headers for an injection."""
+        marker = self._injection_marker
+
+        target = self._target.replace(marker, quote(injection, safe=''))
+
+        body = self._body
+        if body is not None and marker in body:
+            content_type = self._content_type()
+            if content_type == 'application/x-www-form-urlencoded':
+                encoded_injection = quote_plus(injection)
+            elif content_type.endswith('json'):
+                encoded_injection = json.dumps(injection)[1:-1]
+            else:
+                encoded_injection = injection
+            body = body.replace(marker, encoded_injection)
+
+        headers = {
+            name: value.replace(marker, injection) for
+            name, value in self._headers.items()}
+
+        return target, body, headers
+
+    def close(
+        self
+    ) -> None:
+        """Close all idle pooled connections."""
+        idle_conns = []
+        while True:
+            try:
+                idle_conns.append(self._pool.get_nowait())
+            except Empty:
+                break
+
+        for conn in idle_conns:
+            if conn is not None:
+                conn.close()
+            self._pool.put(conn)
+
+    def _new_connection(
+        self
+    ) -> HTTPConnection:
+        """Open a new connection to the targeted service."""
+        if self._scheme == 'https':
+            return HTTPSConnection(self._netloc, timeout=self._timeout)
+
+        return HTTPConnection(self._netloc, timeout=self._timeout)
+
+    def _content_type(
+        self
+    ) -> str:
+        """The lower-cased media type of the request's Content-Type header."""
+        for name, value in self._headers.items():
+            if name.lower() == 'content-type':
+                return value.split(';')[0].strip().lower()
+
+        return ''
+
+    @property
+    def url(
+        self
+    ) -> str:
+        """The URL template that injections are substituted into."""
+        return self._url
+
+    @property
+    def method(
+        self
+    ) -> str:
+        """The HTTP method used to send injections."""
+        return self._method
+
+    @property
+    def pool_size(
+        self
+    ) -> int:
+        """The maximum number of open connections to the service."""
+        return self._pool_size
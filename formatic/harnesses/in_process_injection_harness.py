@@ -0,0 +1,70 @@
+"""Implementation of the InProcessInjectionHarness class."""
+
+from typing import (
+    Any,
+    Optional)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from ..defaults import (
+    DEFAULT_INJECTION_BATCH_SIZE,
+    DEFAULT_INJECTION_RESPONSE_MARKER_LEN)
+
+
+class InProcessInjectionHarness(AbstractInjectionHarness):
+    """A harness that formats injections against a live object in-process.
+
+    Injections are formatted with ``root_obj`` as their only positional
+    argument, so it is reached with an injection index of 0. No service is
+    involved, which makes this harness useful as a zero-latency baseline and
+    for crawling objects in tests.
+
+    """
+
+    def __init__(
+        self,
+        root_obj: Any,
+        injection_marker: Optional[str] = None,
+        response_marker: Optional[str] = None,
+        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+        batch_size: int = DEFAULT_INJECTION_BATCH_SIZE
+    ) -> None:
+        super().__init__(
+            injection_marker,
+            response_marker,
+            rand_response_marker_len,
+            batch_size)
+        self._root_obj = root_obj
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        raw_response = self.send_raw_injection(self._mark_payload(payload))
+        if raw_response is None:
+            return None
+
+        return self._parse_response(raw_response)
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        """Format an injection, returning an empty response if it fails."""
+        try:
+            return injection.format(self._root_obj)
+        except Exception:
+            return ''
+
+    @property
+    def stable_addresses(
+        self
+    ) -> bool:
+        return True
+
+    @property
+    def root_obj(
+        self
+    ) -> Any:
+        """The object that injections are formatted against."""
+        return self._root_obj
@@ -0,0 +1,100 @@
+"""Implementation of the RecordingInjectionHarness class."""
+
+import json
+
+from threading import (
+    Lock)
+from typing import (
+    IO,
+    List,
+    Optional,
+    Sequence)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from .delegating_injection_harness import (
+    DelegatingInjectionHarness)
+
+
+class RecordingInjectionHarness(DelegatingInjectionHarness):
+    """A harness that records the response to every payload it forwards.
+
+    Each payload and its response (or null, if it failed) are written to the
+    file at ``record_path`` as a JSON array on its own line, which can be
+    served back by :class:`ReplayInjectionHarness` without the service.
+    Payloads are recorded rather than raw injections, so that recordings do
+    not depend on the random response markers of the run that made them.
+
+    """
+
+    def __init__(
+        self,
+        harness: AbstractInjectionHarness,
+        record_path: str
+    ) -> None:
+        super().__init__(harness)
+
+        self._record_path = record_path
+        self._record_file: Optional[IO[str]] = open(
+            record_path, 'w', encoding='utf-8')
+        self._lock = Lock()
+        self._num_recorded = 0
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        result = self._harness.send_injection(payload)
+        self._record([payload], [result])
+        return result
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        results = self._harness.send_injections(payloads)
+        self._record(payloads, results)
+        return results
+
+    def close(
+        self
+    ) -> None:
+        """Flush and close the recording, then the wrapped harness."""
+        with self._lock:
+            if self._record_file is not None:
+                self._record_file.close()
+                self._record_file = None
+
+        super().close()
+
+    def _record(
+        self,
+        payloads: Sequence[str],
+        results: Sequence[Optional[str]]
+    ) -> None:
+        """Append payloads and their results to the recording."""
+        lines = ''.join(
+            json.dumps([payload, result]) + '\n' for
+            payload, result in zip(payloads, results))
+
+        with self._lock:
+            if self._record_file is None:
+                raise ValueError(
+                    f'Recording to {self._record_path} is already closed')
+
+            self._record_file.write(lines)
+            self._num_recorded += len(payloads)
+
+    @property
+    def record_path(
+        self
+    ) -> str:
+        """The path of the file that responses are recorded to."""
+        return self._record_path
+
+    @property
+    def num_recorded(
+        self
+    ) -> int:
+        """The number of payloads recorded so far."""
+        return self._num_recorded
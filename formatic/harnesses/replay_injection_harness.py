@@ -0,0 +1,146 @@
+"""Implementation of the ReplayInjectionHarness class."""
+
+import json
+import time
+
+from threading import (
+    Lock)
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Sequence)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from ..defaults import (
+    DEFAULT_INJECTION_BATCH_SIZE)
+
+
+class ReplayInjectionHarness(AbstractInjectionHarness):
+    """A harness that answers payloads from a recorded run.
+
+    Responses are read from a file written by
+    :class:`RecordingInjectionHarness`; payloads that were not recorded get
+    no response. No service is contacted, but each simulated request sleeps
+    for ``latency`` seconds and is counted in :data:`num_requests`, so that
+    crawls can be profiled and compared by the round trips they would have
+    cost. Batches are simulated like :func:`send_injections` sends them:
+    batches with a failed payload are bisected as if the whole injection had
+    failed.
+
+    """
+
+    def __init__(
+        self,
+        record_path: str,
+        latency: float = 0.0,
+        batch_size: int = DEFAULT_INJECTION_BATCH_SIZE
+    ) -> None:
+        super().__init__(batch_size=batch_size)
+
+        if latency < 0:
+            raise ValueError(
+                'latency must not be negative; '
+                f'{latency} is not acceptable')
+        self._latency = latency
+        self._record_path = record_path
+
+        self._responses: Dict[str, Optional[str]] = {}
+        with open(record_path, encoding='utf-8') as f:
+            for line_num, line in enumerate(f, start=1):
+                try:
+                    payload, result = json.loads(line)
+                except (TypeError, ValueError) as e:
+                    raise ValueError(
+                        f'Invalid recording at {record_path}:{line_num}: '
+                        f'{e}') from e
+                self._responses[payload] = result
+
+        self._lock = Lock()
+        self._num_requests = 0
+        self._num_unrecorded = 0
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        return self._replay([payload])[0]
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        results: List[Optional[str]] = []
+        for i in range(0, len(payloads), self._batch_size):
+            results.extend(
+                self._replay_batch(payloads[i:i + self._batch_size]))
+
+        return results
+
+    def _replay_batch(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        """Answer a batch of payloads, bisecting it like a failed injection."""
+        if not payloads:
+            return []
+
+        results = self._replay(payloads)
+        if len(payloads) == 1 or None not in results:
+            return results
+
+        mid = len(payloads) // 2
+        return (self._replay_batch(payloads[:mid]) +
+                self._replay_batch(payloads[mid:]))
+
+    def _replay(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        """Answer payloads as if they had been sent in a single request."""
+        if self._latency:
+            time.sleep(self._latency)
+
+        results = [self._responses.get(payload) for payload in payloads]
+        with self._lock:
+            self._num_requests += 1
+            self._num_unrecorded += sum(
+                payload not in self._responses for payload in payloads)
+
+        return results
+
+    @property
+    def supports_raw_injections(
+        self
+    ) -> bool:
+        """Batches are replayed as single requests, as they were recorded."""
+        return True
+
+    @property
+    def record_path(
+        self
+    ) -> str:
+        """The path of the recording that responses are served from."""
+        return self._record_path
+
+    @property
+    def latency(
+        self
+    ) -> float:
+        """The seconds that each simulated request takes."""
+        return self._latency
+
+    @property
+    def num_requests(
+        self
+    ) -> int:
+        """The number of simulated requests made so far."""
+        return self._num_requests
+
+    @property
+    def num_unrecorded(
+        self
+    ) -> int:
+        """The number of payloads answered so far that were not recorded."""
+        return self._num_unrecorded
@@ -0,0 +1,334 @@
+"""Implementation of the RetryingInjectionHarness class."""
+
+import random
+import time
+
+from collections import (
+    deque)
+from concurrent.futures import (
+    as_completed,
+    ThreadPoolExecutor,
+    wait)
+from threading import (
+    Lock)
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from .delegating_injection_harness import (
+    DelegatingInjectionHarness)
+from ..defaults import (
+    DEFAULT_HEDGE_MIN_SAMPLES,
+    DEFAULT_HEDGE_PERCENTILE,
+    DEFAULT_HEDGE_WINDOW,
+    DEFAULT_HEDGE_WORKERS,
+    DEFAULT_RETRY_BACKOFF,
+    DEFAULT_RETRY_MAX_ATTEMPTS,
+    DEFAULT_RETRY_MAX_BACKOFF)
+
+# errors raised by harnesses when a request or its response was lost
+TRANSPORT_ERRORS = (EOFError, OSError)
+
+
+class RetryingInjectionHarness(DelegatingInjectionHarness):
+    """A harness that retries requests lost on their way to the target.
+
+    A request that raises a transport error (an :class:`OSError`, such as a
+    :class:`ConnectionError`, or an :class:`EOFError`) is sent again, up to
+    ``max_attempts`` times in total. Before each retry it waits a random
+    time of up to ``backoff`` seconds; this limit doubles with each attempt,
+    up to ``max_backoff``.
+
+    If ``retry_failures`` is set, injections that got no response at all
+    (e.g., because the target timed out) are retried as well. To tell these
+    apart from payloads rejected by the target's format() call, which fail
+    the same way every time and are not retried, payloads are then packed
+    into raw injections by this harness rather than the wrapped one; this is
+    only done if the wrapped harness supports raw injections.
+
+    If ``hedge`` is set, a request that has taken longer than
+    ``hedge_percentile`` of recent requests with the same number of payloads
+    is sent a second time, and the first response to arrive is used. This
+    keeps a few slow requests from stalling the crawl, but adds load on the
+    target.
+
+    """
+
+    def __init__(
+        self,
+        harness: AbstractInjectionHarness,
+        max_attempts: int = DEFAULT_RETRY_MAX_ATTEMPTS,
+        backoff: float = DEFAULT_RETRY_BACKOFF,
+        max_backoff: float = DEFAULT_RETRY_MAX_BACKOFF,
+        retry_failures: bool = False,
+        hedge: bool = False,
+        hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        hedge_workers: int = DEFAULT_HEDGE_WORKERS
+    ) -> None:
+        super().__init__(harness)
+
+        if max_attempts < 1:
+            raise ValueError(
+                'max_attempts must be a positive integer; '
+                f'{max_attempts} is not acceptable')
+        elif backoff < 0:
+            raise ValueError(
+                f'backoff must not be negative; {backoff} is not acceptable')
+        elif max_backoff < backoff:
+            raise ValueError(
+                f'max_backoff must be at least backoff ({backoff}); '
+                f'{max_backoff} is not acceptable')
+        elif not 0 < hedge_percentile < 1:
+            raise ValueError(
+                'hedge_percentile must be between 0 and 1; '
+                f'{hedge_percentile} is not acceptable')
+        elif hedge_workers < 1:
+            raise ValueError(
+                'hedge_workers must be a positive integer; '
+                f'{hedge_workers} is not acceptable')
+
+        self._max_attempts = max_attempts
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._retry_failures = \
+            retry_failures and harness.supports_raw_injections
+        self._hedge_percentile = hedge_percentile
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if hedge:
+            self._executor = ThreadPoolExecutor(
+                max_workers=hedge_workers,
+                thread_name_prefix='formatic-hedge')
+
+        self._lock = Lock()
+        self._latencies: Dict[int, Deque[float]] = {}
+        self._num_retries = 0
+        self._num_hedged = 0
+        self._num_hedges_won = 0
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        if not self._retry_failures:
+            return self.send_injections([payload])[0]
+
+        raw_response = self.send_raw_injection(self._mark_payload(payload))
+        if raw_response is None:
+            return None
+
+        return self._parse_response(raw_response)
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        if not self._harness.supports_raw_injections:
+            raise NotImplementedError(
+                f'{self._harness.__class__.__qualname__} does not support raw '
+                'injections')
+
+        return self._send(
+            lambda injections: [
+                self._harness.send_raw_injection(injections[0])],
+            [injection],
+            retry_lost=self._retry_failures,
+            payloads_per_request=self._count_payloads(injection))[0]
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        if self._retry_failures:
+            # batches are bisected here, sending each part with
+            # send_raw_injection()
+            return AbstractInjectionHarness.send_injections(self, payloads)
+
+        return self._send(self._send_payloads, payloads)
+
+    def _send_payloads(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        """Send payloads to the wrapped harness in one call."""
+        if len(payloads) == 1:
+            return [self._harness.send_injection(payloads[0])]
+
+        return self._harness.send_injections(payloads)
+
+    def _send(
+        self,
+        send: Callable[[Sequence[str]], List[Optional[str]]],
+        requests: Sequence[str],
+        retry_lost: bool = False,
+        payloads_per_request: int = 1
+    ) -> List[Optional[str]]:
+        """Send requests, retrying the attempts that were lost.
+
+        Args:
+            send: The function sending requests to the wrapped harness.
+            requests: The payloads or raw injections to send.
+            retry_lost: Whether requests that got a None response were lost,
+                and are to be retried.
+            payloads_per_request: The number of payloads in each request.
+
+        Raises:
+            EOFError, OSError: If the last attempt raised a transport error.
+
+        """
+        results: Dict[str, Optional[str]] = {}
+        pending = list(dict.fromkeys(requests))
+        for attempt in range(self._max_attempts):
+            if attempt:
+                self._wait_backoff(attempt)
+
+            try:
+                attempt_results = self._send_hedged(
+                    send, pending, len(pending) * payloads_per_request)
+            except TRANSPORT_ERRORS:
+                if attempt + 1 == self._max_attempts:
+                    raise
+                continue
+
+            results.update(zip(pending, attempt_results))
+            if not retry_lost:
+                break
+
+            pending = [
+                request for request in pending if results[request] is None]
+            if not pending:
+                break
+
+        return [results[request] for request in requests]
+
+    def _wait_backoff(
+        self,
+        attempt: int
+    ) -> None:
+        """Wait a random time before retrying a request."""
+        with self._lock:
+            self._num_retries += 1
+
+        max_wait = min(self._max_backoff, self._backoff * 2 ** (attempt - 1))
+        time.sleep(random.uniform(0, max_wait))
+
+    def _send_hedged(
+        self,
+        send: Callable[[Sequence[str]], List[Optional[str]]],
+        requests: Sequence[str],
+        num_payloads: int
+    ) -> List[Optional[str]]:
+        """Send requests, sending them again if the response is slow."""
+        hedge_delay = self.hedge_delay(num_payloads)
+        if self._executor is None or hedge_delay is None:
+            return self._send_timed(send, requests, num_payloads)
+
+        first = self._executor.submit(
+            self._send_timed, send, requests, num_payloads)
+        done, _ = wait([first], timeout=hedge_delay)
+        if done or not first.running():
+            # a request still waiting for a worker would not get a faster
+            # response by waiting for another one
+            return first.result()
+
+        second = self._executor.submit(
+            self._send_timed, send, requests, num_payloads)
+        with self._lock:
+            self._num_hedged += 1
+
+        for future in as_completed([first, second]):
+            if future.exception() is None:
+                if future is second:
+                    with self._lock:
+                        self._num_hedges_won += 1
+                return future.result()
+
+        # both sendings failed; raise the first one's error
+        return first.result()
+
+    def _send_timed(
+        self,
+        send: Callable[[Sequence[str]], List[Optional[str]]],
+        requests: Sequence[str],
+        num_payloads: int
+    ) -> List[Optional[str]]:
+        """Send requests, recording how long the target took to respond."""
+        start = time.monotonic()
+        results = send(requests)
+        latency = time.monotonic() - start
+
+        with self._lock:
+            self._latencies.setdefault(
+                num_payloads, deque(maxlen=DEFAULT_HEDGE_WINDOW)).append(
+                    latency)
+        return results
+
+    def close(
+        self
+    ) -> None:
+        """Wait for hedged requests, then close the wrapped harness."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        super().close()
+
+    @property
+    def max_attempts(
+        self
+    ) -> int:
+        """The most times a request is sent."""
+        return self._max_attempts
+
+    def hedge_delay(
+        self,
+        num_payloads: int
+    ) -> Optional[float]:
+        """Get the seconds after which a slow request is sent again.
+
+        Args:
+            num_payloads: The number of payloads in the request.
+
+        Returns:
+            The delay, or None if requests are not hedged, or if too few
+            requests with as many payloads have been sent to tell how slow
+            they usually are.
+
+        """
+        if self._executor is None:
+            return None
+
+        with self._lock:
+            latencies = sorted(self._latencies.get(num_payloads, ()))
+        if len(latencies) < DEFAULT_HEDGE_MIN_SAMPLES:
+            return None
+
+        index = min(
+            len(latencies) - 1,
+            int(len(latencies) * self._hedge_percentile))
+        return latencies[index]
+
+    @property
+    def num_retries(
+        self
+    ) -> int:
+        """The number of times a request was sent again after failing."""
+        return self._num_retries
+
+    @property
+    def num_hedged(
+        self
+    ) -> int:
+        """The number of slow requests that were sent a second time."""
+        return self._num_hedged
+
+    @property
+    def num_hedges_won(
+        self
+    ) -> int:
+        """The number of hedged requests answered by their second sending."""
+        return self._num_hedges_won
@@ -0,0 +1,97 @@
+"""Implementation of the SingleFlightInjectionHarness class."""
+
+from concurrent.futures import (
+    Future)
+from threading import (
+    Lock)
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Sequence)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from .delegating_injection_harness import (
+    DelegatingInjectionHarness)
+
+
+class SingleFlightInjectionHarness(DelegatingInjectionHarness):
+    """A harness that coalesces identical injections sent at the same time.
+
+    When a payload is sent while an identical payload is still in flight
+    (e.g., from another of the engine's jobs), it is not sent again; the
+    caller waits for the in-flight request instead, and receives its result.
+    Each payload that is answered this way is counted in :data:`coalesced`.
+
+    """
+
+    def __init__(
+        self,
+        harness: AbstractInjectionHarness
+    ) -> None:
+        super().__init__(harness)
+
+        self._lock = Lock()
+        self._in_flight: Dict[str, 'Future[Optional[str]]'] = {}
+        self._coalesced = 0
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        return self.send_injections([payload])[0]
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        led_futures: Dict[str, 'Future[Optional[str]]'] = {}
+        futures: Dict[str, 'Future[Optional[str]]'] = {}
+        with self._lock:
+            for payload in dict.fromkeys(payloads):
+                future = self._in_flight.get(payload)
+                if future is None:
+                    future = Future()
+                    self._in_flight[payload] = future
+                    led_futures[payload] = future
+                else:
+                    self._coalesced += 1
+                futures[payload] = future
+
+        # our own payloads are sent before waiting on anyone else's, so that
+        # callers waiting on each other's payloads cannot deadlock
+        if led_futures:
+            self._send_led(led_futures)
+
+        return [futures[payload].result() for payload in payloads]
+
+    def _send_led(
+        self,
+        led_futures: Dict[str, 'Future[Optional[str]]']
+    ) -> None:
+        """Send the payloads that no one else had in flight."""
+        led_payloads = list(led_futures)
+        try:
+            if len(led_payloads) == 1:
+                results = [self._harness.send_injection(led_payloads[0])]
+            else:
+                results = self._harness.send_injections(led_payloads)
+        except BaseException as e:
+            for future in led_futures.values():
+                future.set_exception(e)
+            raise
+        else:
+            for payload, result in zip(led_payloads, results):
+                led_futures[payload].set_result(result)
+        finally:
+            with self._lock:
+                for payload in led_payloads:
+                    del self._in_flight[payload]
+
+    @property
+    def coalesced(
+        self
+    ) -> int:
+        """The number of payloads answered by another caller's request."""
+        return self._coalesced
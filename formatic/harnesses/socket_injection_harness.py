@@ -0,0 +1,294 @@
+"""Implementation of the SocketInjectionHarness class."""
+
+import socket
+import time
+
+from queue import (
+    Empty,
+    LifoQueue)
+from typing import (
+    Optional)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from ..defaults import (
+    DEFAULT_INJECTION_BATCH_SIZE,
+    DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+    DEFAULT_PROBE_TIMEOUT,
+    DEFAULT_SOCKET_POOL_SIZE)
+
+
+class SocketInjectionHarness(AbstractInjectionHarness):
+    """A harness for injecting format() strings into a TCP service.
+
+    Each injection is sent as ``request_template`` with its
+    :data:`injection_marker` replaced by the injection; by default, this is
+    the injection followed by a newline. The response is read until the
+    injection's closing response marker appears, without waiting for the
+    service to close the connection. Once a connection has returned a
+    response, a line without the injection's result (e.g., an error message
+    for a bad payload) also ends the response, and the injection gets no
+    response.
+
+    Up to ``pool_size`` persistent connections are kept open and reused
+    between injections. A pooled connection closed by the service is
+    re-opened, and a connection that is closed or times out while handling
+    an injection is dropped, with the injection getting no response.
+
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        request_template: Optional[str] = None,
+        injection_marker: Optional[str] = None,
+        response_marker: Optional[str] = None,
+        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+        batch_size: int = DEFAULT_INJECTION_BATCH_SIZE,
+        pool_size: int = DEFAULT_SOCKET_POOL_SIZE,
+        timeout: float = DEFAULT_PROBE_TIMEOUT
+    ) -> None:
+        super().__init__(
+            injection_marker,
+            response_marker,
+            rand_response_marker_len,
+            batch_size)
+        self._host = host
+        self._port = port
+
+        if request_template is None:
+            request_template = f'{self._injection_marker}\n'
+        elif request_template.count(self._injection_marker) != 1:
+            raise ValueError(
+                f'Expected exactly one instance of injection marker '
+                f'{self._injection_marker} in request template '
+                f'{request_template!r}')
+        self._request_template = request_template
+
+        if pool_size < 1:
+            raise ValueError(
+                'pool_size must be a positive integer; '
+                f'{pool_size} is not acceptable')
+        self._pool_size = pool_size
+        self._timeout = timeout
+
+        # None entries are slots whose connection has not been opened yet
+        self._pool: LifoQueue = LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(None)
+
+    def build_request(
+        self,
+        injection: str
+    ) -> bytes:
+        """Build the bytes sent to the service for an injection."""
+        return self._request_template.replace(
+            self._injection_marker, injection).encode('utf-8')
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        raw_response = self.send_raw_injection(self._mark_payload(payload))
+        if raw_response is None:
+            return None
+
+        return self._parse_response(raw_response)
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        """Send an injection over a pooled connection, returning the response.
+
+        Returns:
+            The service's response up to the injection's closing response
+            marker (or the line it sent instead of the response), or None if
+            the connection was closed or timed out before it was received.
+
+        Raises:
+            ConnectionError: If no connection to the service could be opened.
+
+        """
+        request = self.build_request(injection)
+
+        conn: Optional[_Connection] = self._pool.get()
+        try:
+            # an idle pooled connection may have been closed by the service
+            # since it was last used, so it gets one retry on a new one
+            raw_response: Optional[str] = None
+            if conn is not None:
+                try:
+                    raw_response = self._request(conn, request, injection)
+                except EOFError:
+                    conn.close()
+                    conn = None
+
+            if conn is None:
+                conn = _Connection(self._new_connection())
+                try:
+                    raw_response = self._request(conn, request, injection)
+                except EOFError:
+                    raw_response = None
+
+            if raw_response is None:
+                conn.close()
+                conn = None
+                return None
+
+            # a line sent instead of the response (e.g., an error message)
+            # also leaves the service able to handle the next request
+            conn.answered = True
+            return raw_response
+        finally:
+            self._pool.put(conn)
+
+    def close(
+        self
+    ) -> None:
+        """Close all idle pooled connections."""
+        idle_conns = []
+        while True:
+            try:
+                idle_conns.append(self._pool.get_nowait())
+            except Empty:
+                break
+
+        for conn in idle_conns:
+            if conn is not None:
+                conn.close()
+            self._pool.put(None)
+
+    def _request(
+        self,
+        conn: '_Connection',
+        request: bytes,
+        injection: str
+    ) -> Optional[str]:
+        """Send a request and read until the injection's response is complete.
+
+        Once the connection has returned a response, a line without the
+        injection's result also completes the response; until then, such a
+        line may be a greeting sent by the service on connecting.
+
+        Returns:
+            The decoded response, or None if the connection was closed or
+            timed out first.
+
+        Raises:
+            EOFError: If the connection was closed before anything was read.
+
+        """
+        sock = conn.sock
+        try:
+            # output trailing an earlier response must not be read as part
+            # of this one
+            sock.settimeout(0)
+            while sock.recv(65536):
+                pass
+        except BlockingIOError:
+            pass
+        except OSError as e:
+            raise EOFError(f'Connection closed while idle: {e}') from e
+        else:
+            raise EOFError('Connection closed while idle')
+
+        try:
+            sock.sendall(request)
+        except OSError as e:
+            raise EOFError(f'Connection closed while sending: {e}') from e
+
+        deadline = time.monotonic() + self._timeout
+        raw_response = b''
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+
+            try:
+                sock.settimeout(remaining)
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                return None
+            except OSError:
+                chunk = b''
+
+            if not chunk:
+                if not raw_response:
+                    raise EOFError('Connection closed before any response')
+                return None
+
+            raw_response += chunk
+            decoded_response = raw_response.decode('utf-8', errors='replace')
+            if self._response_complete(injection, decoded_response):
+                return decoded_response
+            elif conn.answered and \
+                    self._response_rejected(injection, decoded_response):
+                return decoded_response
+
+    def _new_connection(
+        self
+    ) -> socket.socket:
+        """Open a new connection to the targeted service."""
+        try:
+            return socket.create_connection(
+                (self._host, self._port), timeout=self._timeout)
+        except OSError as e:
+            raise ConnectionError(
+                f'Unable to connect to {self._host}:{self._port}: '
+                f'{e}') from e
+
+    @property
+    def host(
+        self
+    ) -> str:
+        """The host of the targeted service."""
+        return self._host
+
+    @property
+    def port(
+        self
+    ) -> int:
+        """The port of the targeted service."""
+        return self._port
+
+    @property
+    def request_template(
+        self
+    ) -> str:
+        """The request sent to the service, with the injection marker."""
+        return self._request_template
+
+    @property
+    def pool_size(
+        self
+    ) -> int:
+        """The maximum number of open connections to the service."""
+        return self._pool_size
+
+    @property
+    def timeout(
+        self
+    ) -> float:
+        """The seconds to wait for the response to each injection."""
+        return self._timeout
+
+
+class _Connection:
+    """A pooled connection to the service."""
+
+    def __init__(
+        self,
+        sock: socket.socket
+    ) -> None:
+        self.sock = sock
+
+        # whether a response has been read over this connection, after which
+        # any greeting sent by the service has been read too
+        self.answered = False
+
+    def close(
+        self
+    ) -> None:
+        self.sock.close()
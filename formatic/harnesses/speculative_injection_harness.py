@@ -0,0 +1,148 @@
+"""Implementation of the SpeculativeInjectionHarness class."""
+
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor)
+from threading import (
+    Lock)
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from .delegating_injection_harness import (
+    DelegatingInjectionHarness)
+from ..defaults import (
+    DEFAULT_SPECULATIVE_WORKERS)
+
+
+class SpeculativeInjectionHarness(DelegatingInjectionHarness):
+    """A harness that sends prefetched payloads ahead of time.
+
+    Payloads hinted with :func:`prefetch` are sent in the background on up to
+    ``workers`` threads, packed into as few requests as the wrapped harness
+    allows; harnesses that cannot batch payloads (see
+    :data:`supports_raw_injections`) have each payload sent concurrently
+    instead. Sending a payload that is still in flight waits for its
+    response rather than sending it again.
+
+    Wrapping a :class:`CachingInjectionHarness` stores the speculative
+    responses in its cache, so that speculating a payload that was already
+    sent does not send it to the service again.
+
+    """
+
+    def __init__(
+        self,
+        harness: AbstractInjectionHarness,
+        workers: int = DEFAULT_SPECULATIVE_WORKERS
+    ) -> None:
+        super().__init__(harness)
+
+        if workers < 1:
+            raise ValueError(
+                'workers must be a positive integer; '
+                f'{workers} is not acceptable')
+        self._workers = workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix='formatic-speculative')
+
+        self._lock = Lock()
+        # each pending payload's request, and its index in that request
+        self._pending: Dict[
+            str, Tuple['Future[List[Optional[str]]]', int]] = {}
+        self._num_speculated = 0
+        self._num_used = 0
+
+    def prefetch(
+        self,
+        payloads: Sequence[str]
+    ) -> None:
+        with self._lock:
+            new_payloads = [
+                payload for payload in dict.fromkeys(payloads) if
+                payload not in self._pending]
+            if not new_payloads:
+                return
+
+            chunk_size = self._batch_size
+            if not self._harness.supports_raw_injections:
+                chunk_size = 1
+
+            for i in range(0, len(new_payloads), chunk_size):
+                chunk = new_payloads[i:i + chunk_size]
+                future = self._executor.submit(
+                    self._harness.send_injections, chunk)
+                for index, payload in enumerate(chunk):
+                    self._pending[payload] = future, index
+            self._num_speculated += len(new_payloads)
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        return self.send_injections([payload])[0]
+
+    def send_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        speculated: Dict[str, Tuple['Future[List[Optional[str]]]', int]] = {}
+        with self._lock:
+            for payload in dict.fromkeys(payloads):
+                if payload in self._pending:
+                    speculated[payload] = self._pending.pop(payload)
+            self._num_used += len(speculated)
+
+        results: Dict[str, Optional[str]] = {}
+        for payload, (future, index) in speculated.items():
+            try:
+                results[payload] = future.result()[index]
+            except Exception:
+                # a failed speculation is retried like any other payload
+                pass
+
+        missed_payloads = [
+            payload for payload in dict.fromkeys(payloads) if
+            payload not in results]
+        if len(missed_payloads) == 1:
+            results[missed_payloads[0]] = self._harness.send_injection(
+                missed_payloads[0])
+        elif missed_payloads:
+            missed_results = self._harness.send_injections(missed_payloads)
+            results.update(zip(missed_payloads, missed_results))
+
+        return [results[payload] for payload in payloads]
+
+    def close(
+        self
+    ) -> None:
+        """Wait for speculative requests, then close the wrapped harness."""
+        self._executor.shutdown(wait=True)
+        super().close()
+
+    @property
+    def workers(
+        self
+    ) -> int:
+        """The maximum number of speculative requests in flight at once."""
+        return self._workers
+
+    @property
+    def num_speculated(
+        self
+    ) -> int:
+        """The number of payloads sent ahead of time."""
+        return self._num_speculated
+
+    @property
+    def num_used(
+        self
+    ) -> int:
+        """The number of speculated payloads that were later requested."""
+        return self._num_used
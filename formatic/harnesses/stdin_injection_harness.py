@@ -0,0 +1,270 @@
+"""Implementation of the StdinInjectionHarness class."""
+
+import os
+
+from queue import (
+    Empty,
+    LifoQueue,
+    Queue)
+from subprocess import (
+    DEVNULL,
+    PIPE,
+    Popen)
+from threading import (
+    Thread)
+from typing import (
+    IO,
+    List,
+    Optional,
+    cast)
+
+from .abstract_injection_harness import (
+    AbstractInjectionHarness)
+from ..defaults import (
+    DEFAULT_INJECTION_BATCH_SIZE,
+    DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+    DEFAULT_PROBE_TIMEOUT,
+    DEFAULT_STDIN_POOL_SIZE)
+from ..utils import (
+    read_chunks)
+
+
+class StdinInjectionHarness(AbstractInjectionHarness):
+    """A harness for long-running targets that format() lines from stdin.
+
+    Up to ``pool_size`` instances of the target are started, each only once,
+    and injections are written to their stdin one per line. Each line is the
+    injection itself, or ``line_template`` with its :data:`injection_marker`
+    replaced by the injection. Output is read to the end of the line holding
+    the injection's closing response marker. Once a target process has
+    returned a response, a line without the injection's result (e.g., an
+    error message for a bad payload) also ends the response, and the
+    injection gets no response.
+
+    A target process that exits (e.g., crashing on a bad payload) or does not
+    respond within ``timeout`` seconds is replaced by a fresh one, and the
+    injection gets no response. Targets are run with ``PYTHONUNBUFFERED``
+    set, so that Python targets do not hold back output written to the pipe.
+
+    """
+
+    def __init__(
+        self,
+        args: List[str],
+        line_template: Optional[str] = None,
+        injection_marker: Optional[str] = None,
+        response_marker: Optional[str] = None,
+        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+        batch_size: int = DEFAULT_INJECTION_BATCH_SIZE,
+        pool_size: int = DEFAULT_STDIN_POOL_SIZE,
+        timeout: float = DEFAULT_PROBE_TIMEOUT
+    ) -> None:
+        super().__init__(
+            injection_marker,
+            response_marker,
+            rand_response_marker_len,
+            batch_size)
+        self._args = args
+
+        if line_template is None:
+            line_template = self._injection_marker
+        elif line_template.count(self._injection_marker) != 1:
+            raise ValueError(
+                f'Expected exactly one instance of injection marker '
+                f'{self._injection_marker} in line template {line_template}')
+        self._line_template = line_template
+
+        if pool_size < 1:
+            raise ValueError(
+                'pool_size must be a positive integer; '
+                f'{pool_size} is not acceptable')
+        self._pool_size = pool_size
+        self._timeout = timeout
+
+        # None entries are slots whose process has not been started yet
+        self._pool: LifoQueue = LifoQueue(maxsize=pool_size)
+        for _ in range(pool_size):
+            self._pool.put(None)
+
+    def build_line(
+        self,
+        injection: str
+    ) -> str:
+        """Build the line written to the target for an injection.
+
+        Raises:
+            ValueError: If the injection spans multiple lines.
+
+        """
+        if '\n' in injection or '\r' in injection:
+            raise ValueError(
+                f'Injection {injection!r} cannot be sent as a single line')
+
+        return self._line_template.replace(self._injection_marker, injection)
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        raw_response = self.send_raw_injection(self._mark_payload(payload))
+        if raw_response is None:
+            return None
+
+        return self._parse_response(raw_response)
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        """Write an injection to a target process, returning its output.
+
+        Returns:
+            The target's output up to the end of the line holding the
+            injection's closing response marker (or the line it printed
+            instead of the response), or None if the target exited or timed
+            out before printing it.
+
+        """
+        line = self.build_line(injection)
+
+        worker: Optional[_StdinWorker] = self._pool.get()
+        try:
+            if worker is None or not worker.discard_output():
+                if worker is not None:
+                    worker.stop()
+                worker = _StdinWorker(self._args)
+
+            # the process may have exited since it was last used
+            try:
+                worker.write_line(line)
+            except OSError:
+                worker.stop()
+                worker = _StdinWorker(self._args)
+                worker.write_line(line)
+
+            raw_response = self._read_response(
+                worker.chunks,
+                injection,
+                self._timeout,
+                line_based=True,
+                stop_at_rejection=worker.answered)
+            if raw_response is not None and \
+                    self._response_rejected(injection, raw_response):
+                # the target is still able to handle the next injection
+                return raw_response
+            elif raw_response is None or \
+                    not self._response_complete(injection, raw_response):
+                worker.stop()
+                worker = None
+                return None
+
+            worker.answered = True
+            return raw_response
+        finally:
+            self._pool.put(worker)
+
+    def close(
+        self
+    ) -> None:
+        """Stop all idle target processes."""
+        idle_workers = []
+        while True:
+            try:
+                idle_workers.append(self._pool.get_nowait())
+            except Empty:
+                break
+
+        for worker in idle_workers:
+            if worker is not None:
+                worker.stop()
+            self._pool.put(None)
+
+    @property
+    def args(
+        self
+    ) -> List[str]:
+        """The arguments used for starting the target processes."""
+        return self._args
+
+    @property
+    def line_template(
+        self
+    ) -> str:
+        """The line written to the target, with the injection marker."""
+        return self._line_template
+
+    @property
+    def pool_size(
+        self
+    ) -> int:
+        """The maximum number of target processes to run at once."""
+        return self._pool_size
+
+    @property
+    def timeout(
+        self
+    ) -> float:
+        """The seconds to wait for the response to each injection."""
+        return self._timeout
+
+
+class _StdinWorker:
+    """A target process, with its stdout read on a background thread."""
+
+    def __init__(
+        self,
+        args: List[str]
+    ) -> None:
+        self._proc = Popen(
+            args,
+            stdin=PIPE,
+            stdout=PIPE,
+            stderr=DEVNULL,
+            env={**os.environ, 'PYTHONUNBUFFERED': '1'})
+
+        # chunks of output, terminated by None once the process exits
+        self.chunks: 'Queue[Optional[bytes]]' = Queue()
+        Thread(
+            target=read_chunks,
+            args=(self._proc.stdout, self.chunks),
+            daemon=True).start()
+
+        # whether a response has been read from the process, after which any
+        # banner it prints on starting has been read too
+        self.answered = False
+
+    def write_line(
+        self,
+        line: str
+    ) -> None:
+        stdin = cast(IO[bytes], self._proc.stdin)
+        stdin.write(line.encode('utf-8') + b'\n')
+        stdin.flush()
+
+    def discard_output(
+        self
+    ) -> bool:
+        """Discard unread output, returning whether the process is running.
+
+        This keeps output trailing the response to one injection (e.g., the
+        rest of a multi-line error message) from being read as part of the
+        response to the next.
+
+        """
+        while True:
+            try:
+                chunk = self.chunks.get_nowait()
+            except Empty:
+                return True
+            if chunk is None:
+                return False
+
+    def stop(
+        self
+    ) -> None:
+        try:
+            cast(IO[bytes], self._proc.stdin).close()
+        except OSError:
+            pass
+        self._proc.kill()
+        self._proc.wait()
@@ -1,8 +1,13 @@
 """Implementation of the SubprocessInjectionHarness class."""
 
+from queue import (
+    Queue)
 from subprocess import (
+    DEVNULL,
     PIPE,
-    run)
+    Popen)
+from threading import (
+    Thread)
 from typing import (
     List,
     Optional)
@@ -10,21 +15,39 @@ from typing import (
 from .abstract_injection_harness import (
     AbstractInjectionHarness)
 from ..defaults import (
-    DEFAULT_INJECTION_RESPONSE_MARKER_LEN)
+    DEFAULT_INJECTION_BATCH_SIZE,
+    DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+    DEFAULT_PROBE_TIMEOUT)
+from ..utils import (
+    build_injection_args,
+    read_chunks)
 
 
 class SubprocessInjectionHarness(AbstractInjectionHarness):
-    """A harness for injecting format() strings into a local subprocess."""
+    """A harness for injecting format() strings into a local subprocess.
+
+    The subprocess's stdout is read as it is written, and the subprocess is
+    killed as soon as the injection's closing response marker has been read,
+    or once ``timeout`` seconds have passed. Its stderr is discarded.
+
+    """
 
     def __init__(
         self,
         args: List[str],
         injection_marker: Optional[str] = None,
         response_marker: Optional[str] = None,
-        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN
+        rand_response_marker_len: int = DEFAULT_INJECTION_RESPONSE_MARKER_LEN,
+        batch_size: int = DEFAULT_INJECTION_BATCH_SIZE,
+        timeout: float = DEFAULT_PROBE_TIMEOUT
     ) -> None:
-        super().__init__(injection_marker)
+        super().__init__(
+            injection_marker,
+            response_marker,
+            rand_response_marker_len,
+            batch_size)
         self._args = args
+        self._timeout = timeout
 
     def build_args(
         self,
@@ -33,54 +56,61 @@ class SubprocessInjectionHarness(AbstractInjectionHarness):
         """Build subproc args, with the :data:`injection_marker` populated.
 
         Raises:
-            ValueError: If the number of occurences of
+            ValueError: If the number of occurences of the injection marker in
+                :data:`args` is not exactly one.
 
         """
-        built_args = []
-        found_marker = False
-
-        for arg in self.args:
-            new_arg = arg
-            arg_has_marker = self._injection_marker in arg
-
-            if found_marker and arg_has_marker:
-                raise ValueError(
-                    'Multiple instances of injection marker '
-                    f'{self._injection_marker} found in specified arguments')
-            elif arg_has_marker:
-                new_arg = arg.replace(self._injection_marker, payload, 1)
-                found_marker = True
-
-            if self._injection_marker in new_arg:
-                raise ValueError(
-                    'Multiple instances of injection marker '
-                    f'{self._injection_marker} found in argument {arg}')
-
-            built_args.append(new_arg)
-
-        if not found_marker:
-            raise ValueError(
-                f'No instances of injection marker {self._injection_marker} '
-                'found in arguments')
-
-        return built_args
+        return build_injection_args(
+            self._args, self._injection_marker, payload)
 
     def send_injection(
         self,
         payload: str
     ) -> Optional[str]:
-        payload = self._mark_payload(payload)
-        args = self.build_args(payload)
-
-        proc = run(args, stdout=PIPE, stderr=PIPE)
-        raw_response = proc.stdout.decode('utf-8')
+        raw_response = self.send_raw_injection(self._mark_payload(payload))
+        if raw_response is None:
+            return None
 
         result = self._parse_response(raw_response)
         return result
 
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        """Run the subprocess until it has printed the injection's response.
+
+        Returns:
+            The subprocess's output up to the injection's closing response
+            marker, or all of its output if it exited first. None is returned
+            if the subprocess timed out.
+
+        """
+        args = self.build_args(injection)
+
+        chunks: 'Queue[Optional[bytes]]' = Queue()
+        proc = Popen(args, stdout=PIPE, stderr=DEVNULL)
+        try:
+            Thread(
+                target=read_chunks,
+                args=(proc.stdout, chunks),
+                daemon=True).start()
+            return self._read_response(chunks, injection, self._timeout)
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+
     @property
     def args(
         self
     ) -> List[str]:
         """The arguments used for generating the vulnerable subprocess."""
         return self._args
+
+    @property
+    def timeout(
+        self
+    ) -> float:
+        """The seconds to wait for the response to each injection."""
+        return self._timeout
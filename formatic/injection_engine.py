@@ -1,22 +1,69 @@
 """Implementation of the InjectionEngine class."""
 
+import asyncio
+import time
+
+from collections import (
+    deque)
+from concurrent.futures import (
+    ThreadPoolExecutor)
+from queue import (
+    Queue)
+from threading import (
+    BoundedSemaphore,
+    Event,
+    Lock)
 from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Generator,
+    Hashable,
     Iterator,
     List,
     Optional,
-    Set)
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast)
 
+from .decompilation import (
+    Decompiler)
 from .defaults import (
     DEFAULT_ATTRIBUTE_BLACKLIST,
     DEFAULT_CLASS_BLACKLIST,
+    DEFAULT_DECOMPILE_WORKERS,
     DEFAULT_FUNCTION_BLACKLIST,
-    DEFAULT_MODULE_BLACKLIST)
+    DEFAULT_MODULE_BLACKLIST,
+    DEFAULT_PENDING_WALKER_WINDOW,
+    DEFAULT_TRAVERSAL,
+    TRAVERSALS)
 from .harnesses import (
-    AbstractInjectionHarness)
+    AbstractInjectionHarness,
+    AsyncAbstractInjectionHarness)
+from .injection_stats import (
+    InjectionStats)
+from .profiling import (
+    profiler)
+from .tracing import (
+    get_result_type,
+    tracer)
+from .utils import (
+    SynchronizedSet)
 from .walkers import (
     AbstractInjectionWalker,
+    ChildWalk,
     FailedInjectionWalker,
-    ModuleInjectionWalker)
+    ModuleInjectionWalker,
+    WalkItem)
+
+WalkTask = Callable[[], Iterator[WalkItem]]
+
+# put by a pooled task after its last result
+_TASK_DONE = object()
 
 
 class InjectionEngine:
@@ -24,19 +71,47 @@ class InjectionEngine:
 
     def __init__(
         self,
-        harness: AbstractInjectionHarness,
+        harness: Union[
+            AbstractInjectionHarness, AsyncAbstractInjectionHarness],
         attribute_blacklist: Set[str] = DEFAULT_ATTRIBUTE_BLACKLIST,
         function_blacklist: Set[str] = DEFAULT_FUNCTION_BLACKLIST,
         class_blacklist: Set[str] = DEFAULT_CLASS_BLACKLIST,
-        module_blacklist: Set[str] = DEFAULT_MODULE_BLACKLIST
+        module_blacklist: Set[str] = DEFAULT_MODULE_BLACKLIST,
+        jobs: int = 1,
+        decompile_workers: int = DEFAULT_DECOMPILE_WORKERS,
+        decompile_cache_path: Optional[str] = None,
+        traversal: str = DEFAULT_TRAVERSAL
     ) -> None:
+        if jobs < 1:
+            raise ValueError(
+                f'jobs must be a positive integer; {jobs} is not acceptable')
+        elif traversal not in TRAVERSALS:
+            raise ValueError(
+                f'traversal must be one of {", ".join(TRAVERSALS)}; '
+                f'{traversal} is not acceptable')
+
         self._harness = harness
-        self._attribute_blacklist: Set[str] = set(attribute_blacklist)
-        self._class_blacklist: Set[str] = set(class_blacklist)
-        self._module_blacklist: Set[str] = set(module_blacklist)
-        self._function_blacklist: Set[str] = set(function_blacklist)
+        self._attribute_blacklist: SynchronizedSet[str] = \
+            SynchronizedSet(attribute_blacklist)
+        self._class_blacklist: SynchronizedSet[str] = \
+            SynchronizedSet(class_blacklist)
+        self._module_blacklist: SynchronizedSet[str] = \
+            SynchronizedSet(module_blacklist)
+        self._function_blacklist: SynchronizedSet[str] = \
+            SynchronizedSet(function_blacklist)
+
+        self._jobs = jobs
+        self._traversal = traversal
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stopped = Event()
+        self._idle_workers = BoundedSemaphore(jobs)
+        self._decompiler = Decompiler(
+            decompile_workers, decompile_cache_path)
+        self._stats = InjectionStats(harness)
 
         self._visited_module_walkers: List[AbstractInjectionWalker] = []
+        self._visited_walkers: Dict[Hashable, AbstractInjectionWalker] = {}
+        self._visited_walkers_lock = Lock()
 
     def run(
         self,
@@ -48,10 +123,109 @@ class InjectionEngine:
         Note that the state of the called instance is mutating throughout the
         runtime of this function.
 
+        When decompiling in worker processes (see :data:`decompiler`), a
+        walker whose source code is still being decompiled is held back while
+        the crawl continues, up to a window of
+        ``DEFAULT_PENDING_WALKER_WINDOW`` walkers. Walkers are always yielded
+        in the same order as a run that decompiles inline.
+
+        Raises:
+            TypeError: If :data:`harness` is asynchronous; use :func:`arun`
+                with such harnesses instead.
+
+        """
+        if isinstance(self._harness, AsyncAbstractInjectionHarness):
+            raise TypeError(
+                f'{self._harness.__class__.__qualname__} is an asynchronous '
+                'harness and must be driven with arun()')
+
+        self._stopped.clear()
+        yield from self._run(self._harness, injectable_index, bytecode_version)
+
+    async def arun(
+        self,
+        injectable_index: int,
+        bytecode_version: str
+    ) -> AsyncIterator[AbstractInjectionWalker]:
+        """Asynchronously yield results from sending injections.
+
+        This is a thread-bridged adapter rather than a native asynchronous
+        crawl: the walkers themselves are synchronous, so they are driven on
+        worker threads exactly as by :func:`run`, and at most :data:`jobs`
+        walks send injections at once. When :data:`harness` is an
+        :class:`AsyncAbstractInjectionHarness`, every injection they send is
+        scheduled back onto the running event loop, where the batches of a
+        single :func:`~AsyncAbstractInjectionHarness.send_injections` call are
+        all in flight at once; a synchronous harness is called from the
+        worker threads directly.
+
+        If the consumer stops iterating early or is cancelled, the walks in
+        progress are stopped and injections still in flight on the event loop
+        are cancelled.
+
         """
+        loop = asyncio.get_running_loop()
+        harness: AbstractInjectionHarness
+        if isinstance(self._harness, AsyncAbstractInjectionHarness):
+            harness = self._harness.blocking(loop)
+        else:
+            harness = self._harness
+
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def drive() -> None:
+            walker_iter = self._run(
+                harness, injectable_index, bytecode_version)
+            item: Any = done
+            try:
+                for walker in walker_iter:
+                    if self._stopped.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, walker)
+            except Exception as e:
+                item = e
+            finally:
+                walker_iter.close()
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        self._stopped.clear()
+        driver = loop.run_in_executor(None, drive)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                elif isinstance(item, Exception):
+                    raise item
+
+                yield item
+        finally:
+            self._stopped.set()
+            if harness is not self._harness:
+                harness.close()
+            await driver
+
+    def _run(
+        self,
+        harness: AbstractInjectionHarness,
+        injectable_index: int,
+        bytecode_version: str
+    ) -> Generator[AbstractInjectionWalker, None, None]:
+        """Walk the target, sending all injections through a harness."""
         format_str = f'{injectable_index}.__class__'
 
-        response: Optional[str] = self._harness.send_injection(format_str)
+        span_args: Dict[str, Any] = {'payloads': [format_str]}
+        with tracer.span('send_injection', 'network', span_args) as span, \
+                profiler.phase('network'):
+            start = time.perf_counter()
+            response: Optional[str] = harness.send_injection(format_str)
+            elapsed = time.perf_counter() - start
+            span.args['response_bytes'] = len(response) if response else 0
+            span.args['result_types'] = [get_result_type(response)]
+        self._stats.record(
+            self.__class__.__qualname__, [format_str], [response], elapsed)
+
         if not response:
             yield FailedInjectionWalker.msg(
                 'Unable to trigger initial injection at index '
@@ -66,45 +240,352 @@ class InjectionEngine:
             return
 
         walker = walker_cls(
-            self._harness, format_str, response, bytecode_version, self)
+            harness, format_str, response, bytecode_version, self)
+
+        # decompilation workers are forked before any worker threads exist
+        self._decompiler.start()
+        if self._jobs > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._jobs,
+                thread_name_prefix='formatic-worker')
+
+        held_walkers: Deque[AbstractInjectionWalker] = deque()
+        try:
+            for walker in self.drive(walker.walk_items()):
+                if isinstance(walker, ModuleInjectionWalker):
+                    self._visited_module_walkers.append(walker)
+
+                held_walkers.append(walker)
+                while held_walkers and (
+                        not held_walkers[0].pending or
+                        len(held_walkers) > DEFAULT_PENDING_WALKER_WINDOW):
+                    yield from self._release(held_walkers.popleft())
+
+            while held_walkers:
+                yield from self._release(held_walkers.popleft())
+        finally:
+            # pooled walks still in progress send no further injections
+            self._stopped.set()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self._decompiler.shutdown()
+
+    def _release(
+        self,
+        walker: AbstractInjectionWalker
+    ) -> Iterator[AbstractInjectionWalker]:
+        """Yield a walker, preceded by any failure of its deferred results."""
+        deferred_failure = walker.deferred_failure
+        if deferred_failure is not None:
+            yield deferred_failure
+        yield walker
+
+    def drive(
+        self,
+        walker_iter: Iterator[WalkItem]
+    ) -> Iterator[AbstractInjectionWalker]:
+        """Run a walk, along with all of the child walks that it yields.
+
+        Results are yielded in the same depth-first order by either
+        :data:`traversal`. The ``recursive`` traversal drives each child walk
+        with a nested call, so that every result of a walk is passed up
+        through each of its ancestors. The ``stack`` traversal instead keeps
+        the walks in progress on an explicit stack, so that the cost of
+        yielding a result does not depend on the depth of the walk that
+        produced it, and deep object graphs cannot exceed the interpreter's
+        recursion limit.
+
+        """
+        if self._traversal == 'recursive':
+            return self._drive_recursive(walker_iter)
+
+        return self._drive_stack(walker_iter)
+
+    def _drive_recursive(
+        self,
+        walker_iter: Iterator[WalkItem],
+        yield_results: bool = True
+    ) -> Iterator[AbstractInjectionWalker]:
+        """Drive a walk, recursing into each child walk that it yields."""
+        walk_gen = cast(Generator[WalkItem, None, None], walker_iter)
+        error: Optional[Exception] = None
+        while not self._stopped.is_set():
+            try:
+                if error is None:
+                    item = next(walk_gen)
+                else:
+                    item = walk_gen.throw(error)
+            except StopIteration:
+                return
+            error = None
+
+            if isinstance(item, ChildWalk):
+                try:
+                    yield from self._drive_recursive(
+                        item.walker_iter,
+                        yield_results and item.yield_results)
+                except Exception as e:
+                    error = e
+            elif yield_results:
+                yield item
+
+    def _drive_stack(
+        self,
+        walker_iter: Iterator[WalkItem]
+    ) -> Iterator[AbstractInjectionWalker]:
+        """Drive a walk, keeping the walks in progress on a stack."""
+        stack: List[Tuple[Generator[WalkItem, None, None], bool]] = [
+            (cast(Generator[WalkItem, None, None], walker_iter), True)]
+        error: Optional[Exception] = None
+        try:
+            while stack and not self._stopped.is_set():
+                walk_gen, yield_results = stack[-1]
+                try:
+                    if error is None:
+                        item = next(walk_gen)
+                    else:
+                        item = walk_gen.throw(error)
+                except StopIteration:
+                    stack.pop()
+                    error = None
+                    continue
+                except Exception as e:
+                    # raised into the parent walk, as `yield from` would
+                    stack.pop()
+                    if not stack:
+                        raise
+                    error = e
+                    continue
+                error = None
+
+                if isinstance(item, ChildWalk):
+                    child_gen = cast(
+                        Generator[WalkItem, None, None], item.walker_iter)
+                    stack.append(
+                        (child_gen, yield_results and item.yield_results))
+                elif yield_results:
+                    yield item
+        finally:
+            while stack:
+                stack.pop()[0].close()
+
+    def claim(
+        self,
+        walker: AbstractInjectionWalker
+    ) -> AbstractInjectionWalker:
+        """Atomically claim the object visited by a walker.
 
-        for walker in walker.walk():
-            if isinstance(walker, ModuleInjectionWalker):
-                self._visited_module_walkers.append(walker)
-            yield walker
+        Objects are keyed by the walker's :data:`identity`, so an object that
+        is reached from several places (e.g., a function found in both a
+        class's ``__dict__`` and a module's globals) is only walked once.
+        When such places are walked concurrently, whichever walker gets there
+        first does the walk.
+
+        Returns:
+            The first walker to claim the object, which is the specified
+            walker itself if the object had not been visited yet or has no
+            identity.
+
+        """
+        identity = walker.identity
+        if identity is None:
+            return walker
+
+        with self._visited_walkers_lock:
+            return self._visited_walkers.setdefault(identity, walker)
+
+    def is_claimed(
+        self,
+        walker: AbstractInjectionWalker
+    ) -> bool:
+        """Whether the object visited by a walker was claimed by any walker."""
+        identity = walker.identity
+        if identity is None:
+            return False
+
+        with self._visited_walkers_lock:
+            return identity in self._visited_walkers
+
+    def walk_tasks(
+        self,
+        tasks: Sequence[WalkTask],
+        yield_results: bool = True
+    ) -> Iterator[WalkItem]:
+        """Run independent walks, concurrently if :data:`jobs` allows it.
+
+        Each task is a callable returning a walk, typically the
+        :func:`~AbstractInjectionWalker.walk_items` method of a child walker.
+        When running with more than one job, the tasks following the one in
+        progress are handed to idle workers of the engine's thread pool.
+        Results are always yielded in the order of the specified tasks, so the
+        output of a crawl does not depend on the number of jobs; the results
+        of the task in progress are yielded as soon as they are produced,
+        while those of the tasks after it are held until its turn.
+
+        A task that is not running on the pool when its turn comes is run
+        inline, so that tasks spawning their own sub-tasks can never exhaust
+        the pool and deadlock. Tasks run inline are yielded as
+        :class:`ChildWalk` instances for the calling walk's driver.
+
+        Args:
+            tasks: The walks to run.
+            yield_results: Whether to yield the results of the tasks, rather
+                than only running them for their side effects on the walkers.
+
+        """
+        if self._executor is None:
+            for task in tasks:
+                yield ChildWalk(task(), yield_results)
+            return
+
+        results: 'Queue[Tuple[int, Any]]' = Queue()
+        held_results: Dict[int, List[AbstractInjectionWalker]] = {}
+        outcomes: Dict[int, Any] = {}
+        next_index = 0
+
+        def submit_upcoming(
+        ) -> None:
+            nonlocal next_index
+            while (next_index < len(tasks) and self._submit_task(
+                    tasks[next_index], next_index, results)):
+                held_results[next_index] = []
+                next_index += 1
+
+        for index, task in enumerate(tasks):
+            next_index = max(next_index, index + 1)
+            submit_upcoming()
+
+            if index not in held_results:
+                yield ChildWalk(task(), yield_results)
+                continue
+
+            walkers = held_results.pop(index)
+            if yield_results:
+                yield from walkers
+
+            while index not in outcomes:
+                result_index, item = results.get()
+                if item is _TASK_DONE or isinstance(item, Exception):
+                    outcomes[result_index] = item
+                    submit_upcoming()
+                elif result_index != index:
+                    held_results[result_index].append(item)
+                elif yield_results:
+                    yield item
+
+            outcome = outcomes.pop(index)
+            if isinstance(outcome, Exception):
+                raise outcome
+
+    def _submit_task(
+        self,
+        task: WalkTask,
+        index: int,
+        results: 'Queue[Tuple[int, Any]]'
+    ) -> bool:
+        """Hand a task to the pool if a worker is idle.
+
+        Returns:
+            Whether the task was handed to the pool.
+
+        """
+        if (self._executor is None or self._stopped.is_set() or
+                not self._idle_workers.acquire(blocking=False)):
+            return False
+
+        self._executor.submit(self._run_pooled_task, task, index, results)
+        return True
+
+    def _run_pooled_task(
+        self,
+        task: WalkTask,
+        index: int,
+        results: 'Queue[Tuple[int, Any]]'
+    ) -> None:
+        """Drain a task on a worker thread, putting its results as they come.
+
+        Each result is put as an ``(index, walker)`` pair, followed by
+        ``(index, _TASK_DONE)`` or, if the task raised, its exception.
+
+        """
+        outcome: Any = _TASK_DONE
+        try:
+            for walker in self.drive(task()):
+                results.put((index, walker))
+        except Exception as e:
+            outcome = e
+        finally:
+            self._idle_workers.release()
+            results.put((index, outcome))
 
     @property
     def harness(
         self
-    ) -> AbstractInjectionHarness:
+    ) -> Union[AbstractInjectionHarness, AsyncAbstractInjectionHarness]:
         """The harness used to send payloads to the vulnerable service."""
         return self._harness
 
+    @property
+    def decompiler(
+        self
+    ) -> Decompiler:
+        """The decompiler used for recovered code objects."""
+        return self._decompiler
+
+    @property
+    def stats(
+        self
+    ) -> InjectionStats:
+        """Counters of the injections sent by this engine's walkers."""
+        return self._stats
+
+    @property
+    def traversal(
+        self
+    ) -> str:
+        """How walks are driven; either ``recursive`` or ``stack``."""
+        return self._traversal
+
+    @property
+    def stopped(
+        self
+    ) -> bool:
+        """Whether the run has ended, so that walks should not continue."""
+        return self._stopped.is_set()
+
+    @property
+    def jobs(
+        self
+    ) -> int:
+        """The maximum number of walks that will be run concurrently."""
+        return self._jobs
+
     @property
     def attribute_blacklist(
         self
-    ) -> Set[str]:
+    ) -> SynchronizedSet[str]:
         """Attribute names that will not be followed."""
         return self._attribute_blacklist
 
     @property
     def class_blacklist(
         self
-    ) -> Set[str]:
+    ) -> SynchronizedSet[str]:
         """Base class names that will not be followed."""
         return self._class_blacklist
 
     @property
     def module_blacklist(
         self
-    ) -> Set[str]:
+    ) -> SynchronizedSet[str]:
         """Module names that will not be followed."""
         return self._module_blacklist
 
     @property
     def function_blacklist(
         self
-    ) -> Set[str]:
+    ) -> SynchronizedSet[str]:
         """Function names (qualified by module name) to not follow."""
         return self._function_blacklist
 
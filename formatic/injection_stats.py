@@ -0,0 +1,261 @@
+"""Metrics about the injections sent during a crawl."""
+
+import re
+
+from collections import (
+    Counter)
+from threading import (
+    Lock)
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Union)
+
+from .harnesses import (
+    AbstractInjectionHarness,
+    AsyncAbstractInjectionHarness,
+    CachingInjectionHarness,
+    DelegatingInjectionHarness,
+    SingleFlightInjectionHarness)
+
+# the final attribute or item accessed by a payload, ignoring its conversion
+PAYLOAD_PHASE_RE = re.compile(
+    r'(?:\.(?P<attr>\w+)|\[(?P<key>[^\]]*)\])(?:![rsa])?$')
+
+PHASES_BY_ATTRIBUTE: Dict[str, str] = {
+    '__name__': 'name',
+    '__qualname__': 'name',
+    '__doc__': 'doc',
+    '__dict__': 'dict',
+    '__globals__': 'dict',
+    '__bases__': 'bases',
+    '__code__': 'code',
+    '__module__': 'module',
+    '__class__': 'class',
+}
+
+
+def get_payload_phase(
+    payload: str
+) -> str:
+    """Get the phase of a crawl that a payload belongs to.
+
+    Phases are named after what a payload fetches: ``name``, ``doc``,
+    ``dict``, ``bases``, ``code``, ``module``, and ``class`` for the dunder
+    attributes read by walkers, ``code fields`` for the ``co_*`` attributes
+    of code objects, ``item`` for dict entries, and ``attribute`` for any
+    other attribute.
+
+    """
+    m = PAYLOAD_PHASE_RE.search(payload)
+    if m is None:
+        return 'other'
+    elif m.group('key') is not None:
+        return 'item'
+
+    attr = m.group('attr')
+    if attr in PHASES_BY_ATTRIBUTE:
+        return PHASES_BY_ATTRIBUTE[attr]
+    elif attr.startswith('co_'):
+        return 'code fields'
+
+    return 'attribute'
+
+
+class InjectionStats:
+    """Counters of the injections sent by walkers, safe to share by threads.
+
+    Each request is one call from a walker to the harness, which may carry
+    several payloads. Requests and payloads are counted per walker type, and
+    payloads are also counted per phase (see :func:`get_payload_phase`).
+    Request latencies are collected into histograms of power-of-two
+    millisecond buckets, per harness.
+
+    """
+
+    def __init__(
+        self,
+        harness: Union[
+            AbstractInjectionHarness, AsyncAbstractInjectionHarness]
+    ) -> None:
+        self._harness = harness
+        self._lock = Lock()
+
+        innermost_harness = harness
+        while isinstance(innermost_harness, DelegatingInjectionHarness):
+            innermost_harness = innermost_harness.harness
+        self._harness_name = innermost_harness.__class__.__qualname__
+
+        self._requests_by_walker: Counter = Counter()
+        self._payloads_by_walker: Counter = Counter()
+        self._payloads_by_phase: Counter = Counter()
+        self._latencies_by_harness: Dict[str, Counter] = {}
+        self._payload_bytes = 0
+        self._response_bytes = 0
+        self._failures = 0
+
+    def record(
+        self,
+        walker_type: str,
+        payloads: Sequence[str],
+        responses: Sequence[Optional[str]],
+        elapsed: float
+    ) -> None:
+        """Record a request made by a walker, and the responses it got."""
+        bucket = self.latency_bucket(elapsed)
+        with self._lock:
+            self._requests_by_walker[walker_type] += 1
+            self._payloads_by_walker[walker_type] += len(payloads)
+            self._payloads_by_phase.update(
+                get_payload_phase(payload) for payload in payloads)
+            self._latencies_by_harness.setdefault(
+                self._harness_name, Counter())[bucket] += 1
+
+            self._payload_bytes += sum(
+                len(payload.encode('utf-8')) for payload in payloads)
+            for response in responses:
+                if response is None:
+                    self._failures += 1
+                else:
+                    self._response_bytes += len(response.encode('utf-8'))
+
+    @staticmethod
+    def latency_bucket(
+        elapsed: float
+    ) -> int:
+        """Get the upper bound, in milliseconds, of a latency's bucket."""
+        bucket = 1
+        while bucket < elapsed * 1000:
+            bucket *= 2
+        return bucket
+
+    def summary(
+        self
+    ) -> List[str]:
+        """Get the lines of a human-readable summary of the counters."""
+        with self._lock:
+            lines = [
+                f'{self.requests} requests carrying {self.payloads} payloads '
+                f'({self._failures} failed)',
+                f'{self._payload_bytes} payload bytes sent, '
+                f'{self._response_bytes} response bytes received',
+                f'{self.cache_hits} payloads answered from the cache',
+                f'{self.coalesced} payloads coalesced with identical '
+                'in-flight payloads',
+                'Requests (payloads) per walker type:',
+            ]
+            for walker_type, num_requests in \
+                    self._requests_by_walker.most_common():
+                lines.append(
+                    f'  {walker_type}: {num_requests} '
+                    f'({self._payloads_by_walker[walker_type]})')
+
+            lines.append('Payloads per phase:')
+            for phase, num_payloads in self._payloads_by_phase.most_common():
+                lines.append(f'  {phase}: {num_payloads}')
+
+            for harness_name, latencies in \
+                    sorted(self._latencies_by_harness.items()):
+                lines.append(f'Request latencies of {harness_name}:')
+                for bucket in sorted(latencies):
+                    lines.append(f'  <= {bucket} ms: {latencies[bucket]}')
+
+        return lines
+
+    @property
+    def harness_name(
+        self
+    ) -> str:
+        """The name of the innermost harness that requests are sent with."""
+        return self._harness_name
+
+    @property
+    def requests(
+        self
+    ) -> int:
+        """The number of requests made by all walkers."""
+        return sum(self._requests_by_walker.values())
+
+    @property
+    def payloads(
+        self
+    ) -> int:
+        """The number of payloads sent by all walkers."""
+        return sum(self._payloads_by_walker.values())
+
+    @property
+    def requests_by_walker(
+        self
+    ) -> Dict[str, int]:
+        """The number of requests made by each type of walker."""
+        return dict(self._requests_by_walker)
+
+    @property
+    def payloads_by_walker(
+        self
+    ) -> Dict[str, int]:
+        """The number of payloads sent by each type of walker."""
+        return dict(self._payloads_by_walker)
+
+    @property
+    def payloads_by_phase(
+        self
+    ) -> Dict[str, int]:
+        """The number of payloads sent in each phase of the crawl."""
+        return dict(self._payloads_by_phase)
+
+    @property
+    def latencies_by_harness(
+        self
+    ) -> Dict[str, Dict[int, int]]:
+        """The request count of each latency bucket, for each harness."""
+        return {
+            harness_name: dict(latencies) for
+            harness_name, latencies in self._latencies_by_harness.items()}
+
+    @property
+    def payload_bytes(
+        self
+    ) -> int:
+        """The number of bytes in all payloads sent."""
+        return self._payload_bytes
+
+    @property
+    def response_bytes(
+        self
+    ) -> int:
+        """The number of bytes in all responses received."""
+        return self._response_bytes
+
+    @property
+    def failures(
+        self
+    ) -> int:
+        """The number of payloads that got no response."""
+        return self._failures
+
+    @property
+    def cache_hits(
+        self
+    ) -> int:
+        """The number of payloads answered by a caching harness."""
+        harness = self._harness
+        while isinstance(harness, DelegatingInjectionHarness):
+            if isinstance(harness, CachingInjectionHarness):
+                return harness.hits
+            harness = harness.harness
+        return 0
+
+    @property
+    def coalesced(
+        self
+    ) -> int:
+        """The number of payloads answered by an identical in-flight one."""
+        harness = self._harness
+        while isinstance(harness, DelegatingInjectionHarness):
+            if isinstance(harness, SingleFlightInjectionHarness):
+                return harness.coalesced
+            harness = harness.harness
+        return 0
@@ -0,0 +1,184 @@
+"""Attribution of a crawl's time to its phases."""
+
+import functools
+import time
+
+from threading import (
+    Lock,
+    local)
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    TypeVar,
+    cast)
+
+F = TypeVar('F', bound=Callable[..., Any])
+
+
+class PhaseProfiler:
+    """Accumulates the time spent in each phase of a crawl.
+
+    Code marks its phases with :func:`phase` or :func:`timed`, which do
+    nothing until the profiler is enabled. Phases may nest, in which case
+    time is only attributed to the innermost one. Times are summed across
+    threads, so they may add up to more than the wall time of a crawl that
+    runs several jobs.
+
+    """
+
+    def __init__(
+        self
+    ) -> None:
+        self._enabled = False
+        self._lock = Lock()
+        self._totals: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._thread_state = local()
+
+    def enable(
+        self
+    ) -> None:
+        """Start attributing time to phases."""
+        self._enabled = True
+
+    def phase(
+        self,
+        name: str
+    ) -> '_Phase':
+        """Get a context manager attributing the time within it to a phase."""
+        return _Phase(self, name)
+
+    def timed(
+        self,
+        name: str
+    ) -> Callable[[F], F]:
+        """Get a decorator attributing the time of a function to a phase."""
+        def decorator(
+            func: F
+        ) -> F:
+            @functools.wraps(func)
+            def wrapper(
+                *args: Any,
+                **kwargs: Any
+            ) -> Any:
+                if not self._enabled:
+                    return func(*args, **kwargs)
+
+                with _Phase(self, name):
+                    return func(*args, **kwargs)
+
+            return cast(F, wrapper)
+
+        return decorator
+
+    def add(
+        self,
+        name: str,
+        seconds: float
+    ) -> None:
+        """Attribute time measured elsewhere (e.g., in workers) to a phase."""
+        with self._lock:
+            self._totals[name] = self._totals.get(name, 0.0) + seconds
+
+    def summary(
+        self,
+        wall_time: float
+    ) -> List[str]:
+        """Get the lines of a human-readable summary of the phase times."""
+        with self._lock:
+            totals = dict(self._totals)
+            counts = dict(self._counts)
+
+        lines = [f'{wall_time:.3f}s wall time']
+        for name, seconds in sorted(
+                totals.items(), key=lambda item: item[1], reverse=True):
+            num_calls = counts.get(name)
+            calls_str = '' if num_calls is None else f' ({num_calls} calls)'
+            lines.append(
+                f'  {name}: {seconds:.3f}s '
+                f'{100 * seconds / max(wall_time, 1e-9):.1f}%{calls_str}')
+
+        unattributed = wall_time - sum(totals.values())
+        if unattributed > 0:
+            lines.append(f'  other: {unattributed:.3f}s')
+
+        return lines
+
+    @property
+    def enabled(
+        self
+    ) -> bool:
+        """Whether time is being attributed to phases."""
+        return self._enabled
+
+    @property
+    def totals(
+        self
+    ) -> Dict[str, float]:
+        """The seconds attributed to each phase so far."""
+        with self._lock:
+            return dict(self._totals)
+
+    def _push(
+        self,
+        name: str
+    ) -> None:
+        """Enter a phase on the current thread, pausing the enclosing one."""
+        now = time.perf_counter()
+        stack: Optional[List[List[Any]]] = getattr(
+            self._thread_state, 'stack', None)
+        if stack is None:
+            stack = self._thread_state.stack = []
+        elif stack:
+            outer_name, outer_start = stack[-1]
+            self.add(outer_name, now - outer_start)
+
+        stack.append([name, now])
+
+    def _pop(
+        self
+    ) -> None:
+        """Leave the current thread's phase, resuming the enclosing one."""
+        now = time.perf_counter()
+        stack: List[List[Any]] = self._thread_state.stack
+        name, start = stack.pop()
+        self.add(name, now - start)
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+        if stack:
+            stack[-1][1] = now
+
+
+class _Phase:
+    """A context manager attributing the time within it to a phase."""
+
+    def __init__(
+        self,
+        profiler: PhaseProfiler,
+        name: str
+    ) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._is_timed = False
+
+    def __enter__(
+        self
+    ) -> None:
+        self._is_timed = self._profiler.enabled
+        if self._is_timed:
+            self._profiler._push(self._name)
+
+    def __exit__(
+        self,
+        *exc_info: Any
+    ) -> None:
+        if self._is_timed:
+            self._profiler._pop()
+
+
+# the profiler shared by all of formatic's instrumented phases
+profiler = PhaseProfiler()
@@ -0,0 +1,201 @@
+"""Timelines of a crawl, in the Chrome trace-event format."""
+
+import json
+import os
+import re
+import threading
+import time
+
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Pattern,
+    Set,
+    Tuple)
+
+# the kind of object in a repr like <class 'int'> or <function f at 0x...>
+OBJECT_REPR_RE = re.compile(r'^<(?P<kind>[a-z_]+)[ >]')
+
+# the types of other reprs, matched in order
+RESULT_TYPE_RES: List[Tuple[str, Pattern]] = [
+    ('NoneType', re.compile(r'^None$')),
+    ('bool', re.compile(r'^(True|False)$')),
+    ('int', re.compile(r'^-?\d+$')),
+    ('bytes', re.compile(r'^b[\'"]')),
+    ('str', re.compile(r'^[\'"]')),
+    ('dict', re.compile(r'^\{')),
+    ('tuple', re.compile(r'^\(')),
+    ('list', re.compile(r'^\[')),
+]
+
+
+def get_result_type(
+    response: Optional[str]
+) -> str:
+    """Get the type of the formatted object that a response is the repr of.
+
+    Objects with reprs like ``<function f at 0x...>`` are named after the
+    first word of their repr (e.g., ``class``, ``function``, ``code``, or
+    ``module``), and builtin values after their type. Failed injections have
+    the type ``failed``, and any other response is ``other``.
+
+    """
+    if response is None:
+        return 'failed'
+
+    m = OBJECT_REPR_RE.match(response)
+    if m is not None:
+        return m.group('kind')
+
+    for result_type, result_type_re in RESULT_TYPE_RES:
+        if result_type_re.match(response):
+            return result_type
+
+    return 'other'
+
+
+class TraceRecorder:
+    """Records spans of a crawl as Chrome trace events.
+
+    Spans are recorded as complete (``"X"``) events on the thread that ran
+    them, so spans started within another span on the same thread are shown
+    nested in it. The recorded events can be written to a JSON file with
+    :func:`write`, which can be opened in ``chrome://tracing`` or Perfetto.
+    Nothing is recorded until the recorder is enabled.
+
+    """
+
+    def __init__(
+        self
+    ) -> None:
+        self._enabled = False
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._named_thread_ids: Set[int] = set()
+        self._origin = time.perf_counter()
+
+    def enable(
+        self
+    ) -> None:
+        """Start recording spans, timed from now."""
+        self._origin = time.perf_counter()
+        self._enabled = True
+
+    def span(
+        self,
+        name: str,
+        category: str,
+        args: Optional[Dict[str, Any]] = None
+    ) -> '_Span':
+        """Get a context manager recording the time within it as a span.
+
+        Arguments annotating the span may be added to the ``args`` dict of
+        the context manager until it exits.
+
+        """
+        return _Span(self, name, category, args)
+
+    def write(
+        self,
+        path: str
+    ) -> None:
+        """Write the recorded events to a trace-event JSON file."""
+        with self._lock:
+            trace = {
+                'traceEvents': list(self._events),
+                'displayTimeUnit': 'ms',
+            }
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+
+    @property
+    def enabled(
+        self
+    ) -> bool:
+        """Whether spans are being recorded."""
+        return self._enabled
+
+    @property
+    def events(
+        self
+    ) -> List[Dict[str, Any]]:
+        """The trace events recorded so far."""
+        with self._lock:
+            return list(self._events)
+
+    def _record(
+        self,
+        name: str,
+        category: str,
+        start: float,
+        end: float,
+        args: Dict[str, Any]
+    ) -> None:
+        """Record a complete event on the current thread."""
+        thread = threading.current_thread()
+        thread_id = threading.get_ident()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - self._origin) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': os.getpid(),
+            'tid': thread_id,
+            'args': args,
+        }
+
+        with self._lock:
+            if thread_id not in self._named_thread_ids:
+                self._named_thread_ids.add(thread_id)
+                self._events.append({
+                    'name': 'thread_name',
+                    'ph': 'M',
+                    'pid': os.getpid(),
+                    'tid': thread_id,
+                    'args': {'name': thread.name},
+                })
+            self._events.append(event)
+
+
+class _Span:
+    """A context manager recording the time within it as a span."""
+
+    def __init__(
+        self,
+        recorder: TraceRecorder,
+        name: str,
+        category: str,
+        args: Optional[Dict[str, Any]]
+    ) -> None:
+        self._recorder = recorder
+        self._name = name
+        self._category = category
+        self._start: Optional[float] = None
+        self.args: Dict[str, Any] = {} if args is None else args
+
+    def __enter__(
+        self
+    ) -> '_Span':
+        if self._recorder.enabled:
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        *exc_info: Any
+    ) -> None:
+        if self._start is not None:
+            self._recorder._record(
+                self._name,
+                self._category,
+                self._start,
+                time.perf_counter(),
+                self.args)
+
+
+# the recorder shared by all of formatic's traced spans
+tracer = TraceRecorder()
@@ -1,13 +1,33 @@
 """Random utilities for the formatic project."""
 
+from queue import (
+    Queue)
+from threading import (
+    Lock)
 from typing import (
-    List)
+    IO,
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    MutableSet,
+    NamedTuple,
+    Optional,
+    TypeVar)
 
+import ast
+import os
 import random
 import re
 import string
 
+from .profiling import (
+    profiler)
+
 DICT_TOP_LEVEL_KEYS_RE = re.compile(r"'(?P<name>\w+)':")
+MAPPINGPROXY_RE = re.compile(r'^mappingproxy\((?P<dict>.*)\)$', re.DOTALL)
+
+T = TypeVar('T')
 
 
 def get_random_alnum(
@@ -23,11 +43,238 @@ def get_random_alnum(
     return ''.join(random.choice(alnum_chars) for _ in range(length))
 
 
+class DictReprEntry(NamedTuple):
+    """A top-level entry parsed from the string representation of a dict.
+
+    Values that are Python literals are parsed into :data:`value`. Opaque
+    values (e.g., ``<function f at 0x...>``) are marked with a False
+    :data:`is_literal`, and can only be recovered with further injections.
+    :data:`raw_value` is None if the value's repr could not be isolated.
+
+    """
+
+    key: str
+    raw_value: Optional[str]
+    is_literal: bool
+    value: Any
+
+
+@profiler.timed('parse')
+def literal_eval(
+    raw_literal: str
+) -> Any:
+    """Evaluate the repr of a Python literal, as part of the parse phase."""
+    return ast.literal_eval(raw_literal)
+
+
+@profiler.timed('parse')
+def parse_dict_repr(
+    raw_dict_str: str
+) -> List[DictReprEntry]:
+    """Parse the top-level entries from a string representation of a dict.
+
+    The ``mappingproxy(...)`` wrapper of class ``__dict__`` reprs is accepted.
+    Entries whose keys are not identifier strings are skipped, as they cannot
+    be referenced from a format string's replacement field.
+
+    If a custom ``__repr__`` leaves unbalanced brackets or quotes in the dict
+    repr, only its keys are recovered and all of its values are opaque.
+
+    """
+    raw_dict_str = raw_dict_str.strip()
+    m = MAPPINGPROXY_RE.match(raw_dict_str)
+    if m is not None:
+        raw_dict_str = m.group('dict').strip()
+
+    raw_items: Optional[List[str]] = None
+    if raw_dict_str.startswith('{') and raw_dict_str.endswith('}'):
+        raw_items = split_top_level_reprs(raw_dict_str[1:-1])
+    if raw_items is None:
+        return [
+            DictReprEntry(key, None, False, None) for
+            key in DICT_TOP_LEVEL_KEYS_RE.findall(raw_dict_str)]
+
+    entries = []
+    for raw_item in raw_items:
+        colon_indexes = _top_level_indexes(raw_item, ':')
+        if not colon_indexes:
+            continue
+
+        raw_key = raw_item[:colon_indexes[0]].strip()
+        raw_value = raw_item[colon_indexes[0] + 1:].strip()
+        try:
+            key = literal_eval(raw_key)
+        except Exception:
+            continue
+        if not isinstance(key, str) or not key.isidentifier():
+            continue
+
+        try:
+            entries.append(DictReprEntry(
+                key, raw_value, True, literal_eval(raw_value)))
+        except Exception:
+            entries.append(DictReprEntry(key, raw_value, False, None))
+
+    return entries
+
+
 def parse_dict_top_level_keys(
     raw_dict_str: str
 ) -> List[str]:
     """Get the top level keys from a string representation of a dict."""
-    return DICT_TOP_LEVEL_KEYS_RE.findall(raw_dict_str)
+    return [entry.key for entry in parse_dict_repr(raw_dict_str)]
+
+
+def build_injection_args(
+    args: List[str],
+    injection_marker: str,
+    payload: str
+) -> List[str]:
+    """Substitute a payload for the single injection marker in some arguments.
+
+    Raises:
+        ValueError: If the number of occurences of the injection marker in the
+            specified arguments is not exactly one.
+
+    """
+    built_args = []
+    found_marker = False
+
+    for arg in args:
+        new_arg = arg
+        arg_has_marker = injection_marker in arg
+
+        if found_marker and arg_has_marker:
+            raise ValueError(
+                'Multiple instances of injection marker '
+                f'{injection_marker} found in specified arguments')
+        elif arg_has_marker:
+            new_arg = arg.replace(injection_marker, payload, 1)
+            found_marker = True
+
+        if injection_marker in new_arg:
+            raise ValueError(
+                'Multiple instances of injection marker '
+                f'{injection_marker} found in argument {arg}')
+
+        built_args.append(new_arg)
+
+    if not found_marker:
+        raise ValueError(
+            f'No instances of injection marker {injection_marker} '
+            'found in arguments')
+
+    return built_args
+
+
+def read_chunks(
+    stream: IO[bytes],
+    chunks: 'Queue[Optional[bytes]]'
+) -> None:
+    """Put the chunks of a stream on a queue as they are read.
+
+    The end of the stream is marked by putting None on the queue, after which
+    the stream is closed. This is meant to be run on a background thread, so
+    that the stream can be read with a timeout on any platform.
+
+    """
+    while True:
+        chunk = os.read(stream.fileno(), 65536)
+        if not chunk:
+            break
+        chunks.put(chunk)
+
+    stream.close()
+    chunks.put(None)
+
+
+def _top_level_indexes(
+    raw_reprs: str,
+    char: str
+) -> Optional[List[int]]:
+    """Get the indexes of a character that is not nested within any repr.
+
+    Occurrences inside string literals and any kind of brackets, including
+    the angle brackets of reprs like ``<code object f at 0x...>``, are not
+    considered top-level.
+
+    Returns:
+        The indexes, or None if the brackets or quotes in the specified text
+        are unbalanced.
+
+    """
+    indexes = []
+    depth = 0
+    quote: Optional[str] = None
+
+    i = 0
+    while i < len(raw_reprs):
+        c = raw_reprs[i]
+        if quote is not None:
+            if c == '\\':
+                i += 1
+            elif c == quote:
+                quote = None
+        elif c in '\'"':
+            quote = c
+        elif c in '([{<':
+            depth += 1
+        elif c in ')]}>':
+            depth -= 1
+            if depth < 0:
+                return None
+        elif c == char and depth == 0:
+            indexes.append(i)
+        i += 1
+
+    if quote is not None or depth != 0:
+        return None
+
+    return indexes
+
+
+def split_top_level_reprs(
+    raw_reprs: str
+) -> Optional[List[str]]:
+    """Split comma-separated reprs, ignoring commas nested within each repr.
+
+    Returns:
+        The stripped reprs, or None if the brackets or quotes in the
+        specified text are unbalanced.
+
+    """
+    comma_indexes = _top_level_indexes(raw_reprs, ',')
+    if comma_indexes is None:
+        return None
+
+    reprs = []
+    start = 0
+    for i in comma_indexes:
+        reprs.append(raw_reprs[start:i].strip())
+        start = i + 1
+
+    last_repr = raw_reprs[start:].strip()
+    if last_repr:
+        reprs.append(last_repr)
+
+    return reprs
+
+
+@profiler.timed('parse')
+def parse_tuple_repr(
+    raw_tuple_str: str
+) -> Optional[List[str]]:
+    """Get the reprs of the elements from a string representation of a tuple.
+
+    Returns:
+        The element reprs, or None if the text is not a well-formed tuple.
+
+    """
+    raw_tuple_str = raw_tuple_str.strip()
+    if not raw_tuple_str.startswith('(') or not raw_tuple_str.endswith(')'):
+        return None
+
+    return split_top_level_reprs(raw_tuple_str[1:-1])
 
 
 def indent_lines(
@@ -37,3 +284,71 @@ def indent_lines(
     lines = text.splitlines()
     indented_lines = [f'    {line}' for line in lines]
     return '\n'.join(indented_lines)
+
+
+class SynchronizedSet(MutableSet[T]):
+    """A set that can be safely shared between threads.
+
+    Iteration happens over a snapshot of the set's contents, so the set may be
+    modified by other threads while it is being iterated.
+
+    """
+
+    def __init__(
+        self,
+        items: Optional[Iterable[T]] = None
+    ) -> None:
+        self._lock = Lock()
+        self._items = set() if items is None else set(items)
+
+    def add(
+        self,
+        item: T
+    ) -> None:
+        with self._lock:
+            self._items.add(item)
+
+    def add_if_absent(
+        self,
+        item: T
+    ) -> bool:
+        """Atomically add an item, returning whether it was not yet present."""
+        with self._lock:
+            if item in self._items:
+                return False
+
+            self._items.add(item)
+            return True
+
+    def discard(
+        self,
+        item: T
+    ) -> None:
+        with self._lock:
+            self._items.discard(item)
+
+    def __contains__(
+        self,
+        item: object
+    ) -> bool:
+        with self._lock:
+            return item in self._items
+
+    def __iter__(
+        self
+    ) -> Iterator[T]:
+        with self._lock:
+            snapshot = list(self._items)
+        return iter(snapshot)
+
+    def __len__(
+        self
+    ) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def __repr__(
+        self
+    ) -> str:
+        with self._lock:
+            return f'{self.__class__.__qualname__}({self._items!r})'
@@ -2,6 +2,9 @@ from .abstract_injection_walker import (  # noqa
     AbstractInjectionWalker)
 from .attribute_injection_walker import (  # noqa
     AttributeInjectionWalker)
+from .child_walk import (  # noqa
+    ChildWalk,
+    WalkItem)
 from .class_injection_walker import (  # noqa
     ClassInjectionWalker)
 from .code_object_injection_walker import (  # noqa
@@ -2,20 +2,35 @@
 
 from __future__ import annotations
 
+import functools
 import re
+import time
 
 from abc import (
     ABC,
     abstractmethod)
 from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
     Iterator,
+    List,
     Optional,
+    Sequence,
     Type,
     TypeVar,
     TYPE_CHECKING)
 
+from .child_walk import (
+    WalkItem)
 from ..harnesses import (
     AbstractInjectionHarness)
+from ..profiling import (
+    profiler)
+from ..tracing import (
+    get_result_type,
+    tracer)
 
 if TYPE_CHECKING:
     from ..injection_engine import (
@@ -24,6 +39,8 @@ if TYPE_CHECKING:
 
 T = TypeVar('T', bound='AbstractInjectionWalker')
 
+ADDRESS_RE = r' at 0x(?P<address>[0-9a-fA-F]+)>$'
+
 
 class AbstractInjectionWalker(ABC):
     """Recursive classes to walk all injection branches of a target."""
@@ -44,6 +61,8 @@ class AbstractInjectionWalker(ABC):
         self._raw_result = result_str
         self._bytecode_version = bytecode_version
         self._engine = engine
+        self._prefetched_responses: Dict[str, Optional[str]] = {}
+        self._linked_walker: Optional[AbstractInjectionWalker] = None
 
         self.__extra_init__()
 
@@ -67,21 +86,77 @@ class AbstractInjectionWalker(ABC):
                 'Descendants of AbstractInjectionResult must define the class '
                 'property RESPONSE_RE')
 
-    @abstractmethod
+        if 'walk_items' in cls.__dict__:
+            cls.walk_items = cls._traced_walk(  # type: ignore
+                cls.__dict__['walk_items'])
+
+    @staticmethod
+    def _traced_walk(
+        walk: Callable[[T], Iterator[WalkItem]]
+    ) -> Callable[[T], Iterator[WalkItem]]:
+        """Wrap a walk_items() method, recording each walk as a span."""
+        @functools.wraps(walk)
+        def traced_walk(
+            self: T
+        ) -> Iterator[WalkItem]:
+            if not tracer.enabled:
+                yield from walk(self)
+                return
+
+            span_args = {'injection': self._injection_str}
+            with tracer.span(self.__class__.__qualname__, 'walk', span_args):
+                yield from walk(self)
+
+        return traced_walk
+
     def walk(
         self
     ) -> Iterator[AbstractInjectionWalker]:
         """Yield all subsequent injections from the current instance.
 
-        Args:
-            visited_injections: A sequence of injection strings that have
-                already been sent to the client; this is needed in order to
-                prevent cycles in the graph of injections
+        The walk, along with all of its child walks, is driven by the engine
+        (see :func:`InjectionEngine.drive`).
 
         Returns:
             An iterator of other :class:`AbstractInjectionResult` instances.
 
         """
+        return self._engine.drive(self.walk_items())
+
+    @abstractmethod
+    def walk_items(
+        self
+    ) -> Iterator[WalkItem]:
+        """Yield the results and child walks of the current instance.
+
+        This is the step-by-step form of :func:`walk` implemented by each
+        walker: rather than re-yielding the results of its children, it
+        yields a :class:`ChildWalk` for each child walk and is resumed once
+        the engine has run it.
+
+        Returns:
+            An iterator of other :class:`AbstractInjectionResult` instances,
+            and of :class:`ChildWalk` instances for child walks, which must
+            be driven by :func:`InjectionEngine.drive`.
+
+        """
+
+    @classmethod
+    def follow_up_injections(
+        cls,
+        injection_str: str
+    ) -> List[str]:
+        """Get the payloads that walking an object is known to send.
+
+        Walker types whose follow-up injections are predictable declare them
+        here, so that they can be sent ahead of time (see
+        :func:`_speculate`); by default, there are none.
+
+        Args:
+            injection_str: The injection string of the object to be walked.
+
+        """
+        return []
 
     def empty_instance(
         self,
@@ -95,6 +170,104 @@ class AbstractInjectionWalker(ABC):
             self._bytecode_version,
             self._engine)
 
+    def _prefetch_injections(
+        self,
+        payloads: Sequence[str]
+    ) -> None:
+        """Send injections ahead of time, in as few requests as possible.
+
+        The responses are held until they are requested by this walker via
+        :func:`_send_injection`.
+
+        """
+        if not payloads:
+            return
+
+        responses = self._send_payloads(payloads)
+        self._prefetched_responses.update(zip(payloads, responses))
+
+    def _speculate(
+        self,
+        walkers: Sequence[AbstractInjectionWalker]
+    ) -> None:
+        """Hint the harness with the follow-up injections of child walkers.
+
+        This should be called as soon as the children to be walked are known,
+        so that harnesses like :class:`SpeculativeInjectionHarness` can send
+        the children's injections while the walk continues. Children whose
+        objects were already visited are skipped, as they will not be walked.
+
+        """
+        payloads = [
+            payload for walker in walkers if
+            not self._engine.is_claimed(walker) for
+            payload in walker.follow_up_injections(walker.injection_str)]
+        if payloads:
+            self._harness.prefetch(payloads)
+
+    def _send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        """Send an injection, using a prefetched response if one exists."""
+        if payload in self._prefetched_responses:
+            return self._prefetched_responses.pop(payload)
+
+        return self._send_payloads([payload])[0]
+
+    def _send_payloads(
+        self,
+        payloads: Sequence[str]
+    ) -> List[Optional[str]]:
+        """Send payloads through the harness, recording the request."""
+        if self._engine.stopped:
+            # the run has ended; let the walk wind down without the target
+            return [None] * len(payloads)
+
+        span_name = 'send_injection'
+        if len(payloads) > 1:
+            span_name = 'send_injections'
+        span_args: Dict[str, Any] = {'payloads': list(payloads)}
+
+        with tracer.span(span_name, 'network', span_args) as span, \
+                profiler.phase('network'):
+            start = time.perf_counter()
+            if len(payloads) == 1:
+                responses = [self._harness.send_injection(payloads[0])]
+            else:
+                responses = self._harness.send_injections(payloads)
+            elapsed = time.perf_counter() - start
+
+            if tracer.enabled:
+                span.args['response_bytes'] = sum(
+                    len(response) for response in responses if response)
+                span.args['result_types'] = [
+                    get_result_type(response) for response in responses]
+
+        self._engine.stats.record(
+            self.__class__.__qualname__, payloads, responses, elapsed)
+        return responses
+
+    def _claim(
+        self
+    ) -> bool:
+        """Claim this walker's object, so that no other walker visits it.
+
+        If the object was already claimed by another walker, this walker is
+        linked to that one (see :data:`linked_walker`) and should not be
+        walked any further.
+
+        Returns:
+            Whether this walker is the first to visit its object.
+
+        """
+        canonical_walker = self._engine.claim(self)
+        if canonical_walker is self:
+            return True
+
+        self._linked_walker = canonical_walker
+        return False
+
     def next_walker(
         self,
         injection_str: str,
@@ -116,6 +289,7 @@ class AbstractInjectionWalker(ABC):
             self._engine)
 
     @staticmethod
+    @profiler.timed('parse')
     def matching_subclass(
         injection_str: str,
         response_str: str
@@ -150,6 +324,65 @@ class AbstractInjectionWalker(ABC):
         """The raw injection result returned by the target."""
         return self._raw_result
 
+    @property
+    def identity(
+        self
+    ) -> Optional[Hashable]:
+        """A key identifying the object in the target that this walker visits.
+
+        By default, this is the walker type and the address from a repr like
+        ``<function f at 0x7f...>``; it is None if the object has no identity
+        that can be recovered from its repr, or if addresses do not identify
+        objects across injections (see
+        :data:`AbstractInjectionHarness.stable_addresses`).
+
+        """
+        if not self._harness.stable_addresses:
+            return None
+
+        m = re.search(ADDRESS_RE, self._raw_result)
+        if m is None:
+            return None
+
+        return self.__class__.__qualname__, int(m.group('address'), 16)
+
+    @property
+    def pending(
+        self
+    ) -> bool:
+        """Whether this walker's results are still being computed.
+
+        Results like decompiled source code may be computed in the background
+        after a walk completes; reading them from a pending walker blocks
+        until they are ready.
+
+        """
+        return False
+
+    @property
+    def deferred_failure(
+        self
+    ) -> Optional[AbstractInjectionWalker]:
+        """A failure in the results computed after this walker was yielded.
+
+        This is only read once the walker is no longer :data:`pending`; the
+        engine reports the failure just before the walker itself.
+
+        """
+        return None
+
+    @property
+    def linked_walker(
+        self
+    ) -> Optional[AbstractInjectionWalker]:
+        """The walker that first visited this walker's object, if not this one.
+
+        Walkers that rediscover an already-visited object are linked to that
+        object's first walker rather than fetching it again.
+
+        """
+        return self._linked_walker
+
     @property
     def bytecode_version(
         self
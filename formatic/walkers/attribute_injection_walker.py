@@ -1,7 +1,5 @@
 """Implementation of the AttributeInjectionWalker class."""
 
-import ast
-
 from typing import (
     Iterator,
     Optional)
@@ -12,6 +10,8 @@ from .failed_injection_walker import (
     FailedInjectionWalker)
 from ..defaults import (
     DEFAULT_UNKNOWN_ATTRIBUTE_VALUE)
+from ..utils import (
+    literal_eval)
 
 
 class AttributeInjectionWalker(AbstractInjectionWalker):
@@ -49,11 +49,11 @@ class AttributeInjectionWalker(AbstractInjectionWalker):
         """The source code used to define this attribute."""
         return self._src_code
 
-    def walk(
+    def walk_items(
         self
     ) -> Iterator[AbstractInjectionWalker]:
         try:
-            self._value = ast.literal_eval(self._raw_result)
+            self._value = literal_eval(self._raw_result)
 
             attr_name = self._injection_str.split('.')[-1]
             if attr_name.startswith('__globals__['):
@@ -0,0 +1,35 @@
+"""Implementation of the ChildWalk class."""
+
+from __future__ import annotations
+
+from typing import (
+    Any,
+    Iterator,
+    NamedTuple,
+    Union,
+    TYPE_CHECKING)
+
+if TYPE_CHECKING:
+    from .abstract_injection_walker import (
+        AbstractInjectionWalker)
+
+
+class ChildWalk(NamedTuple):
+    """A walk that a walker yields for the engine to run in its place.
+
+    Rather than re-yielding the results of its children with ``yield from``,
+    a walker yields a :class:`ChildWalk` for each of them and is resumed once
+    the child's walk is exhausted, so that the engine decides how walks are
+    driven (see :func:`InjectionEngine.drive`). If the child's walk raises,
+    the exception is raised in the walker at the point where it yielded the
+    :class:`ChildWalk`.
+
+    """
+
+    # an iterator of WalkItem; mypy cannot check recursive types
+    walker_iter: Iterator[Any]
+    yield_results: bool = True
+
+
+# an item yielded by a walk
+WalkItem = Union['AbstractInjectionWalker', ChildWalk]
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import re
+
 from typing import (
+    Hashable,
     Iterator,
     List,
     Optional,
@@ -12,6 +15,9 @@ from .abstract_injection_walker import (
     AbstractInjectionWalker)
 from .attribute_injection_walker import (
     AttributeInjectionWalker)
+from .child_walk import (
+    ChildWalk,
+    WalkItem)
 from .doc_string_injection_walker import (
     DocStringInjectionWalker)
 from .failed_injection_walker import (
@@ -24,7 +30,11 @@ from .name_injection_walker import (
     NameInjectionWalker)
 from ..utils import (
     indent_lines,
-    parse_dict_top_level_keys)
+    parse_dict_repr,
+    parse_dict_top_level_keys,
+    parse_tuple_repr)
+
+CLASS_REPR_RE = r"^<class '(?P<qualified_name>[^']+)'>$"
 
 
 class ClassInjectionWalker(AbstractInjectionWalker):
@@ -44,21 +54,27 @@ class ClassInjectionWalker(AbstractInjectionWalker):
         self._module_name_walker = self.empty_instance(NameInjectionWalker)
 
         self._base_class_walkers: List[ClassInjectionWalker] = []
+        self._base_class_names: List[str] = []
         self._attribute_walkers: List[AttributeInjectionWalker] = []
         self._function_walkers: List[FunctionInjectionWalker] = []
 
         self._src_code: Optional[str] = None
+        self._is_walked = False
 
-    def walk(
+    def walk_items(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
+        if not self._claim():
+            return
+
+        self._prefetch_injections(
+            self.follow_up_injections(self._injection_str))
+
         yield from self._walk_name()
         if not self._name_walker.is_default:
             if self._name_walker.value in self._engine.class_blacklist:
                 return
 
-            self._engine.class_blacklist.add(self._name_walker.value)
-
         yield from self._walk_module_name()
         if not self._module_name_walker.is_default:
             if self._module_name_walker.value in self._engine.module_blacklist:
@@ -68,17 +84,29 @@ class ClassInjectionWalker(AbstractInjectionWalker):
         yield from self._walk_base_classes()
         yield from self._walk_dict()
 
-        self._gen_src_code()
+        self._is_walked = True
         yield self
 
         yield from self._walk_globals()
 
+    @classmethod
+    def follow_up_injections(
+        cls,
+        injection_str: str
+    ) -> List[str]:
+        return [
+            f'{injection_str}.__name__!r',
+            f'{injection_str}.__module__!r',
+            f'{injection_str}.__doc__!r',
+            f'{injection_str}.__bases__',
+            f'{injection_str}.__dict__']
+
     def _walk_name(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Recover the class's __name__."""
         name_injection = f'{self._injection_str}.__name__!r'
-        result = self._harness.send_injection(name_injection)
+        result = self._send_injection(name_injection)
         if result is None:
             yield FailedInjectionWalker.msg(
                 f'Unable to read response from injection {name_injection}')
@@ -91,15 +119,15 @@ class ClassInjectionWalker(AbstractInjectionWalker):
                 f'got {walker.__class__.__qualname__} instead')
             return
 
-        yield from walker.walk()
+        yield ChildWalk(walker.walk_items())
         self._name_walker = walker
 
     def _walk_module_name(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Recover the class's __module__ name."""
         module_name_injection = f'{self._injection_str}.__module__!r'
-        result = self._harness.send_injection(module_name_injection)
+        result = self._send_injection(module_name_injection)
         if result is None:
             yield FailedInjectionWalker.msg(
                 'Unable to inject __module__ name for class '
@@ -116,15 +144,15 @@ class ClassInjectionWalker(AbstractInjectionWalker):
                 f'{walker.__class__.__qualname__} instead')
             return
 
-        yield from walker.walk()
+        yield ChildWalk(walker.walk_items())
         self._module_name_walker = walker
 
     def _walk_doc(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Recover the class's __doc__."""
         docstring_injection = f'{self._injection_str}.__doc__!r'
-        result = self._harness.send_injection(docstring_injection)
+        result = self._send_injection(docstring_injection)
         if result is None:
             yield FailedInjectionWalker.msg(
                 'Unable to retrieve injection response from string '
@@ -139,67 +167,94 @@ class ClassInjectionWalker(AbstractInjectionWalker):
                 f'{walker.__class__.__qualname__} instead')
             return
 
-        yield from walker.walk()
+        yield ChildWalk(walker.walk_items())
         self._docstring_walker = walker
 
     def _walk_base_classes(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Walk the class's base classes via __bases__."""
         base_classes_injection = f'{self._injection_str}.__bases__'
-        result = self._harness.send_injection(base_classes_injection)
+        result = self._send_injection(base_classes_injection)
         if result is None:
             yield FailedInjectionWalker.msg(
                 'Unable to retrieve injection response from string '
                 f'{base_classes_injection}')
             return
 
-        i = 0
-        while True:
+        # the tuple's repr names each base class, so the bases do not need to
+        # be enumerated by index nor have their names read individually
+        raw_bases = parse_tuple_repr(result)
+        if raw_bases is None:
+            yield FailedInjectionWalker.msg(
+                f'Unable to parse __bases__ tuple {result} from injection '
+                f'{base_classes_injection}')
+            return
+
+        base_class_walkers: List[ClassInjectionWalker] = []
+        base_class_names: List[str] = []
+        for i, raw_base in enumerate(raw_bases):
             base_class_indexed_injection = (
                 f'{self._injection_str}.__bases__[{i}]')
-            result = self._harness.send_injection(base_class_indexed_injection)
-            if result is None:
-                break
-
             base_class_walker = self.next_walker(
-                base_class_indexed_injection, result)
+                base_class_indexed_injection, raw_base)
             if not isinstance(base_class_walker, ClassInjectionWalker):
                 yield FailedInjectionWalker.msg(
                     'Expected class injection walker from response but got '
                     f'{base_class_walker.__class__.__qualname__} instead')
                 return
 
-            base_class_name_injection = (
-                f'{base_class_indexed_injection}.__name__!r')
-            result = self._harness.send_injection(base_class_name_injection)
-            if result is None:
-                break
+            base_class_name = self._parse_class_repr_name(raw_base)
+            if base_class_name is None:
+                # classes with a custom metaclass __repr__ still need their
+                # name read from the service
+                base_class_name_injection = (
+                    f'{base_class_indexed_injection}.__name__!r')
+                result = self._send_injection(base_class_name_injection)
+                if result is None:
+                    continue
+
+                base_class_name_walker = self.next_walker(
+                    base_class_name_injection, result)
+                if not isinstance(base_class_name_walker,
+                                  NameInjectionWalker):
+                    yield FailedInjectionWalker.msg(
+                        'Expected name injection walker from injection '
+                        f'{base_class_name_injection} but got'
+                        f'{base_class_name_walker.__class__.__qualname__} '
+                        'instead')
+                    return
+
+                yield ChildWalk(base_class_name_walker.walk_items())
+                base_class_name = base_class_name_walker.value
 
-            base_class_name_walker = self.next_walker(
-                base_class_name_injection, result)
-            if not isinstance(base_class_name_walker, NameInjectionWalker):
-                yield FailedInjectionWalker.msg(
-                    'Expected name injection walker from injection '
-                    f'{base_class_name_injection} but got'
-                    f'{base_class_name_walker.__class__.__qualname__} instead')
-                return
-
-            yield from base_class_name_walker.walk()
-
-            base_class_name = base_class_name_walker.value
             if (base_class_name is None or
                     base_class_name in self._engine.class_blacklist):
-                i += 1
                 continue
 
-            yield from base_class_walker.walk()
-            self._base_class_walkers.append(base_class_walker)
-            i += 1
+            base_class_walkers.append(base_class_walker)
+            base_class_names.append(base_class_name)
+
+        self._speculate(base_class_walkers)
+        yield from self._engine.walk_tasks(
+            [walker.walk_items for walker in base_class_walkers])
+        self._base_class_walkers.extend(base_class_walkers)
+        self._base_class_names.extend(base_class_names)
+
+    @staticmethod
+    def _parse_class_repr_name(
+        raw_class_repr: str
+    ) -> Optional[str]:
+        """Get the __name__ of a class from its default repr, if possible."""
+        m = re.match(CLASS_REPR_RE, raw_class_repr)
+        if m is None:
+            return None
+
+        return m.group('qualified_name').rsplit('.', 1)[-1]
 
     def _walk_dict(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Walk the class's attrs, funcs, and other fields via __dict__."""
         key_blacklist: Set[str] = set(self._engine.attribute_blacklist)
         # below fields are visited manually
@@ -212,7 +267,7 @@ class ClassInjectionWalker(AbstractInjectionWalker):
         }
 
         dict_injection = f'{self._injection_str}.__dict__'
-        result = self._harness.send_injection(dict_injection)
+        result = self._send_injection(dict_injection)
         if result is None:
             yield FailedInjectionWalker.msg(
                 'Unable to recover __dict__ from class with '
@@ -220,15 +275,24 @@ class ClassInjectionWalker(AbstractInjectionWalker):
             return
         self._raw_dict_str = result
 
-        # now that we have the top-level __dict__ keys, we will iterate over
-        # them and inspect any interesting attributes that we get back
-        top_level_keys = parse_dict_top_level_keys(self._raw_dict_str)
-        for key in top_level_keys:
-            if key in key_blacklist:
-                continue
-
-            injection_str = f'{self._injection_str}.{key}!r'
-            result = self._harness.send_injection(injection_str)
+        # literal values are taken straight from the __dict__ dump; opaque
+        # ones are re-read through attribute access, as descriptors (e.g.,
+        # staticmethod objects) look different from the class than they do
+        # in its __dict__
+        dict_entries = [
+            entry for entry in parse_dict_repr(self._raw_dict_str) if
+            entry.key not in key_blacklist]
+        self._prefetch_injections(
+            [f'{self._injection_str}.{entry.key}!r' for
+             entry in dict_entries if not entry.is_literal])
+
+        key_walkers: List[AbstractInjectionWalker] = []
+        for entry in dict_entries:
+            injection_str = f'{self._injection_str}.{entry.key}!r'
+            if entry.is_literal:
+                result = entry.raw_value
+            else:
+                result = self._send_injection(injection_str)
             if result is None:
                 yield FailedInjectionWalker.msg(
                     'Unable to read injection response with string '
@@ -245,12 +309,17 @@ class ClassInjectionWalker(AbstractInjectionWalker):
                     self._bytecode_version,
                     self._engine)
 
-            yield from next_walker.walk()
+            key_walkers.append(next_walker)
 
-            if isinstance(next_walker, FunctionInjectionWalker):
-                self._function_walkers.append(next_walker)
-            elif isinstance(next_walker, AttributeInjectionWalker):
-                self._attribute_walkers.append(next_walker)
+        self._speculate(key_walkers)
+        yield from self._engine.walk_tasks(
+            [walker.walk_items for walker in key_walkers])
+
+        for walker in key_walkers:
+            if isinstance(walker, FunctionInjectionWalker):
+                self._function_walkers.append(walker)
+            elif isinstance(walker, AttributeInjectionWalker):
+                self._attribute_walkers.append(walker)
 
     def _gen_src_code(
         self
@@ -258,35 +327,34 @@ class ClassInjectionWalker(AbstractInjectionWalker):
         """Populate this class's :data:`src_code` property."""
         cls_name = self._name_walker.value
 
-        self._src_code = 'class '
+        src_code = 'class '
         if cls_name is None:
-            self._src_code += '<UNKNOWN>'
+            src_code += '<UNKNOWN>'
         else:
-            self._src_code += cls_name
+            src_code += cls_name
 
-        base_cls_names = [
-            base_cls_walker.name_walker.value for
-            base_cls_walker in self._base_class_walkers if
-            base_cls_walker.name_walker is not None and
-            base_cls_walker.name_walker.value is not None]
-        self._src_code += '('
-        self._src_code += ', '.join(base_cls_names)
-        self._src_code += '):\n'
+        # names are taken from the __bases__ repr, as base classes that were
+        # already visited elsewhere are not walked again
+        src_code += '('
+        src_code += ', '.join(self._base_class_names)
+        src_code += '):\n'
 
         doc_string = self._docstring_walker.value
         if doc_string:
-            self._src_code += f'    """{doc_string}"""\n\n'
+            src_code += f'    """{doc_string}"""\n\n'
 
         for attr_walker in self._attribute_walkers:
-            self._src_code += f'    {attr_walker.name} = {attr_walker.value}\n'
+            src_code += f'    {attr_walker.name} = {attr_walker.value}\n'
 
         for func_walker in self._function_walkers:
             if func_walker.src_code is not None:
-                self._src_code += f'\n{indent_lines(func_walker.src_code)}\n'
+                src_code += f'\n{indent_lines(func_walker.src_code)}\n'
+
+        self._src_code = src_code
 
     def _walk_globals(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Walk the __globals__ dict, escaping into the above module."""
         if not self._function_walkers:
             return
@@ -295,7 +363,7 @@ class ClassInjectionWalker(AbstractInjectionWalker):
         func_walker: FunctionInjectionWalker = self._function_walkers[-1]
         globals_injection_str = (
             f'{func_walker.injection_str.rstrip("!r")}.__globals__')
-        result = self._harness.send_injection(globals_injection_str)
+        result = self._send_injection(globals_injection_str)
         if result is None:
             yield FailedInjectionWalker.msg(
                 'Unable to recover injection response with string '
@@ -315,7 +383,23 @@ class ClassInjectionWalker(AbstractInjectionWalker):
             result,
             self._bytecode_version,
             self._engine)
-        yield from module_injection_walker.walk()
+        yield ChildWalk(module_injection_walker.walk_items())
+
+    @property
+    def identity(
+        self
+    ) -> Optional[Hashable]:
+        """The qualified name of the class, from its repr.
+
+        Class reprs do not include an address, so the module and qualified
+        name are used to identify the class instead.
+
+        """
+        m = re.match(CLASS_REPR_RE, self._raw_result)
+        if m is None:
+            return self.__class__.__qualname__, self._raw_result
+
+        return self.__class__.__qualname__, m.group('qualified_name')
 
     @property
     def raw_dict_str(
@@ -370,9 +454,21 @@ class ClassInjectionWalker(AbstractInjectionWalker):
     def src_code(
         self
     ) -> Optional[str]:
-        """The recovered source code from the injected class."""
+        """The recovered source code from the injected class.
+
+        This blocks until decompilation of the class's functions completes.
+
+        """
+        if self._src_code is None and self._is_walked:
+            self._gen_src_code()
         return self._src_code
 
+    @property
+    def pending(
+        self
+    ) -> bool:
+        return any(walker.pending for walker in self._function_walkers)
+
     def __str__(
         self
     ) -> str:
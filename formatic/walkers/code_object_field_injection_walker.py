@@ -42,7 +42,7 @@ class CodeObjectFieldInjectionWalker(AbstractInjectionWalker):
         """The value extracted from the field injection."""
         return self._value
 
-    def walk(
+    def walk_items(
         self
     ) -> Iterator[AbstractInjectionWalker]:
         # there is nothing further to walk
@@ -1,27 +1,32 @@
 """Implementation of the CodeObjectInjectionWalker class."""
 
-import ast
 import re
 
-from io import (
-    StringIO)
+from concurrent.futures import (
+    Future)
 from types import (
     CodeType)
-from uncompyle6.main import (
-    decompile)
-from xdis.magics import (
-    py_str2float)
 
 from typing import (
+    Any,
+    Dict,
     Iterator,
+    List,
     Optional)
 
 from .abstract_injection_walker import (
     AbstractInjectionWalker)
+from .child_walk import (
+    WalkItem)
 from .code_object_field_injection_walker import (
     CodeObjectFieldInjectionWalker)
 from .failed_injection_walker import (
     FailedInjectionWalker)
+from ..decompilation import (
+    DecompilationError)
+from ..utils import (
+    literal_eval,
+    parse_tuple_repr)
 
 
 class CodeObjectInjectionWalker(AbstractInjectionWalker):
@@ -51,7 +56,9 @@ class CodeObjectInjectionWalker(AbstractInjectionWalker):
 
     These attributes are then passed to the ``uncompyle6`` byte-code
     decompilation engine, producing the reconstructed source code of the
-    injected code object.
+    injected code object. Decompilation is scheduled on the engine's
+    :class:`~formatic.decompilation.Decompiler` and may still be
+    :data:`pending` once the walk completes.
 
     See:
         https://stackoverflow.com/a/16123158/5094008
@@ -61,21 +68,73 @@ class CodeObjectInjectionWalker(AbstractInjectionWalker):
     INJECTION_RE = None
     RESPONSE_RE = r'<code object .+ at 0x[0-9a-fA-F]+, file .+, line .+>'
 
+    # fields that can be read with a single injection each; code objects
+    # nested within co_consts require further injections
+    FIELD_NAMES = (
+        'co_argcount',
+        'co_kwonlyargcount',
+        'co_nlocals',
+        'co_stacksize',
+        'co_flags',
+        'co_code',
+        'co_consts',
+        'co_names',
+        'co_varnames',
+        'co_filename',
+        'co_name',
+        'co_firstlineno',
+        'co_lnotab',
+        'co_freevars',
+        'co_cellvars',
+    )
+
     def __extra_init__(
         self
     ) -> None:
         super().__extra_init__()
 
         self._src_code: Optional[str] = None
+        self._src_future: Optional['Future[str]'] = None
+        self._decompile_error: Optional[str] = None
         self._code_obj: Optional[CodeType] = None
 
     @property
     def src_code(
         self
     ) -> Optional[str]:
-        """The source code of the code's body (if recovered)."""
+        """The source code of the code's body (if recovered).
+
+        This blocks until decompilation of the code object completes, and is
+        None if it failed (see :data:`decompile_error`).
+
+        """
+        if (self._src_code is None and self._src_future is not None and
+                self._decompile_error is None):
+            try:
+                self._src_code = self._src_future.result()
+            except DecompilationError as e:
+                self._decompile_error = str(e)
         return self._src_code
 
+    @property
+    def decompile_error(
+        self
+    ) -> Optional[str]:
+        """Why the code object could not be decompiled, if it could not be.
+
+        Like :data:`src_code`, this blocks until decompilation completes.
+
+        """
+        if self.src_code is not None:
+            return None
+        return self._decompile_error
+
+    @property
+    def pending(
+        self
+    ) -> bool:
+        return self._src_future is not None and not self._src_future.done()
+
     @property
     def code_obj(
         self
@@ -92,12 +151,15 @@ class CodeObjectInjectionWalker(AbstractInjectionWalker):
             ValueError: If any optional fields on this instance are None.
 
         """
-        if self._code_obj is None or self._src_code is None:
+        if self._code_obj is None or self._src_future is None:
             raise ValueError(f'Incomplete {self.__class__.__qualname__}')
 
-    def walk(
+    def walk_items(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
+        self._prefetch_injections(
+            self.follow_up_injections(self._injection_str))
+
         try:
             co_argcount_inj_walker = self._read_co_argcount()
             yield co_argcount_inj_walker
@@ -117,7 +179,7 @@ class CodeObjectInjectionWalker(AbstractInjectionWalker):
             co_code_inj_walker = self._read_co_code()
             yield co_code_inj_walker
 
-            co_consts_inj_walker: AbstractInjectionWalker
+            co_consts_inj_walker: WalkItem
             for walker in self._read_co_consts():
                 yield walker
                 co_consts_inj_walker = walker
@@ -172,20 +234,20 @@ class CodeObjectInjectionWalker(AbstractInjectionWalker):
             co_freevars_inj_walker.value,
             co_cellvars_inj_walker.value)
 
-        bytecode_version_float = py_str2float(self._bytecode_version)
-        with StringIO() as f:
-            decompile(bytecode_version_float, self._code_obj, out=f)
-            raw_decompiled_src_body = f.getvalue()
-
-        decompiled_src_body = raw_decompiled_src_body.replace(
-            '\n\n\n', '\n\n')
-        lines = [
-            line for line in decompiled_src_body.splitlines()
-            if not line.lstrip().startswith('# ')]
-        self._src_code = '\n'.join(lines)
+        self._src_future = self._engine.decompiler.submit(
+            self._code_obj, self._bytecode_version)
 
         yield self
 
+    @classmethod
+    def follow_up_injections(
+        cls,
+        injection_str: str
+    ) -> List[str]:
+        return [
+            f'{injection_str}.{field_name}!r' for
+            field_name in cls.FIELD_NAMES]
+
     def _read_code_field(
         self,
         field_name: str,
@@ -197,13 +259,13 @@ class CodeObjectInjectionWalker(AbstractInjectionWalker):
 
         """
         injection_str = f'{self._injection_str}.{field_name}!r'
-        raw_result = self._harness.send_injection(injection_str)
+        raw_result = self._send_injection(injection_str)
         if raw_result is None:
             raise ValueError(
                 f'Unable to retrieve {field_name} field from code object '
                 f'injection with string {injection_str}')
 
-        parsed_result = ast.literal_eval(raw_result)
+        parsed_result = literal_eval(raw_result)
         return CodeObjectFieldInjectionWalker(
             self._harness,
             injection_str.rstrip('!r'),
@@ -248,49 +310,52 @@ class CodeObjectInjectionWalker(AbstractInjectionWalker):
 
     def _read_co_consts(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
-        parsed_elts = []
-        i = 0
-        while True:
-            elt_injection = f'{self._injection_str}.co_consts[{i}]!r'
-            raw_elt = self._harness.send_injection(elt_injection)
-            if raw_elt is None:
-                break
+    ) -> Iterator[WalkItem]:
+        consts_injection = f'{self._injection_str}.co_consts!r'
+        raw_consts = self._send_injection(consts_injection)
+        if raw_consts is None:
+            raise ValueError(
+                'Unable to retrieve co_consts field from code object '
+                f'injection with string {consts_injection}')
+
+        # the whole tuple is read at once, so only the code objects within it
+        # need further injections to be recovered
+        raw_elts = parse_tuple_repr(raw_consts)
+        if raw_elts is None:
+            raise ValueError(f'Unable to parse co_consts {raw_consts}')
+
+        parsed_elts: List[Any] = []
+        code_obj_walkers: Dict[int, CodeObjectInjectionWalker] = {}
+        for i, raw_elt in enumerate(raw_elts):
+            elt_injection_str = f'{self._injection_str}.co_consts[{i}]'
 
             try:
-                value = ast.literal_eval(raw_elt)
+                value = literal_eval(raw_elt)
                 yield CodeObjectFieldInjectionWalker(
                     self._harness,
-                    elt_injection.rstrip('!r'),
+                    elt_injection_str,
                     raw_elt,
                     self._bytecode_version,
                     self._engine,
                     value)
 
                 parsed_elts.append(value)
-
-                i += 1
                 continue
             except Exception:
                 pass
 
             m = re.match(self.__class__.RESPONSE_RE, raw_elt)
             if m:
-                injection_str = elt_injection[:-2]
                 code_obj_walker = CodeObjectInjectionWalker(
                     self._harness,
-                    injection_str,
+                    elt_injection_str,
                     raw_elt,
                     self._bytecode_version,
                     self._engine)
-                yield code_obj_walker
-                for sub_walker in code_obj_walker.walk():
-                    pass
 
-                code_obj_walker.assert_populated()
-                parsed_elts.append(code_obj_walker.code_obj)
-
-                i += 1
+                # placeholder until the nested code object is walked below
+                code_obj_walkers[i] = code_obj_walker
+                parsed_elts.append(None)
                 continue
 
             raise ValueError(f'Unable to parse co_const {raw_elt}')
@@ -299,10 +364,20 @@ class CodeObjectInjectionWalker(AbstractInjectionWalker):
             raise ValueError(
                 'Got an empty tuple for co_consts; this should never happen!')
 
+        # nested code objects are yielded below, rather than their fields
+        self._speculate(list(code_obj_walkers.values()))
+        tasks = [walker.walk_items for walker in code_obj_walkers.values()]
+        yield from self._engine.walk_tasks(tasks, yield_results=False)
+
+        for i, code_obj_walker in code_obj_walkers.items():
+            code_obj_walker.assert_populated()
+            parsed_elts[i] = code_obj_walker.code_obj
+            yield code_obj_walker
+
         yield CodeObjectFieldInjectionWalker(
             self._harness,
             f'{self._injection_str}.co_consts',
-            'placeholder',
+            raw_consts,
             self._bytecode_version,
             self._engine,
             tuple(parsed_elts))
@@ -1,7 +1,5 @@
 """Implementation of the DocStringInjectionWalker class."""
 
-import ast
-
 from typing import (
    Iterator)
 
@@ -11,6 +9,8 @@ from .failed_injection_walker import (
     FailedInjectionWalker)
 from ..defaults import (
     DEFAULT_UNKNOWN_DOC_STRING)
+from ..utils import (
+    literal_eval)
 
 
 class DocStringInjectionWalker(AbstractInjectionWalker):
@@ -33,11 +33,11 @@ class DocStringInjectionWalker(AbstractInjectionWalker):
         """The docstring recovered from the __doc__ attribute injection."""
         return self._value
 
-    def walk(
+    def walk_items(
         self
     ) -> Iterator[AbstractInjectionWalker]:
         try:
-            value = ast.literal_eval(self._raw_result)
+            value = literal_eval(self._raw_result)
             if not isinstance(self.value, str):
                 raise ValueError()
             self._value = value
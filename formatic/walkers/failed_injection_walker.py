@@ -20,7 +20,7 @@ class FailedInjectionWalker(AbstractInjectionWalker):
     ) -> None:
         self._reason: str = 'Injection failed for unknown reason'
 
-    def walk(
+    def walk_items(
         self
     ) -> Iterator[AbstractInjectionWalker]:
         # empty
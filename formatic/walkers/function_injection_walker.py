@@ -7,11 +7,16 @@ from types import (
     FunctionType)
 
 from typing import (
+    Hashable,
     Iterator,
+    List,
     Optional)
 
 from .abstract_injection_walker import (
     AbstractInjectionWalker)
+from .child_walk import (
+    ChildWalk,
+    WalkItem)
 from .code_object_injection_walker import (
     CodeObjectInjectionWalker)
 from .doc_string_injection_walker import (
@@ -39,6 +44,8 @@ class FunctionInjectionWalker(AbstractInjectionWalker):
         self._code_walker: Optional[CodeObjectInjectionWalker] = None
         self._name_walker: NameInjectionWalker = \
             self.empty_instance(NameInjectionWalker)
+        self._module_name_walker: NameInjectionWalker = \
+            self.empty_instance(NameInjectionWalker)
         self._docstring_walker: DocStringInjectionWalker = \
             self.empty_instance(DocStringInjectionWalker)
         self._src_code: Optional[str] = None
@@ -75,9 +82,36 @@ class FunctionInjectionWalker(AbstractInjectionWalker):
     def src_code(
         self
     ) -> Optional[str]:
-        """The source code that this walker recovered from the target."""
+        """The source code that this walker recovered from the target.
+
+        This blocks until decompilation of the function's code completes, and
+        is None if it failed.
+
+        """
+        if (self._src_code is None and self._code_walker is not None and
+                self._code_walker.src_code is not None):
+            self._gen_src_code(self._code_walker)
         return self._src_code
 
+    @property
+    def pending(
+        self
+    ) -> bool:
+        return self._code_walker is not None and self._code_walker.pending
+
+    @property
+    def deferred_failure(
+        self
+    ) -> Optional[AbstractInjectionWalker]:
+        if (self._code_walker is None or
+                self._code_walker.decompile_error is None):
+            return None
+
+        return FailedInjectionWalker.msg(
+            f'Unable to decompile function {self._name_walker.value} from '
+            f'injection {self._injection_str}: '
+            f'{self._code_walker.decompile_error}')
+
     @property
     def signature(
         self
@@ -85,20 +119,35 @@ class FunctionInjectionWalker(AbstractInjectionWalker):
         """The decompiled function's signature, if one was retrieved."""
         return self._signature
 
-    def walk(
+    def walk_items(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
+        if not self._claim():
+            return
+
+        needs_module_name = not self._harness.stable_addresses
+        self._prefetch_injections([
+            f'{self._injection_str}.__qualname__!r',
+            *([f'{self._injection_str}.__module__!r'] if
+              needs_module_name else []),
+            f'{self._injection_str}.__doc__!r',
+            f'{self._injection_str}.__code__'])
+
         yield from self._walk_name()
         if not self._name_walker.is_default:
             if self._name_walker.value in self._engine.function_blacklist:
                 return
 
-            self._engine.function_blacklist.add(self._name_walker.value)
+        if needs_module_name:
+            # the function is identified by its module and qualified name
+            yield from self._walk_module_name()
+            if not self._claim():
+                return
 
         yield from self._walk_docstring()
 
         code_obj_injection = f'{self._injection_str}.__code__'
-        raw_result = self._harness.send_injection(code_obj_injection)
+        raw_result = self._send_injection(code_obj_injection)
         if raw_result is None:
             yield FailedInjectionWalker.msg(
                 'Unable to recover injection response from string '
@@ -117,33 +166,53 @@ class FunctionInjectionWalker(AbstractInjectionWalker):
                 'attribute; something is terribly wrong...')
             return
 
-        for sub_walker in walker.walk():
-            yield sub_walker
+        yield ChildWalk(walker.walk_items())
 
-        if walker.code_obj is None or walker.src_code is None:
+        if walker.code_obj is None:
             yield FailedInjectionWalker.msg(
                 'Unable to successfully recover code object from string '
                 f'{walker.injection_str}')
             return
 
-        src_lines = ([] if walker.src_code is None else
-                     walker.src_code.splitlines())
-        indented_src_lines = [f'   {line}' for line in src_lines]
         self._signature = self.__class__.code_obj_to_signature(
             walker.code_obj)
-        self._src_code = f'{self._signature}\n'
-        if self._docstring_walker.value:
-            self._src_code += f'    """{self._docstring_walker.value}"""\n'
-        self._src_code += '\n'.join(indented_src_lines)
+        self._code_walker = walker
 
         yield self
 
+    @classmethod
+    def follow_up_injections(
+        cls,
+        injection_str: str
+    ) -> List[str]:
+        # the code object's fields are read right after the function's own
+        code_injection_str = f'{injection_str}.__code__'
+        return [
+            f'{injection_str}.__qualname__!r',
+            f'{injection_str}.__doc__!r',
+            code_injection_str,
+            *CodeObjectInjectionWalker.follow_up_injections(
+                code_injection_str)]
+
+    def _gen_src_code(
+        self,
+        code_walker: CodeObjectInjectionWalker
+    ) -> None:
+        """Populate this function's :data:`src_code` property."""
+        src_lines = (code_walker.src_code or '').splitlines()
+        indented_src_lines = [f'   {line}' for line in src_lines]
+        src_code = f'{self._signature}\n'
+        if self._docstring_walker.value:
+            src_code += f'    """{self._docstring_walker.value}"""\n'
+        src_code += '\n'.join(indented_src_lines)
+        self._src_code = src_code
+
     def _walk_name(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Recover the function's __name__ attribute."""
         name_injection = f'{self._injection_str}.__qualname__!r'
-        result = self._harness.send_injection(name_injection)
+        result = self._send_injection(name_injection)
         if result is None:
             yield FailedInjectionWalker.msg(
                 'Unable to read __name__ of function via injection '
@@ -157,15 +226,29 @@ class FunctionInjectionWalker(AbstractInjectionWalker):
                 f'but got {walker.__class__.__qualname__} instead')
             return
 
-        yield from walker.walk()
+        yield ChildWalk(walker.walk_items())
         self._name_walker = walker
 
+    def _walk_module_name(
+        self
+    ) -> Iterator[WalkItem]:
+        """Recover the function's __module__ attribute."""
+        module_name_injection = f'{self._injection_str}.__module__!r'
+        result = self._send_injection(module_name_injection)
+        if result is None:
+            return
+
+        walker = self.next_walker(module_name_injection, result)
+        if isinstance(walker, NameInjectionWalker):
+            yield ChildWalk(walker.walk_items(), yield_results=False)
+            self._module_name_walker = walker
+
     def _walk_docstring(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Recover the function's __doc__ attribute."""
         doc_string_injection = f'{self._injection_str}.__doc__!r'
-        result = self._harness.send_injection(doc_string_injection)
+        result = self._send_injection(doc_string_injection)
         if result is None:
             yield FailedInjectionWalker.msg(
                 'Unable to read __doc__ of function via injection '
@@ -179,9 +262,32 @@ class FunctionInjectionWalker(AbstractInjectionWalker):
                 f'but got {walker.__class__.__qualname__} instead')
             return
 
-        yield from walker.walk()
+        yield ChildWalk(walker.walk_items())
         self._docstring_walker = walker
 
+    @property
+    def identity(
+        self
+    ) -> Optional[Hashable]:
+        """The function's address or, if addresses are not stable, its name.
+
+        Without stable addresses, the function is identified by its module
+        and qualified name once both have been recovered. Functions whose
+        qualified names are not unique within their module (e.g., lambdas
+        and functions defined inside other functions) have no identity.
+
+        """
+        if self._harness.stable_addresses:
+            return super().identity
+        elif (self._name_walker.is_default or
+                self._module_name_walker.is_default or
+                '<' in self._name_walker.value):
+            return None
+
+        return (self.__class__.__qualname__,
+                self._module_name_walker.value,
+                self._name_walker.value)
+
     @staticmethod
     def code_obj_to_signature(
         code_obj: CodeType
@@ -2,7 +2,12 @@
 
 import re
 
+from functools import (
+    partial)
 from typing import (
+    Callable,
+    Dict,
+    Hashable,
     Iterator,
     List,
     Optional,
@@ -12,6 +17,9 @@ from .abstract_injection_walker import (
     AbstractInjectionWalker)
 from .attribute_injection_walker import (
     AttributeInjectionWalker)
+from .child_walk import (
+    ChildWalk,
+    WalkItem)
 from .doc_string_injection_walker import (
     DocStringInjectionWalker)
 from .failed_injection_walker import (
@@ -21,7 +29,7 @@ from .function_injection_walker import (
 from .name_injection_walker import (
     NameInjectionWalker)
 from ..utils import (
-    parse_dict_top_level_keys)
+    parse_dict_repr)
 
 if TYPE_CHECKING:
     from .class_injection_walker import (
@@ -48,27 +56,42 @@ class ModuleInjectionWalker(AbstractInjectionWalker):
         self._attribute_walkers: List[AttributeInjectionWalker] = []
 
         self._src_code: Optional[str] = None
+        self._is_walked = False
 
-    def walk(
+        # the reprs of values in the dumped namespace are exactly what
+        # injecting ``[key]!r`` would return, so they are used directly
+        self._raw_values: Dict[str, Optional[str]] = {
+            entry.key: entry.raw_value for
+            entry in parse_dict_repr(self._raw_result)}
+
+    def walk_items(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
+        self._prefetch_injections(
+            [f'{self._injection_str}[{key}]!r' for
+             key in ('__name__', '__doc__', *self._raw_values) if
+             self._raw_values.get(key) is None])
+
         yield from self._walk_name()
         if not self._name_walker.is_default:
             if self._name_walker.value in self._engine.module_blacklist:
                 return
+            elif not self._claim():
+                return
 
         yield from self._walk_doc()
 
-        top_level_dict_keys = parse_dict_top_level_keys(self._raw_result)
-        if not top_level_dict_keys:
+        if not self._raw_values:
             yield FailedInjectionWalker.msg(
                 'Unable to parse dictionary keys from response '
                 f'{self._raw_result} from injection {self._injection_str}')
             return
 
-        for key in top_level_dict_keys:
+        key_walkers: List[AbstractInjectionWalker] = []
+        tasks: List[Callable[[], Iterator[WalkItem]]] = []
+        for key in self._raw_values:
             key_injection_str = f'{self._injection_str}[{key}]!r'
-            result = self._harness.send_injection(key_injection_str)
+            result = self._read_key(key)
             if result is None:
                 yield FailedInjectionWalker.msg(
                     'Unable to recover response from injection string '
@@ -77,29 +100,10 @@ class ModuleInjectionWalker(AbstractInjectionWalker):
 
             next_walker = self.next_walker(key_injection_str, result)
             if next_walker is not None:
-                yield from next_walker.walk()
-
-                from .class_injection_walker import ClassInjectionWalker  # noqa
-                if isinstance(next_walker, ClassInjectionWalker):
-                    self._class_walkers.append(next_walker)
-                elif isinstance(next_walker, FunctionInjectionWalker):
-                    self._function_walkers.append(next_walker)
-
+                key_walkers.append(next_walker)
+                tasks.append(next_walker.walk_items)
             elif re.search(MODULE_RE, result):
-                mod_dict_injection_str = (
-                    f'{key_injection_str.rstrip("!r")}.__dict__')
-                result = self._harness.send_injection(
-                    mod_dict_injection_str)
-                if result is None:
-                    yield FailedInjectionWalker.msg(
-                        'Unable to recover expected module __dict__ via '
-                        f'injection string {mod_dict_injection_str}')
-                yield from ModuleInjectionWalker(
-                    self._harness,
-                    mod_dict_injection_str,
-                    result,
-                    self._bytecode_version,
-                    self._engine).walk()
+                tasks.append(partial(self._walk_module, key_injection_str))
             else:
                 attr_walker = AttributeInjectionWalker(
                     self._harness,
@@ -107,21 +111,61 @@ class ModuleInjectionWalker(AbstractInjectionWalker):
                     result,
                     self._bytecode_version,
                     self._engine)
-                self._attribute_walkers.append(attr_walker)
-                yield from attr_walker.walk()
+                key_walkers.append(attr_walker)
+                tasks.append(attr_walker.walk_items)
+
+        self._speculate(key_walkers)
+        yield from self._engine.walk_tasks(tasks)
+
+        from .class_injection_walker import ClassInjectionWalker  # noqa
+        for walker in key_walkers:
+            if isinstance(walker, ClassInjectionWalker):
+                self._class_walkers.append(walker)
+            elif isinstance(walker, FunctionInjectionWalker):
+                self._function_walkers.append(walker)
+            elif isinstance(walker, AttributeInjectionWalker):
+                self._attribute_walkers.append(walker)
+
+        self._is_walked = True
+        yield self
 
-        if not self._name_walker.is_default:
-            self._engine.module_blacklist.add(self._name_walker.value)
+    def _read_key(
+        self,
+        key: str
+    ) -> Optional[str]:
+        """Get the repr of a value in this module's namespace."""
+        raw_value = self._raw_values.get(key)
+        if raw_value is not None:
+            return raw_value
+
+        return self._send_injection(f'{self._injection_str}[{key}]!r')
+
+    def _walk_module(
+        self,
+        key_injection_str: str
+    ) -> Iterator[WalkItem]:
+        """Walk a module referenced from this module's namespace."""
+        mod_dict_injection_str = f'{key_injection_str.rstrip("!r")}.__dict__'
+        result = self._send_injection(mod_dict_injection_str)
+        if result is None:
+            yield FailedInjectionWalker.msg(
+                'Unable to recover expected module __dict__ via '
+                f'injection string {mod_dict_injection_str}')
+            return
 
-        self._gen_src_code()
-        yield self
+        yield ChildWalk(ModuleInjectionWalker(
+            self._harness,
+            mod_dict_injection_str,
+            result,
+            self._bytecode_version,
+            self._engine).walk_items())
 
     def _walk_name(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Recover this module's __name__ attribute."""
         name_injection = f'{self._injection_str}[__name__]!r'
-        result = self._harness.send_injection(name_injection)
+        result = self._read_key('__name__')
         if result is None:
             yield FailedInjectionWalker.msg(
                 f'Unable to read response from injection {name_injection} '
@@ -136,16 +180,15 @@ class ModuleInjectionWalker(AbstractInjectionWalker):
                 f'{walker.__class__.__qualname__} instead')
             return
 
-        yield from walker.walk()
+        yield ChildWalk(walker.walk_items())
         self._name_walker = walker
 
     def _walk_doc(
         self
-    ) -> Iterator[AbstractInjectionWalker]:
+    ) -> Iterator[WalkItem]:
         """Recover this module's __doc__ attribute."""
         docstring_injection = f'{self._injection_str}[__doc__]!r'
-        print(docstring_injection)
-        result = self._harness.send_injection(docstring_injection)
+        result = self._read_key('__doc__')
         if result is None:
             yield FailedInjectionWalker.msg(
                 'Unable to inject __doc__ attribute of module '
@@ -162,33 +205,49 @@ class ModuleInjectionWalker(AbstractInjectionWalker):
                 f'{walker.__class__.__qualname__} instead')
             return
 
-        yield from walker.walk()
+        yield ChildWalk(walker.walk_items())
         self._docstring_walker = walker
 
     def _gen_src_code(
         self
     ) -> None:
         """Populate this class's :data:`src_code` property."""
-        self._src_code = ''
+        src_code = ''
         if self._docstring_walker.value:
-            self._src_code = f'"""{self._docstring_walker.value}"""\n\n'
+            src_code = f'"""{self._docstring_walker.value}"""\n\n'
 
-        self._src_code += '\n'.join(
+        src_code += '\n'.join(
             [attr_walker.src_code for attr_walker in self._attribute_walkers
              if attr_walker.src_code is not None])
 
-        self._src_code += '\n\n'
+        src_code += '\n\n'
 
-        self._src_code += '\n\n\n'.join(
+        src_code += '\n\n\n'.join(
             [func_walker.src_code for func_walker in self._function_walkers
              if func_walker.src_code is not None])
 
-        self._src_code += '\n\n'
+        src_code += '\n\n'
 
-        self._src_code += '\n\n\n'.join(
+        src_code += '\n\n\n'.join(
             [class_walker.src_code for class_walker in self._class_walkers
              if class_walker.src_code is not None])
 
+        self._src_code = src_code
+
+    @property
+    def identity(
+        self
+    ) -> Optional[Hashable]:
+        """The module's __name__, once it has been recovered.
+
+        Module names are unique within the target's ``sys.modules``.
+
+        """
+        if self._name_walker.is_default:
+            return None
+
+        return self.__class__.__qualname__, self._name_walker.value
+
     @property
     def name_walker(
         self
@@ -228,9 +287,24 @@ class ModuleInjectionWalker(AbstractInjectionWalker):
     def src_code(
         self
     ) -> Optional[str]:
-        """The module's decompiled source code."""
+        """The module's decompiled source code.
+
+        This blocks until decompilation of the module's functions and
+        classes completes.
+
+        """
+        if self._src_code is None and self._is_walked:
+            self._gen_src_code()
         return self._src_code
 
+    @property
+    def pending(
+        self
+    ) -> bool:
+        return any(
+            walker.pending for walker in
+            [*self._function_walkers, *self._class_walkers])
+
     def __str__(
         self
     ) -> str:
@@ -1,7 +1,5 @@
 """Implementation of the NameInjectionWalker class."""
 
-import ast
-
 from typing import (
    Iterator)
 
@@ -11,6 +9,8 @@ from .failed_injection_walker import (
     FailedInjectionWalker)
 from ..defaults import (
     DEFAULT_UNKNOWN_CLASS_NAME)
+from ..utils import (
+    literal_eval)
 
 
 class NameInjectionWalker(AbstractInjectionWalker):
@@ -41,11 +41,11 @@ class NameInjectionWalker(AbstractInjectionWalker):
         """Whether this is the default class name."""
         return self._is_default
 
-    def walk(
+    def walk_items(
         self
     ) -> Iterator[AbstractInjectionWalker]:
         try:
-            value = ast.literal_eval(self._raw_result)
+            value = literal_eval(self._raw_result)
             if not isinstance(value, str):
                 raise ValueError()
 
@@ -0,0 +1,79 @@
+"""Tests for the batching logic of the AbstractInjectionHarness class."""
+
+from types import (
+    SimpleNamespace)
+from typing import (
+    Any,
+    List,
+    Optional)
+
+from formatic import (
+    InProcessInjectionHarness)
+
+MARKER = 'MARK'
+
+
+class RecordingHarness(InProcessInjectionHarness):
+    """Formats injections in-process, recording how many payloads each held."""
+
+    def __init__(
+        self,
+        root_obj: Any,
+        batch_size: int = 8
+    ) -> None:
+        super().__init__(
+            root_obj, response_marker=MARKER, batch_size=batch_size)
+        self.sent: List[int] = []
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        self.sent.append(self._count_payloads(injection))
+        return super().send_raw_injection(injection)
+
+
+def make_root(
+    **attrs: str
+) -> SimpleNamespace:
+    return SimpleNamespace(**{f'a{i}': f'value{i}' for i in range(8)}, **attrs)
+
+
+def test_batch_recovers_good_fields_around_bad_ones():
+    harness = RecordingHarness(make_root())
+
+    results = harness.send_injections(
+        ['0.a0', '0.missing', '0.a1!r', '0.a2:>7', '0.a3:d'])
+    assert results == ['value0', None, "'value1'", ' value2', None]
+
+
+def test_batch_is_bisected_down_to_the_failing_field():
+    harness = RecordingHarness(make_root())
+
+    payloads = [f'0.a{i}' for i in range(8)]
+    payloads[5] = '0.missing'
+    results = harness.send_injections(payloads)
+
+    assert results == [
+        'value0', 'value1', 'value2', 'value3', 'value4', None, 'value6',
+        'value7']
+    assert harness.sent == [8, 4, 4, 2, 1, 1, 2]
+
+
+def test_batches_are_split_by_batch_size():
+    harness = RecordingHarness(make_root(), batch_size=3)
+
+    results = harness.send_injections([f'0.a{i}' for i in range(8)])
+    assert results == [f'value{i}' for i in range(8)]
+    assert harness.sent == [3, 3, 2]
+
+
+def test_field_holding_marker_like_text_is_recovered():
+    injection = f'{MARKER}0{MARKER}{{0.echo}}{MARKER}1{MARKER}'
+    harness = RecordingHarness(make_root(
+        delimiter=f'x{MARKER}1{MARKER}y',
+        echo=injection))
+
+    results = harness.send_injections(
+        ['0.delimiter', '0.a0', '0.echo', '0.a1'])
+    assert results == [f'x{MARKER}1{MARKER}y', 'value0', injection, 'value1']
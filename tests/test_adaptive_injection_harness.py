@@ -0,0 +1,127 @@
+"""Tests for the AdaptiveInjectionHarness class."""
+
+import time
+
+from threading import (
+    Lock,
+    Thread)
+from typing import (
+    List,
+    Optional)
+
+from formatic import (
+    AbstractInjectionHarness,
+    AdaptiveInjectionHarness)
+
+TIMEOUT = 10
+
+
+class ScriptedHarness(AbstractInjectionHarness):
+    """Formats payloads against an int, failing on demand.
+
+    The next ``num_failures`` requests get no response, and every request
+    takes at least ``latency`` seconds.
+
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0
+    ) -> None:
+        super().__init__()
+        self.latency = latency
+        self.num_failures = 0
+        self.sent: List[str] = []
+        self._lock = Lock()
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        time.sleep(self.latency)
+        with self._lock:
+            self.sent.append(payload)
+            if self.num_failures:
+                self.num_failures -= 1
+                return None
+
+        return f'{{{payload}}}'.format(42)
+
+
+def test_limit_increases_additively_up_to_max_concurrency():
+    harness = AdaptiveInjectionHarness(
+        ScriptedHarness(latency=0.001), max_concurrency=4, latency_factor=1e6)
+    assert harness.limit == 1
+
+    # each success raises the limit by 1 / limit
+    for _ in range(2):
+        assert harness.send_injection('0') == '42'
+    assert harness.limit == 2
+
+    for _ in range(20):
+        assert harness.send_injection('0') == '42'
+    assert harness.limit == 4
+    assert harness.num_decreases == 0
+
+
+def test_limit_is_halved_on_failure():
+    target = ScriptedHarness(latency=0.001)
+    harness = AdaptiveInjectionHarness(
+        target, max_concurrency=4, latency_factor=1e6)
+    for _ in range(20):
+        harness.send_injection('0')
+    assert harness.limit == 4
+
+    # the known-good payload still succeeds, so the target is not down
+    target.num_failures = 1
+    assert harness.send_injection('0.missing') is None
+    assert harness.limit == 2
+    assert harness.num_decreases == 1
+    assert harness.num_outages == 0
+    assert harness.num_retries == 0
+
+
+def test_circuit_opens_while_target_is_down_and_recovers():
+    target = ScriptedHarness()
+    harness = AdaptiveInjectionHarness(target, latency_factor=1e6)
+    assert harness.send_injection('0') == '42'
+
+    # the request and the first check both fail; the next check succeeds
+    target.num_failures = 2
+    results: List[Optional[str]] = []
+    failing = Thread(
+        target=lambda: results.append(harness.send_injection('0!r')))
+    failing.start()
+
+    deadline = time.monotonic() + TIMEOUT
+    while harness.num_outages == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    # a request made while the circuit is open is held back until recovery
+    assert harness.send_injection('0:>3') == ' 42'
+    failing.join(TIMEOUT)
+
+    assert results == ['42']
+    assert harness.num_outages == 1
+    assert harness.num_retries == 1
+
+    # the held-back request was only sent after the successful check
+    assert target.sent[:4] == ['0', '0!r', '0', '0']
+    assert target.sent.index('0:>3') > 3
+
+
+def test_failures_are_reported_once_recovery_times_out():
+    target = ScriptedHarness()
+    harness = AdaptiveInjectionHarness(
+        target, latency_factor=1e6, recovery_timeout=0)
+    assert harness.send_injection('0') == '42'
+
+    target.num_failures = 1000
+    assert harness.send_injection('0!r') is None
+    assert harness.num_outages == 1
+    assert harness.num_retries == 0
+
+    # requests are no longer held back
+    target.num_failures = 0
+    assert harness.send_injection('0!r') == '42'
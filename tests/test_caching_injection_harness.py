@@ -0,0 +1,53 @@
+"""Tests for the CachingInjectionHarness class."""
+
+from typing import (
+    Dict,
+    List,
+    Optional)
+
+from formatic import (
+    AbstractInjectionHarness,
+    CachingInjectionHarness)
+
+
+class ScriptedHarness(AbstractInjectionHarness):
+    """A harness answering payloads from a dict, recording what is sent."""
+
+    def __init__(
+        self,
+        responses: Dict[str, Optional[str]]
+    ) -> None:
+        super().__init__()
+        self.responses = responses
+        self.sent: List[str] = []
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        self.sent.append(payload)
+        return self.responses.get(payload)
+
+
+def test_none_result_is_cached_in_memory():
+    target = ScriptedHarness({'ok': 'result'})
+    harness = CachingInjectionHarness(target)
+
+    assert harness.send_injection('lost') is None
+    assert harness.send_injection('lost') is None
+    assert target.sent == ['lost']
+
+
+def test_none_result_is_not_read_back_from_disk(tmp_path):
+    cache_path = str(tmp_path / 'cache')
+    target = ScriptedHarness({'ok': 'result'})
+    harness = CachingInjectionHarness(target, cache_path=cache_path)
+    assert harness.send_injections(['ok', 'lost']) == ['result', None]
+    harness.close()
+
+    # the target answers the payload that was lost during the first run
+    target = ScriptedHarness({'ok': 'other', 'lost': 'recovered'})
+    harness = CachingInjectionHarness(target, cache_path=cache_path)
+    assert harness.send_injections(['ok', 'lost']) == ['result', 'recovered']
+    assert target.sent == ['lost']
+    harness.close()
@@ -0,0 +1,116 @@
+"""Tests for decompiling recovered code objects."""
+
+import sys
+
+from dis import (
+    opmap)
+from types import (
+    CodeType,
+    FunctionType)
+
+import pytest
+
+from formatic import (
+    FunctionInjectionWalker,
+    InProcessInjectionHarness)
+from formatic.decompilation import (
+    DecompilationError,
+    Decompiler)
+from formatic.injection_engine import (
+    InjectionEngine)
+from formatic.walkers import (
+    FailedInjectionWalker)
+
+BYTECODE_VERSION = f'{sys.version_info.major}.{sys.version_info.minor}'
+
+
+def good(
+    x
+):
+    return x + 1
+
+
+def make_undecompilable_code(
+) -> CodeType:
+    """Get a code object whose bytecode no decompiler grammar accepts."""
+    code = good.__code__
+    # POP_TOP, POP_TOP, RETURN_VALUE on an empty stack
+    co_code = bytes([
+        opmap['POP_TOP'], 0,
+        opmap['POP_TOP'], 0,
+        opmap['RETURN_VALUE'], 0])
+    if sys.version_info >= (3, 8):
+        return code.replace(co_code=co_code)
+
+    # the constructor's signature changes between versions, unlike replace()
+    return CodeType(
+        code.co_argcount,
+        code.co_kwonlyargcount,
+        code.co_nlocals,
+        code.co_stacksize,
+        code.co_flags,
+        co_code,
+        code.co_consts,
+        code.co_names,
+        code.co_varnames,
+        code.co_filename,
+        code.co_name,
+        code.co_firstlineno,
+        code.co_lnotab,
+        code.co_freevars,
+        code.co_cellvars)
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_failed_decompilation_raises_decompilation_error(workers):
+    decompiler = Decompiler(workers)
+    decompiler.start()
+    try:
+        src_future = decompiler.submit(
+            make_undecompilable_code(), BYTECODE_VERSION)
+        with pytest.raises(DecompilationError):
+            src_future.result()
+
+        src_future = decompiler.submit(good.__code__, BYTECODE_VERSION)
+        assert 'return x + 1' in src_future.result()
+    finally:
+        decompiler.shutdown()
+
+
+def make_root(
+):
+    """Get an object whose class has a function that cannot be decompiled.
+
+    Its functions have their own globals, so that the crawl does not escape
+    into this module's.
+
+    """
+    namespace = {'__name__': 'target'}
+    exec(
+        'def good(x):\n'
+        '    return x + 1\n'
+        '\n'
+        'class Root:\n'
+        '    good = good\n',
+        namespace)
+    root_cls = namespace['Root']
+    root_cls.bad = FunctionType(make_undecompilable_code(), namespace, 'bad')
+    root_cls.bad.__qualname__ = 'Root.bad'
+    return root_cls()
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_failed_decompilation_is_reported_by_the_function(workers):
+    engine = InjectionEngine(
+        InProcessInjectionHarness(make_root()), decompile_workers=workers)
+    walkers = list(engine.run(0, BYTECODE_VERSION))
+
+    function_srcs = {
+        walker.name_walker.value: walker.src_code for walker in walkers if
+        isinstance(walker, FunctionInjectionWalker)}
+    assert function_srcs['Root.bad'] is None
+    assert 'return x + 1' in function_srcs['good']
+    assert any(
+        isinstance(walker, FailedInjectionWalker) and
+        'Unable to decompile function Root.bad' in str(walker) for
+        walker in walkers)
@@ -0,0 +1,119 @@
+"""Tests for the ForkServerInjectionHarness class."""
+
+import sys
+import time
+
+import pytest
+
+from formatic import (
+    ForkServerInjectionHarness)
+
+
+# formats its first argument, then sleeps for the seconds in the second; it
+# hangs before printing anything if the first argument contains "hang"
+TARGET_SRC = '''
+import sys
+import time
+
+
+class Target:
+
+    def method(self):
+        pass
+
+
+def main():
+    if 'hang' in sys.argv[1]:
+        time.sleep(30)
+    print(sys.argv[1].format(Target()))
+    sys.stdout.flush()
+    time.sleep(float(sys.argv[2]))
+
+
+if __name__ == '__main__':
+    main()
+'''
+
+# the same, but appending a line to a log file whenever the script is run
+UNGUARDED_TARGET_SRC = '''
+import sys
+
+
+class Target:
+
+    def method(self):
+        pass
+
+
+with open(sys.argv[2], 'a') as f:
+    f.write('run\\n')
+print(sys.argv[1].format(Target()))
+'''
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == 'win32', reason='fork servers require os.fork()')
+
+
+def make_harness(
+    tmp_path,
+    src,
+    *args,
+    timeout=10
+):
+    target_path = tmp_path / 'target.py'
+    target_path.write_text(src)
+    return ForkServerInjectionHarness(
+        [sys.executable, str(target_path), '@@', *args], timeout=timeout)
+
+
+def test_children_share_target_objects(tmp_path):
+    harness = make_harness(tmp_path, TARGET_SRC, '0')
+    try:
+        method_repr = harness.send_injection('0.__class__.method!r')
+        assert method_repr.startswith('<function Target.method at 0x')
+        assert harness.send_injection('0.__class__.method!r') == method_repr
+        assert harness.send_injection('0.__module__') == '__main__'
+        assert harness.send_injection('0.missing') is None
+        assert harness.stable_addresses
+    finally:
+        harness.close()
+
+
+def test_unguarded_target_is_only_run_by_children(tmp_path):
+    log_path = tmp_path / 'runs.log'
+    harness = make_harness(tmp_path, UNGUARDED_TARGET_SRC, str(log_path))
+    try:
+        assert harness.send_injection('0.__class__.__name__') == 'Target'
+        assert harness.send_injection('0.__class__.__name__') == 'Target'
+        assert not harness.stable_addresses
+    finally:
+        harness.close()
+
+    assert log_path.read_text() == 'run\n' * 2
+
+
+def test_slow_target_is_killed_once_response_is_read(tmp_path):
+    harness = make_harness(tmp_path, TARGET_SRC, '30')
+    try:
+        start = time.perf_counter()
+        assert harness.send_injection('0.__class__.__name__') == 'Target'
+        assert harness.send_injection('0.__module__') == '__main__'
+        assert time.perf_counter() - start < 5
+    finally:
+        harness.close()
+
+
+def test_hung_target_times_out_without_stopping_server(tmp_path):
+    harness = make_harness(tmp_path, TARGET_SRC, '0', timeout=1)
+    try:
+        assert harness.send_injection('0.__class__.__name__') == 'Target'
+        server = harness._server
+
+        start = time.perf_counter()
+        assert harness.send_injection('0.hang') is None
+        assert time.perf_counter() - start < 5
+
+        assert harness.send_injection('0.__class__.__name__') == 'Target'
+        assert harness._server is server
+    finally:
+        harness.close()
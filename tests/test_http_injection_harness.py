@@ -0,0 +1,100 @@
+"""Tests for the HttpInjectionHarness class."""
+
+import socket
+
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer)
+from threading import (
+    Thread)
+from urllib.parse import (
+    parse_qs,
+    urlsplit)
+
+import pytest
+
+from formatic import (
+    HttpInjectionHarness)
+
+
+class FormattingHandler(BaseHTTPRequestHandler):
+    """Formats the ``q`` query parameter against an int.
+
+    Requests whose parameter contains ``drop`` get their connection closed
+    without a response.
+
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)['q'][0]
+        if 'drop' in query:
+            self.close_connection = True
+            return
+
+        try:
+            body = query.format(42)
+        except Exception as e:
+            body = f'error: {e}'
+        encoded_body = body.encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(encoded_body)))
+        self.end_headers()
+        self.wfile.write(encoded_body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('localhost', 0), FormattingHandler)
+    server.daemon_threads = True
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def harness(server):
+    host, port = server.server_address[:2]
+    harness = HttpInjectionHarness(
+        f'http://{host}:{port}/?q=@@', pool_size=1, timeout=10)
+    yield harness
+
+    harness.close()
+
+
+def test_injections_are_sent_over_a_persistent_connection(harness):
+    assert harness.send_injection('0') == '42'
+    conn = harness._pool.queue[0]
+    assert harness.send_injection('0.real') == '42'
+    assert harness._pool.queue[0].sock is conn.sock
+
+    assert harness.send_injection('0.missing') is None
+
+
+def test_error_response_is_bisected_out_of_batch(harness):
+    results = harness.send_injections(['0', '0.missing', '0!r'])
+    assert results == ['42', None, '42']
+
+
+def test_dropped_connection_gets_no_response(harness):
+    assert harness.send_injection('0') == '42'
+    assert harness.send_raw_injection('{0}drop') is None
+    assert harness.send_injection('0') == '42'
+
+
+def test_unreachable_service_raises_connection_error():
+    with socket.socket() as sock:
+        sock.bind(('localhost', 0))
+        port = sock.getsockname()[1]
+
+    harness = HttpInjectionHarness(f'http://localhost:{port}/?q=@@')
+    with pytest.raises(ConnectionError):
+        harness.send_injection('0')
@@ -0,0 +1,209 @@
+"""Tests for the InjectionEngine class."""
+
+import asyncio
+import sys
+import time
+
+from typing import (
+    Any,
+    List,
+    Optional,
+    Set,
+    Tuple)
+
+from formatic import (
+    AbstractInjectionWalker,
+    AsyncAbstractInjectionHarness,
+    ChildWalk,
+    FunctionInjectionWalker,
+    InProcessInjectionHarness,
+    ModuleInjectionWalker)
+from formatic.defaults import (
+    DEFAULT_MODULE_BLACKLIST)
+from formatic.injection_engine import (
+    InjectionEngine)
+
+BYTECODE_VERSION = f'{sys.version_info.major}.{sys.version_info.minor}'
+
+
+# crawled in a namespace of its own, so that the crawl stays out of pytest
+TARGET_SRC = '''
+class Root:
+
+    def method(self):
+        return 0
+'''
+
+
+# many objects are reachable from several places at once, so that
+# concurrent walks race to claim them
+WIDE_TARGET_SRC = '''
+import types
+
+lib = types.ModuleType('lib')
+exec('def lib_func():\\n    return 0\\n', lib.__dict__)
+
+
+def helper():
+    return lib.lib_func()
+
+
+class Base:
+    h = helper
+
+    def base_method(self):
+        return helper()
+
+
+class A(Base):
+    h = helper
+
+    def a_method(self):
+        return Base()
+
+
+class B(A):
+    h = helper
+
+    def b_method(self):
+        return A()
+
+
+class C(Base):
+    h = helper
+    b = B
+
+
+class Root(C):
+
+    def method(self):
+        return B()
+'''
+
+
+def make_root(
+    src: str = TARGET_SRC
+) -> Any:
+    namespace = {'__name__': 'target'}
+    exec(src, namespace)
+    return namespace['Root']()
+
+
+def crawl(
+    root: Any,
+    jobs: int,
+    module_blacklist: Set[str] = DEFAULT_MODULE_BLACKLIST
+) -> List[Tuple[str, str, Optional[str]]]:
+    engine = InjectionEngine(
+        InProcessInjectionHarness(root),
+        module_blacklist=module_blacklist,
+        jobs=jobs)
+    return [
+        (type(walker).__name__,
+         walker.injection_str,
+         getattr(walker, 'src_code', None)) for
+        walker in engine.run(0, BYTECODE_VERSION)]
+
+
+class HangingHarness(AsyncAbstractInjectionHarness):
+    """Formats injections against an object, hanging after a few of them."""
+
+    def __init__(
+        self,
+        root_obj: Any,
+        num_answers: int
+    ) -> None:
+        super().__init__()
+        self.root_obj = root_obj
+        self.num_answers = num_answers
+        self.num_cancelled = 0
+
+    async def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        if self.num_answers == 0:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.num_cancelled += 1
+                raise
+        self.num_answers -= 1
+
+        try:
+            return f'{{{payload}}}'.format(self.root_obj)
+        except Exception:
+            return None
+
+
+def test_cancelled_arun_stops_walks_in_flight():
+    harness = HangingHarness(make_root(), num_answers=1)
+    engine = InjectionEngine(harness)
+
+    async def crawl():
+        return [walker async for walker in engine.arun(0, BYTECODE_VERSION)]
+
+    async def main():
+        try:
+            await asyncio.wait_for(crawl(), timeout=0.5)
+        except asyncio.TimeoutError:
+            pass
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    assert time.perf_counter() - start < 5
+
+    assert harness.num_cancelled > 0
+    assert engine.stopped
+
+
+def test_walk_yields_walkers_of_all_child_walks():
+    harness = InProcessInjectionHarness(make_root())
+    engine = InjectionEngine(harness)
+    walker_cls = AbstractInjectionWalker.matching_subclass(
+        '0.__class__', harness.send_injection('0.__class__'))
+    walker = walker_cls(
+        harness,
+        '0.__class__',
+        harness.send_injection('0.__class__'),
+        BYTECODE_VERSION,
+        engine)
+
+    walkers = list(walker.walk())
+    assert walkers
+    assert all(
+        isinstance(walker, AbstractInjectionWalker) for walker in walkers)
+    assert not any(isinstance(walker, ChildWalk) for walker in walkers)
+    assert any(isinstance(walker, ModuleInjectionWalker) for walker in walkers)
+
+
+def count_sources(
+    results: List[Tuple[str, str, Optional[str]]],
+    function_name: str
+) -> int:
+    return sum(
+        1 for walker_type, _, src_code in results if
+        walker_type == FunctionInjectionWalker.__name__ and
+        src_code is not None and f'def {function_name}' in src_code)
+
+
+def test_concurrent_crawl_matches_sequential_crawl():
+    root = make_root(WIDE_TARGET_SRC)
+    expected = crawl(root, jobs=1)
+    assert count_sources(expected, 'helper') == 1
+    assert count_sources(expected, 'lib_func') == 1
+
+    for _ in range(5):
+        assert crawl(root, jobs=4) == expected
+
+
+def test_concurrent_crawl_skips_blacklisted_modules():
+    root = make_root(WIDE_TARGET_SRC)
+    module_blacklist = DEFAULT_MODULE_BLACKLIST | {'lib'}
+    expected = crawl(root, jobs=1, module_blacklist=module_blacklist)
+    assert count_sources(expected, 'helper') == 1
+    assert count_sources(expected, 'lib_func') == 0
+
+    for _ in range(5):
+        assert crawl(
+            root, jobs=4, module_blacklist=module_blacklist) == expected
@@ -0,0 +1,106 @@
+"""Tests for the RetryingInjectionHarness class."""
+
+from typing import (
+    List,
+    Optional)
+
+from formatic import (
+    AbstractInjectionHarness,
+    RetryingInjectionHarness)
+from formatic.defaults import (
+    DEFAULT_HEDGE_MIN_SAMPLES)
+
+
+class FlakyHarness(AbstractInjectionHarness):
+    """A harness formatting injections against an int, recording them.
+
+    Injections holding ``lost_payload`` get no response the first
+    ``num_losses`` times they are sent.
+
+    """
+
+    def __init__(
+        self,
+        lost_payload: str,
+        num_losses: int
+    ) -> None:
+        super().__init__()
+        self.lost_payload = lost_payload
+        self.num_losses = num_losses
+        self.sent: List[str] = []
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        raw_response = self.send_raw_injection(self._mark_payload(payload))
+        if raw_response is None:
+            return None
+
+        return self._parse_response(raw_response)
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        self.sent.append(injection)
+        if f'{{{self.lost_payload}}}' in injection and self.num_losses:
+            self.num_losses -= 1
+            return None
+
+        try:
+            return injection.format(42)
+        except Exception as e:
+            return f'error: {e}'
+
+
+def num_sent(
+    harness: FlakyHarness,
+    payload: str
+) -> int:
+    return sum(f'{{{payload}}}' in injection for injection in harness.sent)
+
+
+def test_only_lost_injections_are_retried():
+    target = FlakyHarness('0.real', num_losses=1)
+    harness = RetryingInjectionHarness(
+        target, max_attempts=3, backoff=0, retry_failures=True)
+
+    assert harness.send_injection('0.real') == '42'
+    assert num_sent(target, '0.real') == 2
+
+    assert harness.send_injection('0.missing') is None
+    assert num_sent(target, '0.missing') == 1
+
+    # the lost batch is retried, then bisected once the target rejects it
+    target.num_losses = 1
+    results = harness.send_injections(['0!r', '0.missing', '0.real'])
+    assert results == ['42', None, '42']
+    assert target.sent.count(target._mark_payload('0.missing')) == 2
+    assert harness.num_retries == 2
+
+
+def test_none_results_are_not_retried_without_retry_failures():
+    target = FlakyHarness('0.real', num_losses=1)
+    harness = RetryingInjectionHarness(target, max_attempts=3, backoff=0)
+
+    assert harness.send_injection('0.real') is None
+    assert harness.send_injection('0.missing') is None
+    assert harness.num_retries == 0
+
+
+def test_hedge_delay_is_tracked_per_number_of_payloads():
+    target = FlakyHarness('0.real', num_losses=0)
+    harness = RetryingInjectionHarness(
+        target, backoff=0, retry_failures=True, hedge=True)
+    try:
+        for _ in range(DEFAULT_HEDGE_MIN_SAMPLES):
+            assert harness.send_injection('0') == '42'
+
+        assert harness.hedge_delay(1) is not None
+        assert harness.hedge_delay(2) is None
+
+        assert harness.send_injections(['0', '0!r']) == ['42', '42']
+        assert harness.hedge_delay(2) is None
+    finally:
+        harness.close()
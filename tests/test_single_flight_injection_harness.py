@@ -0,0 +1,116 @@
+"""Tests for the SingleFlightInjectionHarness class."""
+
+import time
+
+from concurrent.futures import (
+    ThreadPoolExecutor)
+from threading import (
+    Event,
+    Lock)
+from typing import (
+    List,
+    Optional)
+
+import pytest
+
+from formatic import (
+    AbstractInjectionHarness,
+    SingleFlightInjectionHarness)
+
+TIMEOUT = 10
+
+
+class GatedHarness(AbstractInjectionHarness):
+    """Formats payloads against an int once :data:`gate` is set.
+
+    If :data:`error` is set, it is raised instead.
+
+    """
+
+    def __init__(
+        self
+    ) -> None:
+        super().__init__()
+        self.gate = Event()
+        self.error: Optional[Exception] = None
+        self.sent: List[str] = []
+        self._lock = Lock()
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        with self._lock:
+            self.sent.append(payload)
+        assert self.gate.wait(TIMEOUT)
+
+        if self.error is not None:
+            raise self.error
+        return f'{{{payload}}}'.format(42)
+
+
+def wait_for_coalesced(
+    harness: SingleFlightInjectionHarness,
+    coalesced: int
+) -> None:
+    deadline = time.monotonic() + TIMEOUT
+    while harness.coalesced < coalesced:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_identical_payloads_in_flight_are_coalesced():
+    target = GatedHarness()
+    harness = SingleFlightInjectionHarness(target)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(harness.send_injection, '0')
+        while not target.sent:
+            time.sleep(0.01)
+
+        followers = [
+            executor.submit(harness.send_injection, '0') for _ in range(2)]
+        wait_for_coalesced(harness, 2)
+        target.gate.set()
+
+        assert leader.result(TIMEOUT) == '42'
+        assert [f.result(TIMEOUT) for f in followers] == ['42', '42']
+
+    assert target.sent == ['0']
+
+    # payloads that are no longer in flight are sent again
+    assert harness.send_injection('0') == '42'
+    assert target.sent == ['0', '0']
+
+
+def test_duplicate_payloads_in_one_request_are_sent_once():
+    target = GatedHarness()
+    target.gate.set()
+    harness = SingleFlightInjectionHarness(target)
+
+    assert harness.send_injections(['0', '0!r', '0']) == ['42', '42', '42']
+    assert sorted(target.sent) == ['0', '0!r']
+
+
+def test_exceptions_are_propagated_to_waiters():
+    target = GatedHarness()
+    target.error = ConnectionError('target is down')
+    harness = SingleFlightInjectionHarness(target)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(harness.send_injection, '0')
+        while not target.sent:
+            time.sleep(0.01)
+
+        follower = executor.submit(harness.send_injection, '0')
+        wait_for_coalesced(harness, 1)
+        target.gate.set()
+
+        with pytest.raises(ConnectionError):
+            leader.result(TIMEOUT)
+        with pytest.raises(ConnectionError):
+            follower.result(TIMEOUT)
+
+    assert target.sent == ['0']
+
+    # the failed payload is no longer in flight
+    target.error = None
+    assert harness.send_injection('0') == '42'
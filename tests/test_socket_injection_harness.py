@@ -0,0 +1,73 @@
+"""Tests for the SocketInjectionHarness class."""
+
+import itertools
+import time
+
+from socketserver import (
+    StreamRequestHandler,
+    ThreadingTCPServer)
+from threading import (
+    Thread)
+
+import pytest
+
+from formatic import (
+    SocketInjectionHarness)
+
+
+TIMEOUT = 10
+
+
+class ConnectionIdHandler(StreamRequestHandler):
+    """Formats each line with the ID of its connection, after a greeting."""
+
+    connection_ids = itertools.count()
+
+    def handle(self):
+        connection_id = next(self.connection_ids)
+        self.wfile.write(b'Welcome! Send lines to format.\n')
+        for line in self.rfile:
+            try:
+                response = line.decode('utf-8').rstrip('\n').format(
+                    connection_id)
+            except Exception as e:
+                response = f'error: {e}'
+            self.wfile.write(f'{response}\n'.encode('utf-8'))
+
+
+@pytest.fixture
+def harness():
+    ThreadingTCPServer.daemon_threads = True
+    server = ThreadingTCPServer(('localhost', 0), ConnectionIdHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+
+    host, port = server.server_address
+    harness = SocketInjectionHarness(
+        host, port, pool_size=1, timeout=TIMEOUT)
+    yield harness
+
+    harness.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_error_line_fails_injection_without_closing_connection(harness):
+    connection_id = harness.send_injection('0')
+    assert connection_id is not None and connection_id.isdigit()
+
+    start = time.perf_counter()
+    assert harness.send_injection('0.missing') is None
+    assert time.perf_counter() - start < TIMEOUT / 2
+
+    assert harness.send_injection('0') == connection_id
+
+
+def test_error_line_is_bisected_out_of_batch(harness):
+    connection_id = harness.send_injection('0')
+
+    start = time.perf_counter()
+    results = harness.send_injections(['0', '0.missing', '0!r'])
+    assert time.perf_counter() - start < TIMEOUT / 2
+
+    assert results == [connection_id, None, connection_id]
+    assert harness.send_injection('0') == connection_id
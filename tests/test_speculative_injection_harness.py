@@ -0,0 +1,128 @@
+"""Tests for the SpeculativeInjectionHarness class."""
+
+from collections import (
+    Counter)
+from threading import (
+    Lock)
+from typing import (
+    Optional)
+
+from formatic import (
+    AbstractInjectionHarness,
+    InProcessInjectionHarness,
+    SpeculativeInjectionHarness)
+
+
+class Target:
+
+    a = 'a'
+    b = 'b'
+    c = 'c'
+
+
+class CountingHarness(AbstractInjectionHarness):
+    """Formats single payloads against a target, counting the requests.
+
+    Requests for a payload in ``failing_payloads`` raise the first time they
+    are made.
+
+    """
+
+    def __init__(
+        self,
+        *failing_payloads: str
+    ) -> None:
+        super().__init__()
+        self.failing_payloads = set(failing_payloads)
+        self.requests: Counter = Counter()
+        self._lock = Lock()
+
+    def send_injection(
+        self,
+        payload: str
+    ) -> Optional[str]:
+        with self._lock:
+            self.requests[payload] += 1
+            if payload in self.failing_payloads:
+                self.failing_payloads.remove(payload)
+                raise ConnectionError(f'{payload} failed')
+
+        try:
+            return f'{{{payload}}}'.format(Target())
+        except Exception:
+            return None
+
+
+class BatchingHarness(InProcessInjectionHarness):
+    """Formats injections in-process, counting the requests."""
+
+    def __init__(
+        self
+    ) -> None:
+        super().__init__(Target())
+        self.num_requests = 0
+        self._lock = Lock()
+
+    def send_raw_injection(
+        self,
+        injection: str
+    ) -> Optional[str]:
+        with self._lock:
+            self.num_requests += 1
+        return super().send_raw_injection(injection)
+
+
+def test_prefetched_results_are_reused():
+    target = BatchingHarness()
+    harness = SpeculativeInjectionHarness(target)
+    try:
+        harness.prefetch(['0.a', '0.b', '0.c'])
+        harness.prefetch(['0.a'])
+        assert harness.num_speculated == 3
+
+        assert harness.send_injection('0.b') == 'b'
+        assert harness.send_injections(['0.a', '0.c', '0.a']) == [
+            'a', 'c', 'a']
+        assert harness.num_used == 3
+
+        # the three payloads were packed into one request
+        assert target.num_requests == 1
+    finally:
+        harness.close()
+
+
+def test_payloads_are_sent_once_without_raw_injections():
+    target = CountingHarness()
+    harness = SpeculativeInjectionHarness(target)
+    try:
+        harness.prefetch(['0.a', '0.b'])
+        assert harness.send_injections(['0.a', '0.b']) == ['a', 'b']
+        assert target.requests == {'0.a': 1, '0.b': 1}
+    finally:
+        harness.close()
+
+
+def test_failed_speculation_falls_back_to_sending():
+    target = CountingHarness('0.a')
+    harness = SpeculativeInjectionHarness(target, workers=1)
+    try:
+        harness.prefetch(['0.a'])
+        harness.prefetch(['0.b'])
+
+        assert harness.send_injection('0.a') == 'a'
+        assert harness.send_injection('0.b') == 'b'
+        assert target.requests == {'0.a': 2, '0.b': 1}
+        assert harness.num_used == 2
+    finally:
+        harness.close()
+
+
+def test_payloads_not_prefetched_are_sent_directly():
+    target = CountingHarness()
+    harness = SpeculativeInjectionHarness(target)
+    try:
+        assert harness.send_injections(['0.a', '0.missing']) == ['a', None]
+        assert harness.num_speculated == 0
+        assert harness.num_used == 0
+    finally:
+        harness.close()
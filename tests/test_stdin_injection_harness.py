@@ -0,0 +1,57 @@
+"""Tests for the StdinInjectionHarness class."""
+
+import sys
+import time
+
+from formatic import (
+    StdinInjectionHarness)
+
+
+# formats each line with its process ID, answering bad fields with an error
+TARGET_SRC = '''
+import os
+import sys
+
+for line in sys.stdin:
+    try:
+        print(line.rstrip('\\n').format(os.getpid()))
+    except Exception as e:
+        print(f'error: {e}')
+'''
+
+TIMEOUT = 10
+
+
+def make_harness():
+    return StdinInjectionHarness(
+        [sys.executable, '-c', TARGET_SRC], pool_size=1, timeout=TIMEOUT)
+
+
+def test_error_line_fails_injection_without_restarting_target():
+    harness = make_harness()
+    try:
+        pid = harness.send_injection('0')
+        assert pid is not None and pid.isdigit()
+
+        start = time.perf_counter()
+        assert harness.send_injection('0.missing') is None
+        assert time.perf_counter() - start < TIMEOUT / 2
+
+        assert harness.send_injection('0') == pid
+    finally:
+        harness.close()
+
+
+def test_error_line_is_bisected_out_of_batch():
+    harness = make_harness()
+    try:
+        pid = harness.send_injection('0')
+
+        start = time.perf_counter()
+        results = harness.send_injections(['0', '0.missing', '0!r'])
+        assert time.perf_counter() - start < TIMEOUT / 2
+
+        assert results == [pid, None, pid]
+        assert harness.send_injection('0') == pid
+    finally:
+        harness.close()
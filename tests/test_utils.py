@@ -0,0 +1,79 @@
+"""Tests for the repr-parsing helpers in formatic.utils."""
+
+import pytest
+
+from formatic.utils import (
+    DictReprEntry,
+    _top_level_indexes,
+    parse_dict_repr,
+    parse_tuple_repr)
+
+
+@pytest.mark.parametrize('raw_reprs, char, expected', [
+    ('', ',', []),
+    ('1, 2', ',', [1]),
+    ('(1, 2), [3, 4], {5: 6}', ',', [6, 14]),
+    ("'a,b', \"c,d\"", ',', [5]),
+    ("'<', '>'", ',', [3]),
+    ("'it\\'s, ok', 1", ',', [11]),
+    ('<function f at 0x7f00>, <object at 0x7f01>', ',', [22]),
+    ('<function <lambda> at 0x7f00>, 1', ',', [29]),
+    ("'a': 1, 'b': {'c': 2}", ':', [3, 11]),
+    ("'a:b': 'c:d'", ':', [5]),
+    ('(1, 2', ',', None),
+    ('1, 2)', ',', None),
+    ("'unterminated, 1", ',', None),
+    ('<object at 0x7f00, 1', ',', None),
+])
+def test_top_level_indexes(raw_reprs, char, expected):
+    assert _top_level_indexes(raw_reprs, char) == expected
+
+
+@pytest.mark.parametrize('raw_tuple_str, expected', [
+    ('()', []),
+    ('(1,)', ['1']),
+    ('(1, 2)', ['1', '2']),
+    ('  (1, 2)\n', ['1', '2']),
+    ('((1, 2), [3, (4, 5)], {6: (7, 8)})',
+     ['(1, 2)', '[3, (4, 5)]', '{6: (7, 8)}']),
+    ("('a, b', '<', '>', ':')", ["'a, b'", "'<'", "'>'", "':'"]),
+    ('(<function f at 0x7f00>, <code object g at 0x7f01, file "x.py">)',
+     ['<function f at 0x7f00>', '<code object g at 0x7f01, file "x.py">']),
+    ('[1, 2]', None),
+    ('(1, 2', None),
+    ('(1, (2)', None),
+    ("('a, 1)", None),
+    ('(<object at 0x7f00, 1)', None),
+])
+def test_parse_tuple_repr(raw_tuple_str, expected):
+    assert parse_tuple_repr(raw_tuple_str) == expected
+
+
+@pytest.mark.parametrize('raw_dict_str, expected', [
+    ('{}', []),
+    ("{'a': 1, 'b': 'x'}", [
+        DictReprEntry('a', '1', True, 1),
+        DictReprEntry('b', "'x'", True, 'x')]),
+    ("{'a': {'b': [1, (2, 3)]}, 'c': {'d': 4}}", [
+        DictReprEntry('a', "{'b': [1, (2, 3)]}", True, {'b': [1, (2, 3)]}),
+        DictReprEntry('c', "{'d': 4}", True, {'d': 4})]),
+    ("{'a': 'x, y: <z>', 'b': ':'}", [
+        DictReprEntry('a', "'x, y: <z>'", True, 'x, y: <z>'),
+        DictReprEntry('b', "':'", True, ':')]),
+    ("{'f': <function f at 0x7f00>, 'n': None}", [
+        DictReprEntry('f', '<function f at 0x7f00>', False, None),
+        DictReprEntry('n', 'None', True, None)]),
+    ("mappingproxy({'__module__': 'm', 'g': <function A.g at 0x7f00>})", [
+        DictReprEntry('__module__', "'m'", True, 'm'),
+        DictReprEntry('g', '<function A.g at 0x7f00>', False, None)]),
+    ("{1: 'int key', 'not an identifier': 2, 'ok': 3}", [
+        DictReprEntry('ok', '3', True, 3)]),
+    ("{'a': <Broken (, 'b': 2}", [
+        DictReprEntry('a', None, False, None),
+        DictReprEntry('b', None, False, None)]),
+    ("{'a': 1, 'b': 'unterminated}", [
+        DictReprEntry('a', None, False, None),
+        DictReprEntry('b', None, False, None)]),
+])
+def test_parse_dict_repr(raw_dict_str, expected):
+    assert parse_dict_repr(raw_dict_str) == expected
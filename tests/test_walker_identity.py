@@ -0,0 +1,64 @@
+"""Tests for deduplicating walked objects across injections."""
+
+import sys
+import textwrap
+
+from formatic import (
+    FunctionInjectionWalker,
+    InProcessInjectionHarness,
+    SubprocessInjectionHarness)
+from formatic.injection_engine import (
+    InjectionEngine)
+
+BYTECODE_VERSION = f'{sys.version_info.major}.{sys.version_info.minor}'
+
+# helper is reachable from A.h, B.h, and the module's globals
+TARGET_SRC = textwrap.dedent('''\
+    import sys
+
+
+    def helper():
+        return 'helped'
+
+
+    class A:
+        h = helper
+
+
+    class B:
+        h = helper
+
+
+    class Root:
+        def method(self):
+            return 0
+''')
+
+
+def count_helper_sources(harness):
+    engine = InjectionEngine(harness)
+    return sum(
+        1 for walker in engine.run(0, BYTECODE_VERSION) if
+        isinstance(walker, FunctionInjectionWalker) and
+        walker.src_code is not None and
+        'def helper' in walker.src_code)
+
+
+def test_function_is_walked_once_with_a_process_per_injection(tmp_path):
+    target_path = tmp_path / 'target.py'
+    target_path.write_text(
+        TARGET_SRC + '\n\nprint(sys.argv[1].format(Root()))\n')
+    harness = SubprocessInjectionHarness(
+        [sys.executable, str(target_path), '@@'])
+
+    assert not harness.stable_addresses
+    assert count_helper_sources(harness) == 1
+
+
+def test_function_is_walked_once_in_process():
+    namespace = {'__name__': 'target'}
+    exec(TARGET_SRC, namespace)
+    harness = InProcessInjectionHarness(namespace['Root']())
+
+    assert harness.stable_addresses
+    assert count_helper_sources(harness) == 1